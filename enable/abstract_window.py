@@ -1,19 +1,32 @@
 
 # Major library imports
-from numpy import dot
+from math import ceil, floor
+from numpy import array, dot, ndarray
 
 # Enthought library imports
-from traits.api import Any, Bool, Event, HasTraits, Instance, \
+from kiva import affine
+from kiva.buffer_pool import default_pool
+from traits.api import Any, Bool, Event, HasTraits, Instance, Int, \
         Property, Trait, Tuple, List
 
 
 # Local relative imports
-from base import bounds_to_coordinates, does_disjoint_intersect_coordinates, \
-    union_bounds
+from base import bounds_to_coordinates, coalesce_coordinates, \
+    coordinates_to_bounds, does_disjoint_intersect_coordinates, \
+    intersect_coordinates, empty_rectangle
 from component import Component
 from interactor import Interactor
 from container import Container
 from colors import ColorTrait
+from events import lightweight_event_classes
+
+def _affine(ctm):
+    """ Returns a CTM, as returned by the get_ctm() method of a GC, as an
+    affine matrix.
+    """
+    if isinstance(ctm, ndarray) and ctm.shape == (3, 3):
+        return ctm
+    return affine.affine_from_values(*ctm)
 
 def Alias(name):
     return Property(lambda obj: getattr(obj, name),
@@ -64,6 +77,27 @@ class AbstractWindow(HasTraits):
     # Whether to enable damaged region handling
     use_damaged_region = Bool(False)
 
+    # Whether to merge the mouse moves which arrive faster than the window
+    # paints.  The first mouse move after a paint is dispatched at once; the
+    # following ones are held, each replacing the previous one, and the last
+    # one is dispatched at the start of the next paint, once the toolkit has
+    # processed the pending events, or before the next other mouse event,
+    # whichever comes first.
+    coalesce_mouse_moves = Bool(False)
+
+    # The number of mouse moves which were replaced by a later one, and never
+    # dispatched, while coalesce_mouse_moves is True.
+    dropped_mouse_moves = Int(0)
+
+    # The number of mouse moves which were held and dispatched later, while
+    # coalesce_mouse_moves is True.
+    merged_mouse_moves = Int(0)
+
+    # Whether the backend converts the toolkit events to the lightweight
+    # events of enable.events, which are not HasTraits objects, rather than
+    # to MouseEvents, KeyEvents and DragEvents.
+    lightweight_events = Bool(True)
+
     # The previous component that handled an event.  Used to generate
     # mouse_enter and mouse_leave events.  Right now this can only be
     # None, self.component, or self.overlay.
@@ -75,6 +109,21 @@ class AbstractWindow(HasTraits):
     # The regions to update upon redraw
     _update_region = Any
 
+    # The mouse move held until it is dispatched, as a tuple (mouse event,
+    # set_focus), or None
+    _pending_mouse_move = Any
+
+    # Whether a mouse move was dispatched since the last paint
+    _mouse_move_dispatched = Bool(False)
+
+    # The last transform composed from the dispatch history of the mouse
+    # owner, as a tuple (key, transform)
+    _history_transform_cache = Any
+
+    # While painting only the update region, the CTM of the GC when the
+    # update region was clipped, as an affine matrix.
+    _update_transform = Any
+
 
 
     #---------------------------------------------------------------------------
@@ -105,6 +154,14 @@ class AbstractWindow(HasTraits):
         "Convert a GUI toolkit mouse event into a MouseEvent"
         raise NotImplementedError
 
+    def _make_event(self, event_class, **attributes):
+        """ Creates an Enable event of **event_class** for a toolkit event,
+        or of its lightweight version if lightweight_events is True.
+        """
+        if self.lightweight_events:
+            event_class = lightweight_event_classes[event_class]
+        return event_class(**attributes)
+
     def _redraw(self, coordinates=None):
         """ Request a redraw of the window, within just the (x,y,w,h) coordinates
         (if provided), or over the entire window if coordinates is None.
@@ -123,6 +180,13 @@ class AbstractWindow(HasTraits):
         """
         raise NotImplementedError
 
+    def _release_gc(self, gc):
+        """ Called with the GC of the window when it is replaced by a GC of
+        another size.  Returns its buffer to the buffer pool of Kiva, if
+        _create_gc() took it from there.
+        """
+        default_pool.release_gc(gc)
+
     def _init_gc(self):
         """ Gives a GC a chance to initialize itself before components perform
         layout and draw.  This is called every time through the paint loop.
@@ -133,11 +197,68 @@ class AbstractWindow(HasTraits):
         if self._update_region is None:
             gc.clear(self.bgcolor_)
         else:
-            # Fixme: should use clip_to_rects
-            update_union = reduce(union_bounds, self._update_region)
-            gc.clip_to_rect(*update_union)
+            self._update_region = self._coalesce_update_region()
+            if len(self._update_region) == 1:
+                gc.clip_to_rect(*self._update_region[0])
+            else:
+                gc.clip_to_rects(self._update_region)
+            with gc:
+                gc.set_fill_color(self.bgcolor_)
+                gc.begin_path()
+                gc.rects(self._update_region)
+                gc.fill_path()
+            self._update_transform = _affine(gc.get_ctm())
         return
 
+    def _get_paint_region(self, event):
+        """ Returns the parts of the window which the toolkit asks the paint
+        event to draw, besides the damaged regions (for instance because
+        they were uncovered), as a list of bounds in window coordinates.
+        """
+        return []
+
+    def _coalesce_update_region(self):
+        """ Returns the update region as a list of disjoint bounds within the
+        window, grown to whole pixels (plus one pixel on each side, for
+        antialiasing).
+        """
+        window = (0, 0) + tuple(self._size or (0, 0))
+        coordinates_list = []
+        for x, y, dx, dy in self._update_region:
+            if dx <= 0 or dy <= 0:
+                continue
+            coordinates = intersect_coordinates(
+                (floor(x) - 1, floor(y) - 1,
+                 ceil(x + dx) + 1, ceil(y + dy) + 1),
+                bounds_to_coordinates(window))
+            if coordinates is not empty_rectangle:
+                coordinates_list.append(coordinates)
+        return [coordinates_to_bounds(coordinates) for coordinates
+                in coalesce_coordinates(coordinates_list)]
+
+    def _local_update_region(self, gc):
+        """ Returns the update region as a list of coordinate rectangles in
+        the current user space of the GC, or None if the whole window is
+        being redrawn (or the GC is not the one of the window).
+        """
+        if (self._update_region is None or self._update_transform is None
+                or gc is not self._gc):
+            return None
+        # Window coordinates are mapped by the CTM of the window to device
+        # coordinates, which the inverse of the current CTM maps to user
+        # space.
+        transform = dot(self._update_transform,
+                        affine.invert(_affine(gc.get_ctm())))
+        result = []
+        for x, y, dx, dy in self._update_region:
+            corners = array(((x, y), (x + dx, y), (x, y + dy),
+                             (x + dx, y + dy)))
+            corners = affine.transform_points(transform, corners)
+            xl, yb = corners.min(axis=0)
+            xr, yt = corners.max(axis=0)
+            result.append((xl, yb, xr, yt))
+        return result
+
     def _window_paint(self, event):
         "Do a GUI toolkit specific screen update"
         raise NotImplementedError
@@ -223,6 +344,7 @@ class AbstractWindow(HasTraits):
             self.mouse_owner = None
             self.mouse_owner_transform = None
             self.mouse_owner_dispatch_history = None
+            self._history_transform_cache = None
         else:
             self._capture_mouse()
             self.mouse_owner = mouse_owner
@@ -230,12 +352,32 @@ class AbstractWindow(HasTraits):
             self.mouse_owner_dispatch_history = history
         return
 
+    def _history_transform(self, history):
+        """ Returns the net transform of the components in the dispatch
+        history of the mouse owner.  While their transforms don't change, as
+        during most drags, the previous net transform is reused.
+        """
+        key = []
+        for component in history:
+            component_key = component._event_transform_key()
+            if component_key is None:
+                key = None
+                break
+            key.append((id(component), component_key))
+        cache = self._history_transform_cache
+        if key is not None and cache is not None and cache[0] == key:
+            return cache[1]
+        transforms = [c.get_event_transform() for c in history]
+        total_transform = reduce(dot, transforms[::-1])
+        if key is not None:
+            self._history_transform_cache = (key, total_transform)
+        return total_transform
+
     def invalidate_draw(self, damaged_regions=None, self_relative=False):
         if damaged_regions is not None and self._update_region is not None:
             self._update_region += damaged_regions
         else:
             self._update_region = None
-#        print damaged_regions
 
     #---------------------------------------------------------------------------
     #  Generic keyboard event handler:
@@ -262,10 +404,7 @@ class AbstractWindow(HasTraits):
         if mouse_owner is not None:
             history = self.mouse_owner_dispatch_history
             if history is not None and len(history) > 0:
-                # Assemble all the transforms
-                transforms = [c.get_event_transform() for c in history]
-                total_transform = reduce(dot, transforms[::-1])
-                key_event.push_transform(total_transform)
+                key_event.push_transform(self._history_transform(history))
             elif self.mouse_owner_transform is not None:
                 key_event.push_transform(self.mouse_owner_transform)
 
@@ -301,7 +440,71 @@ class AbstractWindow(HasTraits):
         # if no mouse event generated for some reason, return
         if mouse_event is None:
             return False
-        
+
+        if self.coalesce_mouse_moves:
+            if event_name == "mouse_move":
+                return self._coalesce_mouse_move(mouse_event, set_focus)
+            # Other events must follow the last mouse move.
+            self._flush_mouse_move()
+
+        return self._dispatch_mouse_event(event_name, mouse_event, set_focus)
+
+    def _coalesce_mouse_move(self, mouse_event, set_focus):
+        """ Dispatches a mouse move, or holds it until the next paint or the
+        toolkit is idle if a mouse move was already dispatched since the last
+        paint.
+        """
+        if self._pending_mouse_move is not None:
+            self.dropped_mouse_moves += 1
+            self._pending_mouse_move = (mouse_event, set_focus)
+        elif self._mouse_move_dispatched:
+            self._pending_mouse_move = (mouse_event, set_focus)
+            if not self._invoke_later(self._flush_mouse_move):
+                # Without an idle callback, make sure that there is a next
+                # paint.
+                self._redraw()
+        else:
+            self._mouse_move_dispatched = True
+            return self._dispatch_mouse_event("mouse_move", mouse_event,
+                                              set_focus)
+        # The held event is handled by the window
+        return True
+
+    def _flush_mouse_move(self):
+        """ Dispatches the held mouse move, if any.
+        """
+        pending = self._pending_mouse_move
+        if pending is not None:
+            self._pending_mouse_move = None
+            self.merged_mouse_moves += 1
+            mouse_event, set_focus = pending
+            self._dispatch_mouse_event("mouse_move", mouse_event, set_focus)
+
+    def _invoke_later(self, callable):
+        """ Calls **callable** once the toolkit has processed the pending
+        events.
+
+        Returns False if the backend can't do it, so that the caller can fall
+        back on the next paint.
+        """
+        return False
+
+    def _begin_paint(self):
+        """ Called by _paint() before the layout and drawing of each paint.
+        """
+        # Dispatch the held mouse move now, so that the paint shows its
+        # effects.  If there was none, the next mouse move is dispatched
+        # immediately.
+        self._mouse_move_dispatched = self._pending_mouse_move is not None
+        self._flush_mouse_move()
+
+    def _dispatch_mouse_event(self, event_name, mouse_event, set_focus=False):
+        """ Dispatches an Enable mouse event to the mouse owner or the
+        component, and sets the focus if requested.
+
+        Returns True if the event has been handled within the Enable object
+        hierarchy, or False otherwise.
+        """
         mouse_owner = self.mouse_owner
 
         if mouse_owner is not None:
@@ -311,10 +514,7 @@ class AbstractWindow(HasTraits):
             # transform.
             history = self.mouse_owner_dispatch_history
             if history is not None and len(history) > 0:
-                # Assemble all the transforms
-                transforms = [c.get_event_transform() for c in history]
-                total_transform = reduce(dot, transforms[::-1])
-                mouse_event.push_transform(total_transform)
+                mouse_event.push_transform(self._history_transform(history))
             elif self.mouse_owner_transform is not None:
                 mouse_event.push_transform(self.mouse_owner_transform)
 
@@ -434,11 +634,16 @@ class AbstractWindow(HasTraits):
         self.control = None
         if self._gc is not None :
             self._gc.window = None
+            self._release_gc(self._gc)
             self._gc = None
 
     def _needs_redraw(self, bounds):
         "Determine if a specified region intersects the update region"
-        return does_disjoint_intersect_coordinates( self._update_region,
+        update_region = self._update_region
+        if update_region is not None:
+            update_region = [bounds_to_coordinates( region )
+                             for region in update_region]
+        return does_disjoint_intersect_coordinates( update_region,
                                                     bounds_to_coordinates( bounds ) )
 
     def _paint(self, event=None):
@@ -451,28 +656,39 @@ class AbstractWindow(HasTraits):
             self._window_paint(event)
             return
 
+        self._begin_paint()
+
         # Create a new GC if necessary
         size = self._get_control_size()
         if (self._size != tuple(size)) or (self._gc is None):
             self._size = tuple(size)
+            if self._gc is not None:
+                self._release_gc(self._gc)
             self._gc = self._create_gc(size)
 
-        # Always give the GC a chance to initialize
-        self._init_gc()
+        if self._update_region is not None and self.use_damaged_region:
+            self._update_region = (self._update_region +
+                                   self._get_paint_region(event))
 
-        # Layout components and draw
-        if hasattr(self.component, "do_layout"):
-            self.component.do_layout()
+        # The clipping to the update region is undone after drawing, since
+        # the GC is reused for the next paint.
         gc = self._gc
-        self.component.draw(gc, view_bounds=(0, 0, size[0], size[1]))
+        with gc:
+            # Always give the GC a chance to initialize
+            self._init_gc()
+
+            # Layout components and draw
+            if hasattr(self.component, "do_layout"):
+                self.component.do_layout()
+            self.component.draw(gc, view_bounds=(0, 0, size[0], size[1]))
+        self._update_transform = None
 
-#        damaged_regions = draw_result['damaged_regions']
-        # FIXME: consolidate damaged regions if necessary
         if not self.use_damaged_region:
             self._update_region = None
 
         # Perform a paint of the GC to the window (only necessary on backends
-        # that render to an off-screen buffer)
+        # that render to an off-screen buffer).  If _update_region is not
+        # None, only its (disjoint) bounds need to be copied to the window.
         self._window_paint(event)
 
         self._update_region = []
@@ -24,7 +24,9 @@ from markers import MarkerTrait, marker_trait, MarkerNameDict, marker_names, \
     CustomMarker, AbstractMarker
 
 from events import drag_event_trait, key_event_trait, mouse_event_trait, \
-    BasicEvent, BlobEvent, BlobFrameEvent, DragEvent, KeyEvent, MouseEvent
+    BasicEvent, BlobEvent, BlobFrameEvent, DragEvent, KeyEvent, MouseEvent, \
+    LightweightEvent, LightweightDragEvent, LightweightKeyEvent, \
+    LightweightMouseEvent
 from interactor import Interactor
 from base_tool import BaseTool, KeySpec
 
@@ -11,6 +11,7 @@ Enable package.
 #                     disjoint_intersect_coordinates
 #                     does_disjoint_intersect_coordinates
 #                     bounding_coordinates
+#                     coalesce_coordinates
 #                     bounds_to_coordinates
 #                     coordinates_to_bounds
 #                     coordinates_to_size
@@ -205,6 +206,32 @@ def bounding_coordinates ( coordinates_list ):
         yt = max( yt, yt1 )
     return ( xl, yb, xr, yt )
 
+def coalesce_coordinates ( coordinates_list ):
+    """ Merge the overlapping rectangles of a list of coordinate rectangles
+    into their bounding rectangles, until none of them overlap.  Returns a
+    list of disjoint rectangles covering the same area (and possibly more).
+    """
+    result = []
+    for coordinates in coordinates_list:
+        xl1, yb1, xr1, yt1 = coordinates
+        if (xr1 <= xl1) or (yt1 <= yb1):
+            continue
+        # Merging two rectangles can make the result overlap rectangles
+        # which were already checked, so check them all again.
+        i = 0
+        while i < len( result ):
+            xl2, yb2, xr2, yt2 = result[i]
+            if ((min( xr1, xr2 ) >= max( xl1, xl2 )) and
+                (min( yt1, yt2 ) >= max( yb1, yb2 ))):
+                del result[i]
+                xl1, yb1 = min( xl1, xl2 ), min( yb1, yb2 )
+                xr1, yt1 = max( xr1, xr2 ), max( yt1, yt2 )
+                i = 0
+            else:
+                i += 1
+        result.append( ( xl1, yb1, xr1, yt1 ) )
+    return result
+
 def bounds_to_coordinates ( bounds ):
     "Convert a bounds rectangle to a coordinate rectangle"
     x, y, dx, dy = bounds
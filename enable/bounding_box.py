@@ -0,0 +1,110 @@
+""" Defines the BoundingBox class, which keeps the bounding box of a set of
+rectangles up to date as they change.
+"""
+
+
+class BoundingBox(object):
+    """ The bounding box of a set of items, each with a rectangle, which is
+    updated incrementally as the items are added, moved and removed.
+
+    For each edge of the bounding box, the items whose rectangle reaches it
+    are kept.  An item which extends the bounding box, or which moves while
+    not on an edge, only costs a few comparisons; the bounding box is only
+    recomputed from all the items when an edge loses the last item which
+    reached it.  Rectangles are given as coordinates (x, y, x2, y2).
+    """
+
+    def __init__(self):
+        # Maps items to their coordinates
+        self._items = {}
+        # The coordinates of the bounding box as a list, or None if it
+        # needs to be recomputed
+        self._box = None
+        # For each edge, the set of items which reach it
+        self._extremes = None
+        # The number of times the bounding box was recomputed from all the
+        # items
+        self.recomputes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def clear(self):
+        """ Removes all the items. """
+        self._items.clear()
+        self._box = self._extremes = None
+
+    def insert(self, item, coordinates):
+        """ Adds an item with the given rectangle, or moves it if it is
+        already in the bounding box.
+        """
+        coordinates = tuple(coordinates)
+        self._items[item] = coordinates
+        box = self._box
+        if box is None:
+            return
+        for i, value in enumerate(coordinates):
+            edge = box[i]
+            extremes = self._extremes[i]
+            if (value < edge) if i < 2 else (value > edge):
+                box[i] = value
+                self._extremes[i] = set([item])
+            elif value == edge:
+                extremes.add(item)
+            elif item in extremes:
+                extremes.discard(item)
+                if not extremes:
+                    self._box = self._extremes = None
+                    return
+
+    def remove(self, item):
+        """ Removes an item, if it is in the bounding box. """
+        if self._items.pop(item, None) is None or self._box is None:
+            return
+        for extremes in self._extremes:
+            extremes.discard(item)
+            if not extremes:
+                self._box = self._extremes = None
+                return
+
+    def translate(self, dx, dy):
+        """ Moves all the items by (dx, dy). """
+        offset = (dx, dy, dx, dy)
+        items = self._items
+        for item, coordinates in items.iteritems():
+            items[item] = tuple([c + d for c, d in zip(coordinates, offset)])
+        if self._box is not None:
+            self._box = [c + d for c, d in zip(self._box, offset)]
+
+    def coordinates(self):
+        """ Returns the coordinates (x, y, x2, y2) of the bounding box, or
+        None if there are no items.
+        """
+        if self._box is None:
+            if not self._items:
+                return None
+            self._recompute()
+        return tuple(self._box)
+
+    def _recompute(self):
+        items = self._items.items()
+        box = list(items[0][1])
+        for item, (x, y, x2, y2) in items:
+            if x < box[0]:
+                box[0] = x
+            if y < box[1]:
+                box[1] = y
+            if x2 > box[2]:
+                box[2] = x2
+            if y2 > box[3]:
+                box[3] = y2
+        self._extremes = [set() for i in range(4)]
+        for item, coordinates in items:
+            for i in range(4):
+                if coordinates[i] == box[i]:
+                    self._extremes[i].add(item)
+        self._box = box
+        self.recomputes += 1
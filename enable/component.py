@@ -4,10 +4,14 @@ from __future__ import with_statement
 
 from uuid import uuid4
 
+# Major library imports
+import numpy
+
 # Enthought library imports
 from traits.api \
     import Any, Bool, Delegate, Enum, Float, Instance, Int, List, \
-           Property, Str, Trait
+           Property, Str, Trait, on_trait_change
+from kiva.buffer_pool import default_pool
 from kiva.constants import FILL, STROKE
 
 # Local relative imports
@@ -23,6 +27,31 @@ coordinate_delegate = Delegate("inner", modify=True)
 DEFAULT_DRAWING_ORDER = ["background", "underlay", "mainlayer", "border", "overlay"]
 
 
+def _unpremultiply_alpha(gc):
+    """ Divides the colors of the pixels of an image GraphicsContext by their
+    alpha.
+
+    Drawing onto a transparent image leaves colors multiplied by their alpha,
+    which draw_image() would apply a second time.  GraphicsContexts without a
+    pixel array are left unchanged.
+    """
+    pixels = getattr(gc, "bmp_array", None)
+    if pixels is None or pixels.shape[-1] != 4:
+        return
+    alpha_index = 0 if gc.format().startswith("a") else 3
+    alpha = pixels[..., alpha_index]
+    partial = (alpha > 0) & (alpha < 255)
+    if not partial.any():
+        return
+    color_indices = [i for i in range(4) if i != alpha_index]
+    alpha = alpha[partial].astype(float)
+    for i in color_indices:
+        channel = pixels[..., i]
+        channel[partial] = numpy.minimum(
+            channel[partial] * 255.0 / alpha + 0.5, 255).astype(numpy.uint8)
+    return
+
+
 class Component(CoordinateBox, Interactor):
     """
     Component is the base class for most Enable objects.  In addition to the
@@ -284,6 +313,13 @@ class Component(CoordinateBox, Interactor):
     # Should the backbuffer extend to the pad area?
     backbuffer_padding = Bool(True)
 
+    # The layers of draw_order which are cached in backbuffers of their own,
+    # when use_backbuffer is False.  A cached layer is rendered into a
+    # transparent offscreen buffer, which is blitted by the following draws
+    # until invalidate_layer() is called for the layer, or invalidate_draw()
+    # for the whole component.
+    cached_layers = List(Str)
+
     # If a draw were to occur, whether the component would actually change.
     # This is useful for determining whether a backbuffer is valid, and is
     # usually set by the component itself or set on the component by calling
@@ -302,7 +338,12 @@ class Component(CoordinateBox, Interactor):
 
     # The backbuffer of this component.  In most cases, this is an
     # instance of GraphicsContext, but this requirement is not enforced.
-    _backbuffer = Any
+    # The backbuffers, like the window of a component, are not pickled.
+    _backbuffer = Any(transient=True)
+
+    # The backbuffers of the cached layers, as a dict mapping the name of a
+    # layer to a tuple (GraphicsContext, (x, y, width, height)).
+    _layer_backbuffers = Instance(dict, (), transient=True)
 
     #------------------------------------------------------------------------
     # New layout/object containment hierarchy traits
@@ -332,7 +373,7 @@ class Component(CoordinateBox, Interactor):
 
     # Shadow trait for self.window.  Only gets set if this is the top-level
     # enable component in a Window.
-    _window = Any    # Instance("Window")
+    _window = Any(transient=True)    # Instance("Window")
 
     # Whether or not component itself needs to be laid out.  Some times
     # components are composites of others, in which case the layout
@@ -547,7 +588,34 @@ class Component(CoordinateBox, Interactor):
         Call this method whenever a component's internal state
         changes such that it must be redrawn on the next draw() call."""
         self.draw_valid = False
+        if self._layer_backbuffers:
+            for bb, rect in self._layer_backbuffers.values():
+                self._release_backbuffer(bb)
+            self._layer_backbuffers.clear()
+        self._notify_damaged_regions(damaged_regions, self_relative)
+        return
+
+    def invalidate_layer(self, layer, damaged_regions=None,
+                         self_relative=False):
+        """ Invalidates the backbuffer of one layer of this component, and
+        notifies our parents and viewports of any damaged regions.
+
+        Unlike invalidate_draw(), this keeps the backbuffers of the other
+        layers of this component and of its containers.  Call this method
+        when only the content of **layer** changes.
+        """
+        self.draw_valid = False
+        cache = self._layer_backbuffers.pop(layer, None)
+        if cache is not None:
+            self._release_backbuffer(cache[0])
+        self._notify_damaged_regions(damaged_regions, self_relative, layer)
+        return
 
+    def _notify_damaged_regions(self, damaged_regions, self_relative,
+                                layer=None):
+        """ Notifies our parents and viewports of damaged regions, which
+        are in the given layer, or in all the layers if **layer** is None.
+        """
         if damaged_regions is None:
             damaged_regions = self._default_damaged_regions()
 
@@ -559,7 +627,14 @@ class Component(CoordinateBox, Interactor):
                                  view_relative=True)
 
         if self.container is not None:
-            self.container.invalidate_draw(damaged_regions=damaged_regions, self_relative=True)
+            if layer is None:
+                self.container.invalidate_draw(damaged_regions=damaged_regions, self_relative=True)
+            else:
+                # The container draws a unified component in a single layer.
+                if self.unified_draw:
+                    layer = self.draw_layer
+                self.container.invalidate_layer(layer, damaged_regions=damaged_regions,
+                                                self_relative=True)
 
         if self._window is not None:
             self._window.invalidate_draw(damaged_regions=damaged_regions, self_relative=True)
@@ -588,6 +663,13 @@ class Component(CoordinateBox, Interactor):
         """When a window viewing or containing a component is destroyed,
         cleanup is called on the component to give it the opportunity to
         delete any transient state it may have (such as backbuffers)."""
+        if self._backbuffer is not None:
+            self._release_backbuffer(self._backbuffer)
+            self._backbuffer = None
+        if self._layer_backbuffers:
+            for bb, rect in self._layer_backbuffers.values():
+                self._release_backbuffer(bb)
+            self._layer_backbuffers.clear()
         return
 
     def set_outer_position(self, ndx, val):
@@ -733,14 +815,10 @@ class Component(CoordinateBox, Interactor):
                 width, height = self.bounds
 
             if not self.draw_valid:
-                # get a reference to the GraphicsContext class from the object
-                GraphicsContext = gc.__class__
-                if hasattr(GraphicsContext, 'create_from_gc'):
-                    # For some backends, such as the mac, a much more efficient
-                    # backbuffer can be created from the window gc.
-                    bb = GraphicsContext.create_from_gc(gc, (int(width), int(height)))
-                else:
-                    bb = GraphicsContext((int(width), int(height)))
+                if self._backbuffer is not None:
+                    self._release_backbuffer(self._backbuffer)
+                    self._backbuffer = None
+                bb = self._create_backbuffer(gc, width, height)
 
                 # if not fill_padding, then we have to fill the backbuffer
                 # with the window color. This is the only way I've found that
@@ -772,9 +850,65 @@ class Component(CoordinateBox, Interactor):
             gc.draw_image(self._backbuffer, (x, y, width, height))
             self._dispatch_draw("overlay", gc, view_bounds, mode)
         else:
+            cached_layers = self.cached_layers if not is_gl else ()
             for layer in self.draw_order:
-                self._dispatch_draw(layer, gc, view_bounds, mode)
+                if layer in cached_layers:
+                    self._draw_cached_layer(layer, gc, view_bounds, mode)
+                else:
+                    self._dispatch_draw(layer, gc, view_bounds, mode)
+
+        return
+
+    def _create_backbuffer(self, gc, width, height):
+        """ Returns a new offscreen GraphicsContext of the given size, of the
+        same kind as **gc**.
+        """
+        from kiva.agg import GraphicsContextArray
+        if isinstance(gc, GraphicsContextArray):
+            # Agg backbuffers draw into the buffers of a pool, which are
+            # reused when the backbuffers are replaced or resized.
+            return default_pool.create_gc((int(width), int(height)),
+                                          pix_format=gc.format())
+
+        # get a reference to the GraphicsContext class from the object
+        GraphicsContext = gc.__class__
+        if hasattr(GraphicsContext, 'create_from_gc'):
+            # For some backends, such as the mac, a much more efficient
+            # backbuffer can be created from the window gc.
+            return GraphicsContext.create_from_gc(gc, (int(width), int(height)))
+        else:
+            return GraphicsContext((int(width), int(height)))
 
+    def _release_backbuffer(self, bb):
+        """ Returns the buffer of a backbuffer which is not used anymore to
+        its pool, if it has one.
+        """
+        default_pool.release_gc(bb)
+
+    def _draw_cached_layer(self, layer, gc, view_bounds, mode):
+        """ Blits the backbuffer of the named *layer*, after rendering the
+        layer into it if it is not valid.
+        """
+        if self.backbuffer_padding:
+            rect = tuple(self.outer_position) + tuple(self.outer_bounds)
+        else:
+            rect = tuple(self.position) + tuple(self.bounds)
+
+        cache = self._layer_backbuffers.get(layer)
+        if cache is None or cache[1] != rect:
+            if cache is not None:
+                self._release_backbuffer(cache[0])
+            x, y, width, height = rect
+            bb = self._create_backbuffer(gc, width, height)
+            bb.clear((0.0, 0.0, 0.0, 0.0))
+            bb.translate_ctm(-x, -y)
+            # The cache is kept while only the view bounds change, as when
+            # a viewport scrolls, so the whole layer is drawn into it.
+            self._dispatch_draw(layer, bb, None, mode)
+            _unpremultiply_alpha(bb)
+            cache = self._layer_backbuffers[layer] = (bb, rect)
+
+        gc.draw_image(cache[0], rect)
         return
 
     def _dispatch_draw(self, layer, gc, view_bounds, mode):
@@ -1105,6 +1239,15 @@ class Component(CoordinateBox, Interactor):
             self.container._component_bounds_changed(self)
         return
 
+    @on_trait_change("padding_left, padding_right, padding_top, "
+                     "padding_bottom, border_visible, border_width, "
+                     "inset_border")
+    def _outer_box_changed(self):
+        # The outer position and bounds move with the padding and border.
+        if self.container is not None:
+            self.container._component_bounds_changed(self)
+        return
+
     def _container_changed(self, old, new):
         # We don't notify our container of this change b/c the
         # caller who changed our .container should take care of that.
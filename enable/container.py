@@ -3,17 +3,51 @@
 from __future__ import with_statement
 
 # Major library imports
+from contextlib import contextmanager
 import warnings
 
 # Enthought library imports
 from kiva import affine
-from traits.api import Any, Bool, Enum, HasTraits, Instance, List, \
+from traits.api import Any, Bool, Enum, Float, HasTraits, Instance, List, \
         Property, Tuple
 
 # Local, relative imports
-from base import empty_rectangle, intersect_bounds
+from base import bounds_to_coordinates, does_disjoint_intersect_coordinates, \
+    empty_rectangle, intersect_bounds
+from bounding_box import BoundingBox
 from component import Component
 from events import BlobEvent, BlobFrameEvent, DragEvent, MouseEvent
+from spatial_index import GridIndex
+
+
+class _LayoutTransaction(object):
+    """ The notifications which a container defers during a
+    layout_transaction().
+    """
+
+    def __init__(self):
+        # The components whose position or bounds changed
+        self.components = set()
+        # Whether the default damaged regions of the container are damaged
+        self.damaged = False
+        # Maps the damaged layers (None for all the layers) to the union
+        # (x, y, x2, y2) of their damaged regions, in the coordinate frame
+        # of the parent of the container
+        self.damaged_layers = {}
+        # Whether a redraw was requested
+        self.redraw = False
+
+    def add_damage(self, layer, regions):
+        rects = self.damaged_layers
+        for x, y, w, h in regions:
+            rect = rects.get(layer)
+            if rect is None:
+                rects[layer] = [x, y, x + w, y + h]
+            else:
+                rect[0] = min(rect[0], x)
+                rect[1] = min(rect[1], y)
+                rect[2] = max(rect[2], x + w)
+                rect[3] = max(rect[3], y + h)
 
 
 class Container(Component):
@@ -74,6 +108,18 @@ class Container(Component):
     # under the component layers of the same name.
     container_under_layers = Tuple("background", "image", "underlay", "mainlayer")
 
+    # Whether to keep a spatial index of the components, so that hit testing
+    # and finding the components to draw don't check every component.  This
+    # is worth it for containers with thousands of components.  The index is
+    # updated when the position or bounds of a component change; if they are
+    # changed without notification (or the padding of a component changes),
+    # call invalidate_spatial_index().  Components with an is_in() method
+    # which accepts points outside of their outer bounds are not supported.
+    use_spatial_index = Bool(False)
+
+    # The size of the cells of the spatial index
+    spatial_index_cell_size = Float(64.0)
+
     #------------------------------------------------------------------------
     # Private traits
     #------------------------------------------------------------------------
@@ -84,7 +130,7 @@ class Container(Component):
     # Set of components that last handled a mouse event.  We keep track of
     # this so that we can generate mouse_enter and mouse_leave events of
     # our own.
-    _prev_event_handlers = Instance( set, () )
+    _prev_event_handlers = Instance( set, (), transient=True )
 
     # This container can render itself in a different mode than what it asks of
     # its contained components.  This attribute stores the rendering mode that
@@ -93,6 +139,21 @@ class Container(Component):
     # is used.
     _children_draw_mode = Enum("default", "normal", "overlay", "interactive")
 
+    # The spatial index of the components (a GridIndex), or None if it needs
+    # to be rebuilt
+    _spatial_index = Any(transient=True)
+
+    # Maps each component to its position in the components list, for
+    # ordering the results of the spatial index
+    _spatial_order = Any(transient=True)
+
+    # The BoundingBox of the outer bounds of the components, or None if it
+    # needs to be rebuilt
+    _bounding_box_tracker = Any(transient=True)
+
+    # The _LayoutTransaction of the current layout_transaction(), if any
+    _layout_transaction = Any(transient=True)
+
     #------------------------------------------------------------------------
     # Public methods
     #------------------------------------------------------------------------
@@ -159,7 +220,12 @@ class Container(Component):
         if self.is_in(x,y):
             xprime = x - self.position[0]
             yprime = y - self.position[1]
-            for component in self._components[::-1]:
+            if self.use_spatial_index:
+                components = self._indexed_components(
+                    self._get_spatial_index().query_point(xprime, yprime))
+            else:
+                components = self._components
+            for component in components[::-1]:
                 if component.is_in(xprime, yprime):
                     result.append(component)
         return result
@@ -183,8 +249,46 @@ class Container(Component):
         if self._components:
             for component in self._components:
                 component.cleanup(window)
+        super(Container, self).cleanup(window)
         return
 
+    @contextmanager
+    def layout_transaction(self):
+        """ A context manager which defers the notifications of the changes
+        made to the components until it exits.
+
+        The changes to the positions and bounds of the components are
+        processed in one go, with a single compact() if **auto_size** is
+        True.  The damaged regions, from this container and from its
+        components, are sent to the container and window of this container
+        as a single damaged rectangle per layer, and the redraw requests are
+        merged into one.  Transactions can be nested; only the outermost one
+        sends the notifications.  do_layout() runs in a transaction.
+        """
+        if self._layout_transaction is not None:
+            yield
+            return
+        transaction = self._layout_transaction = _LayoutTransaction()
+        try:
+            yield
+        finally:
+            self._commit_layout_transaction(transaction)
+
+    def request_redraw(self):
+        if self._layout_transaction is not None:
+            self._layout_transaction.redraw = True
+        else:
+            super(Container, self).request_redraw()
+
+    def do_layout(self, size=None, force=False):
+        with self.layout_transaction():
+            super(Container, self).do_layout(size, force)
+
+    def invalidate_spatial_index(self):
+        """ Causes the spatial index to be rebuilt when it is next used.
+        """
+        self._spatial_index = None
+
     def compact(self):
         """
         Causes this container to update its bounds to be a compact bounding
@@ -192,18 +296,20 @@ class Container(Component):
         and adjust its position relative to its parent container (and adjust
         the positions of all of its contained components accordingly).
         """
-        # Loop over our components and determine the bounding box of all of
-        # the components.
         ll_x, ll_y, ur_x, ur_y = self._calc_bounding_box()
-        if len(self._components) > 0:
-            # Update our position and the positions of all of our components,
-            # but do it quietly
+        if len(self._components) > 0 and (ll_x != 0 or ll_y != 0):
+            # Update the positions of all of our components in one pass, but
+            # do it quietly, and move them in the bounding box tracker
+            # rather than one by one.
             for component in self._components:
-                component.set(position = [component.x-ll_x, component.y-ll_y],
+                x, y = component.position
+                component.set(position = [x-ll_x, y-ll_y],
                               trait_change_notify = False)
+            if self._bounding_box_tracker is not None:
+                self._bounding_box_tracker.translate(-ll_x, -ll_y)
+            self.invalidate_spatial_index()
 
-            # Change our position (in our parent's coordinate frame) and
-            # update our bounds
+            # Change our position (in our parent's coordinate frame)
             self.position = [self.x + ll_x, self.y + ll_y]
 
         self.bounds = [ur_x - ll_x, ur_y - ll_y]
@@ -217,27 +323,31 @@ class Container(Component):
         """
         Returns a 4-tuple (x,y,x2,y2) of the bounding box of all our contained
         components.  Expressed as coordinates in our local coordinate frame.
+
+        The bounding box is kept up to date as the components move, so this
+        does not usually need to look at every component.
         """
         if len(self._components) == 0:
             return (0.0, 0.0, 0.0, 0.0)
-        else:
-            comp = self._components[0]
-            ll_x = comp.outer_x
-            ll_y = comp.outer_y
-            ur_x = comp.outer_x2
-            ur_y = comp.outer_y2
-
-        for component in self._components[1:]:
-            if component.x < ll_x:
-                ll_x = component.x
-            if component.x2 > ur_x:
-                ur_x = component.x2
-            if component.y < ll_y:
-                ll_y = component.y
-            if component.y2 > ur_y:
-                ur_y = component.y2
-        return (ll_x, ll_y, ur_x, ur_y)
+        return self._get_bounding_box_tracker().coordinates()
+
+    def _get_bounding_box_tracker(self):
+        """ Returns the BoundingBox of the components, building it if needed.
+        """
+        tracker = self._bounding_box_tracker
+        if tracker is None:
+            tracker = BoundingBox()
+            for component in self._components:
+                tracker.insert(component, self._component_extent(component))
+            self._bounding_box_tracker = tracker
+        return tracker
 
+    def _component_extent(self, component):
+        """ Returns the coordinates (x, y, x2, y2) of the outer bounds of a
+        component.
+        """
+        x, y = component.outer_position
+        return (x, y, component.outer_x2, component.outer_y2)
 
     def _dispatch_draw(self, layer, gc, view_bounds, mode):
         """ Renders the named *layer* of this component.
@@ -261,6 +371,8 @@ class Container(Component):
         if visible_components:
             with gc:
                 gc.translate_ctm(*self.position)
+                visible_components = self._get_damaged_components(
+                    visible_components, gc)
                 for component in visible_components:
                     if component.unified_draw:
                         # Plot containers that want unified_draw only get
@@ -305,7 +417,7 @@ class Container(Component):
             return [c for c in self.components if c.visible]
 
         visible_components = []
-        for component in self.components:
+        for component in self._components_in_bounds(bounds):
             if not component.visible:
                 continue
             tmp = intersect_bounds(component.outer_position +
@@ -314,6 +426,117 @@ class Container(Component):
                 visible_components.append(component)
         return visible_components
 
+    def _get_damaged_components(self, components, gc):
+        """ Returns the components which intersect the damaged regions that
+        the window is repainting, given the GC with our coordinate system.
+        All the components are returned if the whole window is repainted.
+        """
+        window = self.window
+        if window is None:
+            return components
+        update_region = window._local_update_region(gc)
+        if update_region is None:
+            return components
+        return [c for c in components
+                if does_disjoint_intersect_coordinates(update_region,
+                    bounds_to_coordinates(c.outer_position + c.outer_bounds))]
+
+    def _components_in_bounds(self, bounds):
+        """ Returns the components which may intersect the given bounds, in
+        order.  Without a spatial index, this is all the components.
+        """
+        if not self.use_spatial_index:
+            return self.components
+        return self._indexed_components(self._get_spatial_index().query_rect(
+            bounds_to_coordinates(bounds)))
+
+    def _get_spatial_index(self):
+        """ Returns the spatial index of the components, building it if
+        needed.
+        """
+        if self._spatial_index is None:
+            index = GridIndex(self.spatial_index_cell_size)
+            for component in self._components:
+                index.insert(component, self._component_coordinates(component))
+            self._spatial_order = dict((component, i) for i, component in
+                                       enumerate(self._components))
+            self._spatial_index = index
+        return self._spatial_index
+
+    def _indexed_components(self, components):
+        """ Returns a set of components found with the spatial index as a
+        list, in the order of the components list.
+        """
+        order = self._spatial_order
+        return sorted(components, key=order.__getitem__)
+
+    def _component_coordinates(self, component):
+        return bounds_to_coordinates(component.outer_position +
+                                     component.outer_bounds)
+
+    def _update_spatial_index(self, component):
+        """ Moves a component whose position or bounds changed in the spatial
+        index, if the index is built.
+        """
+        index = self._spatial_index
+        if index is not None and component in index:
+            index.insert(component, self._component_coordinates(component))
+
+    def _update_bounding_box(self, component):
+        """ Moves a component whose position or bounds changed in the
+        bounding box tracker, if it is built.
+        """
+        tracker = self._bounding_box_tracker
+        if tracker is not None and component in tracker:
+            tracker.insert(component, self._component_extent(component))
+
+    def _commit_layout_transaction(self, transaction):
+        """ Sends the notifications deferred by a layout transaction.
+        """
+        # compact() runs before the transaction is closed, so that its damage
+        # is gathered too.
+        if transaction.components:
+            for component in transaction.components:
+                if component.container is self:
+                    self._update_spatial_index(component)
+                    self._update_bounding_box(component)
+            if self.auto_size:
+                self.compact()
+        self._layout_transaction = None
+
+        rects = transaction.damaged_layers
+        if transaction.damaged or None in rects:
+            # Damage to all the layers covers the damage to single layers.
+            regions = [[x, y, x2 - x, y2 - y]
+                       for x, y, x2, y2 in rects.values()]
+            if transaction.damaged:
+                regions.extend(self._default_damaged_regions())
+            self._notify_damaged_regions(regions, False)
+        else:
+            for layer, (x, y, x2, y2) in rects.items():
+                self._notify_damaged_regions([[x, y, x2 - x, y2 - y]], False,
+                                             layer)
+        if transaction.redraw:
+            self.request_redraw()
+
+    def _notify_damaged_regions(self, damaged_regions, self_relative,
+                                layer=None):
+        transaction = self._layout_transaction
+        if transaction is None:
+            super(Container, self)._notify_damaged_regions(
+                damaged_regions, self_relative, layer)
+        elif damaged_regions is None:
+            if layer is None:
+                transaction.damaged = True
+            else:
+                transaction.add_damage(layer, self._default_damaged_regions())
+        elif self_relative:
+            transaction.add_damage(
+                layer, [[x + self.x, y + self.y, w, h]
+                        for x, y, w, h in damaged_regions])
+        else:
+            transaction.add_damage(layer, damaged_regions)
+
     def _should_layout(self, component):
         """ Returns True if it is appropriate for the container to lay out
         the component; False if not.
@@ -329,14 +552,11 @@ class Container(Component):
         can overload this method as needed.
         """
         if self.auto_size:
-            width = self.width
-            height = self.height
-            for component in self.components:
-                x, y = component.outer_position
-                x2 = component.outer_x2
-                y2 = component.outer_y2
-                if (x2 >= width) or (y2 >= height) or (x < 0) or (y < 0):
-                    return True
+            if len(self._components) == 0:
+                return False
+            x, y, x2, y2 = self._calc_bounding_box()
+            return (x2 >= self.width) or (y2 >= self.height) or \
+                (x < 0) or (y < 0)
         else:
             return False
 
@@ -363,13 +583,21 @@ class Container(Component):
 
     def _component_bounds_changed(self, component):
         "Called by contained objects when their bounds change"
-        # For now, just punt and call compact()
+        if self._layout_transaction is not None:
+            self._layout_transaction.components.add(component)
+            return
+        self._update_spatial_index(component)
+        self._update_bounding_box(component)
         if self.auto_size:
             self.compact()
 
     def _component_position_changed(self, component):
         "Called by contained objects when their position changes"
-        # For now, just punt and call compact()
+        if self._layout_transaction is not None:
+            self._layout_transaction.components.add(component)
+            return
+        self._update_spatial_index(component)
+        self._update_bounding_box(component)
         if self.auto_size:
             self.compact()
 
@@ -428,6 +656,11 @@ class Container(Component):
     def get_event_transform(self, event=None, suffix=""):
         return affine.affine_from_translation(-self.x, -self.y)
 
+    def _event_transform_key(self):
+        if type(self).get_event_transform == Container.get_event_transform:
+            return (self.x, self.y)
+        return None
+
     def _dispatch_stateful_event(self, event, suffix):
         """
         Dispatches a mouse event based on the current event_state.  Overrides
@@ -572,11 +805,26 @@ class Container(Component):
 
     def __components_items_changed(self, event):
         self._layout_needed = True
+        self._spatial_index = None
+        tracker = self._bounding_box_tracker
+        if tracker is not None:
+            for component in event.removed:
+                tracker.remove(component)
+            for component in event.added:
+                tracker.insert(component, self._component_extent(component))
 
     def __components_changed(self, event):
         self._layout_needed = True
+        self._spatial_index = None
+        self._bounding_box_tracker = None
         self.invalidate_draw()
 
+    def _use_spatial_index_changed(self):
+        self._spatial_index = None
+
+    def _spatial_index_cell_size_changed(self):
+        self._spatial_index = None
+
     #-------------------------------------------------------------------------
     # Old / deprecated draw methods; here for backwards compatibility
     #-------------------------------------------------------------------------
@@ -606,7 +854,12 @@ class Container(Component):
         with gc:
             gc.set_antialias(False)
             gc.translate_ctm(*self.position)
-            for component in self.components:
+            if new_bounds:
+                components = self._components_in_bounds(new_bounds)
+            else:
+                components = self.components
+            components = self._get_damaged_components(components, gc)
+            for component in components:
                 if new_bounds:
                     tmp = intersect_bounds(component.outer_position +
                                            component.outer_bounds, new_bounds)
@@ -108,8 +108,9 @@ class CoordinateBox(HasTraits):
     # How strongly a layout box resists clipping its contents.
     resist_height = ConstraintPolicyEnum('strong')
 
-    # A namespace containing the constraints for this CoordinateBox
-    _constraints_vars = Instance(ConstraintsNamespace)
+    # A namespace containing the constraints for this CoordinateBox.  It is
+    # created again when needed after unpickling.
+    _constraints_vars = Instance(ConstraintsNamespace, transient=True)
 
     # The list of hard constraints which must be applied to the object.
     _hard_constraints = Property
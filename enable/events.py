@@ -5,43 +5,91 @@ For a list of all the possible event suffixes, see interactor.py.
 """
 
 # Major library imports
-from numpy import array, dot
+from numpy import array, dot, ndarray
 
 # Enthought imports
 from kiva import affine
-from traits.api import (Any, Bool, Float, HasTraits, Int,
-    Event, List, ReadOnly)
+from traits.api import (Any, Bool, Float, HasTraits, Instance, Int,
+    Event, List, ReadOnly, Undefined)
+from traits.has_traits import MetaHasTraits
 
 
-class BasicEvent(HasTraits):
+class _ScaleTranslation(object):
+    """ A transform which only scales and translates, x' = sx * x + tx and
+    y' = sy * y + ty.  It is applied with float arithmetic, and its affine
+    matrix is only created when it is needed.
+    """
 
-    x = Float
-    y = Float
+    __slots__ = ('sx', 'sy', 'tx', 'ty')
 
-    # True if the event has been handled.
-    handled = Bool(False)
+    def __init__(self, sx, sy, tx, ty):
+        self.sx = sx
+        self.sy = sy
+        self.tx = tx
+        self.ty = ty
 
-    # The AbstractWindow instance through/from which this event was fired.
-    # Can be None.
-    window = Any
+    def matrix(self):
+        return affine.affine_from_values(self.sx, 0.0, 0.0, self.sy,
+                                         self.tx, self.ty)
 
-    # (x,y) position stack; initialized to an empty list
-    _pos_stack = List( () )
 
-    # Affine transform stack; initialized to an empty list
-    _transform_stack = List( () )
+def _transform_xy(transform, x, y):
+    """ Returns the point (x, y) transformed by an affine matrix or a
+    _ScaleTranslation.
+    """
+    if isinstance(transform, _ScaleTranslation):
+        return transform.sx * x + transform.tx, transform.sy * y + transform.ty
+    if not isinstance(transform, ndarray):
+        transform = array(transform)
+    (a, b, _), (c, d, _), (tx, ty, _) = transform.tolist()
+    return a * x + c * y + tx, b * x + d * y + ty
 
-    # This is a list of objects that have transformed the event's
-    # coordinates.  This can be used to recreate the dispatch path
-    # that the event took.
-    dispatch_history = List()
+
+def _concat_transforms(transform1, transform2):
+    """ Returns the product of two affine matrices or _ScaleTranslations,
+    like dot(transform1, transform2).
+    """
+    if isinstance(transform1, _ScaleTranslation) and \
+            isinstance(transform2, _ScaleTranslation):
+        return _ScaleTranslation(
+            transform1.sx * transform2.sx, transform1.sy * transform2.sy,
+            transform1.tx * transform2.sx + transform2.tx,
+            transform1.ty * transform2.sy + transform2.ty)
+    if isinstance(transform1, _ScaleTranslation):
+        transform1 = transform1.matrix()
+    if isinstance(transform2, _ScaleTranslation):
+        transform2 = transform2.matrix()
+    return dot(transform1, transform2)
+
+
+class _EventMetaclass(MetaHasTraits):
+    """ The metaclass of the event classes.
+
+    isinstance() treats the instances of the lightweight class of an event
+    class as instances of the event class, so that the code which checks the
+    type of events, and the Event traits of event classes, accept both.
+    """
+
+    def __instancecheck__(cls, instance):
+        if type.__instancecheck__(cls, instance):
+            return True
+        lightweight_class = cls.__dict__.get('_lightweight_class')
+        return (lightweight_class is not None and
+                isinstance(instance, lightweight_class))
+
+
+class _EventMethods(object):
+    """ The methods of both the HasTraits and the lightweight events.
+    """
+
+    __slots__ = ()
 
     def push_transform(self, transform, caller=None):
         """
         Saves the current transform in a stack and sets the given transform
         to be the active one.
         """
-        x, y = dot(array((self.x, self.y, 1)), transform)[:2]
+        x, y = _transform_xy(transform, self.x, self.y)
         self._pos_stack.append((self.x, self.y))
         self._transform_stack.append(transform)
         self.x = x
@@ -73,7 +121,7 @@ class BasicEvent(HasTraits):
         Basically, a component calls event.offset_xy(\*self.position) to shift
         the event into its own coordinate frame.
         """
-        self.push_transform(affine.affine_from_translation(-origin_x, -origin_y))
+        self.push_transform(_ScaleTranslation(1.0, 1.0, -origin_x, -origin_y))
         if caller is not None:
             self.dispatch_history.append(caller)
         return
@@ -89,7 +137,7 @@ class BasicEvent(HasTraits):
         # Note that the meaning of scale_x and scale_y for Enable
         # is the inverted from the meaning for Kiva.affine.
         # TODO: Fix this discrepancy.
-        self.push_transform(affine.affine_from_scale(1/scale_x, 1/scale_y))
+        self.push_transform(_ScaleTranslation(1/scale_x, 1/scale_y, 0.0, 0.0))
         if caller is not None:
             self.dispatch_history.append(caller)
         return
@@ -103,7 +151,10 @@ class BasicEvent(HasTraits):
         if len(self._transform_stack) == 0:
             return affine.affine_identity()
         else:
-            return reduce(dot, self._transform_stack[::-1])
+            transform = reduce(_concat_transforms, self._transform_stack[::-1])
+            if isinstance(transform, _ScaleTranslation):
+                transform = transform.matrix()
+            return transform
 
     def current_pointer_position(self):
         """
@@ -118,6 +169,35 @@ class BasicEvent(HasTraits):
             self.y, self.handled)
         return s
 
+
+class BasicEvent(_EventMethods, HasTraits):
+
+    __metaclass__ = _EventMetaclass
+
+    x = Float
+    y = Float
+
+    # True if the event has been handled.
+    handled = Bool(False)
+
+    # The AbstractWindow instance through/from which this event was fired.
+    # Can be None.
+    window = Any
+
+    # (x,y) position stack; initialized to an empty list.  This and the
+    # transform stack are plain lists rather than List traits, which are much
+    # slower to push to and pop from.
+    _pos_stack = Instance(list, ())
+
+    # Affine transform stack; initialized to an empty list.  The transforms
+    # pushed by offset_xy() and scale_xy() are _ScaleTranslations.
+    _transform_stack = Instance(list, ())
+
+    # This is a list of objects that have transformed the event's
+    # coordinates.  This can be used to recreate the dispatch path
+    # that the event took.
+    dispatch_history = List()
+
 class MouseEvent(BasicEvent):
     alt_down     = ReadOnly
     control_down = ReadOnly
@@ -196,12 +276,12 @@ class BlobEvent(BasicEvent):
 
         This will also adjust x0 and y0.
         """
-        x, y = dot(array((self.x, self.y, 1)), transform)[:2]
+        x, y = _transform_xy(transform, self.x, self.y)
         self._pos_stack.append((self.x, self.y))
         self._transform_stack.append(transform)
         self.x = x
         self.y = y
-        x0, y0 = dot(array((self.x0, self.y0, 1)), transform)[:2]
+        x0, y0 = _transform_xy(transform, self.x0, self.y0)
         self.x0 = x0
         self.y0 = y0
         if caller is not None:
@@ -254,4 +334,119 @@ class BlobFrameEvent(BasicEvent):
 blob_frame_event_trait = Event(BlobFrameEvent)
 
 
+#-------------------------------------------------------------------------------
+#  Lightweight events
+#-------------------------------------------------------------------------------
+
+class LightweightEvent(_EventMethods):
+    """ An event with the attributes and methods of BasicEvent, which is not
+    a HasTraits object.
+
+    Its attributes are slots, without validation or notification, so it is
+    much faster to create and to dispatch.  The window backends create
+    lightweight events unless their **lightweight_events** trait is False.
+    isinstance() considers a lightweight event to be an instance of the
+    corresponding HasTraits event class.
+    """
+
+    __slots__ = ('x', 'y', 'handled', 'window', '_pos_stack',
+                 '_transform_stack', 'dispatch_history')
+
+    def __init__(self, x=0.0, y=0.0, handled=False, window=None):
+        self.x = float(x)
+        self.y = float(y)
+        self.handled = handled
+        self.window = window
+        self._pos_stack = []
+        self._transform_stack = []
+        self.dispatch_history = []
+
+
+class LightweightMouseEvent(LightweightEvent):
+    """ The lightweight version of MouseEvent.
+    """
+
+    __slots__ = ('alt_down', 'control_down', 'shift_down', 'left_down',
+                 'middle_down', 'right_down', 'mouse_wheel')
+
+    def __init__(self, x=0.0, y=0.0, handled=False, window=None,
+                 alt_down=Undefined, control_down=Undefined,
+                 shift_down=Undefined, left_down=Undefined,
+                 middle_down=Undefined, right_down=Undefined,
+                 mouse_wheel=Undefined):
+        # The attributes are set here rather than by the base class, which
+        # would be about twice as slow.
+        self.x = float(x)
+        self.y = float(y)
+        self.handled = handled
+        self.window = window
+        self._pos_stack = []
+        self._transform_stack = []
+        self.dispatch_history = []
+        self.alt_down = alt_down
+        self.control_down = control_down
+        self.shift_down = shift_down
+        self.left_down = left_down
+        self.middle_down = middle_down
+        self.right_down = right_down
+        self.mouse_wheel = mouse_wheel
+
+
+class LightweightDragEvent(LightweightEvent):
+    """ The lightweight version of DragEvent.
+    """
+
+    # The Qt backend gives drag events the toolkit MIME data as well.
+    __slots__ = ('x0', 'y0', 'copy', 'obj', 'start_event', 'mimedata')
+
+    def __init__(self, x=0.0, y=0.0, handled=False, window=None, x0=0.0,
+                 y0=0.0, copy=Undefined, obj=Undefined, start_event=Undefined,
+                 mimedata=None):
+        LightweightEvent.__init__(self, x, y, handled, window)
+        self.x0 = float(x0)
+        self.y0 = float(y0)
+        self.copy = copy
+        self.obj = obj
+        self.start_event = start_event
+        self.mimedata = mimedata
+
+    __repr__ = DragEvent.__repr__.im_func
+
+
+class LightweightKeyEvent(LightweightEvent):
+    """ The lightweight version of KeyEvent.
+    """
+
+    __slots__ = ('event_type', 'character', 'alt_down', 'control_down',
+                 'shift_down', 'event')
+
+    def __init__(self, x=0.0, y=0.0, handled=False, window=None,
+                 event_type=Undefined, character=Undefined,
+                 alt_down=Undefined, control_down=Undefined,
+                 shift_down=Undefined, event=Undefined):
+        LightweightEvent.__init__(self, x, y, handled, window)
+        self.event_type = event_type
+        self.character = character
+        self.alt_down = alt_down
+        self.control_down = control_down
+        self.shift_down = shift_down
+        self.event = event
+
+    __repr__ = KeyEvent.__repr__.im_func
+
+
+BasicEvent._lightweight_class = LightweightEvent
+MouseEvent._lightweight_class = LightweightMouseEvent
+DragEvent._lightweight_class = LightweightDragEvent
+KeyEvent._lightweight_class = LightweightKeyEvent
+
+# Maps the event classes to their lightweight versions
+lightweight_event_classes = {
+    BasicEvent: LightweightEvent,
+    MouseEvent: LightweightMouseEvent,
+    DragEvent: LightweightDragEvent,
+    KeyEvent: LightweightKeyEvent,
+}
+
+
 # EOF
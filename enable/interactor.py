@@ -99,6 +99,18 @@ class Interactor(HasTraits):
         """
         return affine_identity()
 
+    def _event_transform_key(self):
+        """ Returns a hashable value which changes whenever the result of
+        get_event_transform() does, or None if there is no such value.
+
+        Windows use it to reuse the transforms of the components an event
+        goes through.  Subclasses which override get_event_transform() should
+        override this method as well.
+        """
+        if type(self).get_event_transform == Interactor.get_event_transform:
+            return ()
+        return None
+
     def _dispatch_stateful_event(self, event, suffix):
         """
         Protected method to dispatch a mouse or keyboard based on the current
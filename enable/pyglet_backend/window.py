@@ -138,7 +138,7 @@ class PygletWindow(window.Window):
             else:
                 key = key_code
 
-        return KeyEvent(
+        return self.enable_window._make_event(KeyEvent,
             event_type = event_type,
             character = key,
             alt_down = keys[key.LALT] | keys[key.RALT],
@@ -146,7 +146,7 @@ class PygletWindow(window.Window):
             shift_down = keys[key.LSHIFT] | keys[key.RSHIFT],
             x = self._mouse_x,
             y = self._mouse_y,
-            window = self.enable_window)        
+            window = self.enable_window)
 
     def on_text_motion(self, motion):
         # TODO: See notes.
@@ -375,29 +375,31 @@ class Window(AbstractWindow):
             buttons = event.buttons
             if buttons is None:
                 buttons = 0
-            return MouseEvent( x = x, y = y,
-                               alt_down     = event.alt_pressed,
-                               control_down = event.ctrl_pressed,
-                               shift_down   = event.shift_pressed,
-                               left_down    = bool(mouse.LEFT & buttons),
-                               middle_down  = bool(mouse.MIDDLE & buttons),
-                               right_down   = bool(mouse.RIGHT & buttons),
-                               mouse_wheel  = event.scroll_y,
-                               window = self)
+            return self._make_event(MouseEvent,
+                                    x = x, y = y,
+                                    alt_down     = event.alt_pressed,
+                                    control_down = event.ctrl_pressed,
+                                    shift_down   = event.shift_pressed,
+                                    left_down    = bool(mouse.LEFT & buttons),
+                                    middle_down  = bool(mouse.MIDDLE & buttons),
+                                    right_down   = bool(mouse.RIGHT & buttons),
+                                    mouse_wheel  = event.scroll_y,
+                                    window = self)
         else:
             # If no event specified, make one up:
             x = self.control._mouse_x
             y = self.control._mouse_y
             self._last_mouse_pos = (x, y)
-            return MouseEvent( x = x, y = y,
-                               alt_down     = event.alt_pressed,
-                               control_down = event.ctrl_pressed,
-                               shift_down   = event.shift_pressed,
-                               left_down    = False,
-                               middle_down  = False,
-                               right_down   = False,
-                               mouse_wheel  = 0,
-                               window = self)
+            return self._make_event(MouseEvent,
+                                    x = x, y = y,
+                                    alt_down     = event.alt_pressed,
+                                    control_down = event.ctrl_pressed,
+                                    shift_down   = event.shift_pressed,
+                                    left_down    = False,
+                                    middle_down  = False,
+                                    right_down   = False,
+                                    mouse_wheel  = 0,
+                                    window = self)
 
     def _create_gc(self, size, pix_format = "rgba32"):
         "Create a Kiva graphics context of a specified size."
@@ -419,6 +421,11 @@ class Window(AbstractWindow):
         if self.control is not None:
             self.control.request_redraw(coordinates)
 
+    def _invoke_later(self, callable):
+        "Call the callable on the next tick of the pyglet clock"
+        pyglet.clock.schedule_once(lambda dt: callable(), 0)
+        return True
+
     def _get_control_size(self):
         "Get the size of the underlying toolkit control"
         if self.control is not None:
@@ -463,6 +470,7 @@ class Window(AbstractWindow):
         # Override the base class _paint() method because we need to call
         # _create_gc() each time *before* self.component draws.
 
+        self._begin_paint()
         size = self._get_control_size()
         self._size = tuple(size)
         self._gc = self._create_gc(size)
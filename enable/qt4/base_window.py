@@ -373,13 +373,14 @@ class _Window(AbstractWindow):
 
         modifiers = event.modifiers()
 
-        return KeyEvent(event_type=event_type, character=key, x=x,
-                        y=self._flip_y(y),
-                        alt_down=bool(modifiers & QtCore.Qt.AltModifier),
-                        shift_down=bool(modifiers & QtCore.Qt.ShiftModifier),
-                        control_down=bool(modifiers & QtCore.Qt.ControlModifier),
-                        event=event,
-                        window=self)
+        return self._make_event(KeyEvent,
+                event_type=event_type, character=key, x=x,
+                y=self._flip_y(y),
+                alt_down=bool(modifiers & QtCore.Qt.AltModifier),
+                shift_down=bool(modifiers & QtCore.Qt.ShiftModifier),
+                control_down=bool(modifiers & QtCore.Qt.ControlModifier),
+                event=event,
+                window=self)
 
     def _create_mouse_event(self, event):
         # If the control no longer exists, don't send mouse event
@@ -410,7 +411,8 @@ class _Window(AbstractWindow):
         else:
             mouse_wheel = 0
 
-        return MouseEvent(x=x, y=self._flip_y(y), mouse_wheel=mouse_wheel,
+        return self._make_event(MouseEvent,
+                x=x, y=self._flip_y(y), mouse_wheel=mouse_wheel,
                 alt_down=bool(modifiers & QtCore.Qt.AltModifier),
                 shift_down=bool(modifiers & QtCore.Qt.ShiftModifier),
                 control_down=bool(modifiers & QtCore.Qt.ControlModifier),
@@ -442,8 +444,9 @@ class _Window(AbstractWindow):
             copy = event.proposedAction() == QtCore.Qt.CopyAction
         except AttributeError:
             # this is a DragLeave event
-            return DragEvent(x=x, y=self._flip_y(y), obj=None, copy=False,
-                        window=self, mimedata=None)
+            return self._make_event(DragEvent,
+                    x=x, y=self._flip_y(y), obj=None, copy=False,
+                    window=self, mimedata=None)
             
         try:
             from traitsui.qt4.clipboard import PyMimeData
@@ -464,8 +467,9 @@ class _Window(AbstractWindow):
                     except ImportError:
                         pass
         
-        return DragEvent(x=x, y=self._flip_y(y), obj=obj, copy=copy,
-                        window=self, mimedata=mimedata)
+        return self._make_event(DragEvent,
+                x=x, y=self._flip_y(y), obj=obj, copy=copy,
+                window=self, mimedata=mimedata)
 
     def _redraw(self, coordinates=None):
         if self.control:
@@ -478,6 +482,10 @@ class _Window(AbstractWindow):
             else:
                 self.control.update(*coordinates)
 
+    def _invoke_later(self, callable):
+        QtCore.QTimer.singleShot(0, callable)
+        return True
+
     def _get_control_size(self):
         if self.control:
             return (self.control.width(), self.control.height())
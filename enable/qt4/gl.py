@@ -44,6 +44,7 @@ class Window(BaseGLWindow):
         if self.control is None:
             return
 
+        self._begin_paint()
         size = self._get_control_size()
         self._size = tuple(size)
         self._gc = self._create_gc(size)
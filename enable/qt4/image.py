@@ -9,35 +9,64 @@
 # Thanks for using Enthought open source!
 #------------------------------------------------------------------------------
 
+import sys
+
 from pyface.qt import QtCore, QtGui
 from kiva.agg import CompiledPath, GraphicsContextSystem as GraphicsContext
+from kiva.buffer_pool import default_pool, pixel_buffer
 
 from base_window import BaseWindow
 from scrollbar import NativeScrollBar
 
+# QImage.Format_ARGB32_Premultiplied stores each pixel as a 32 bit integer,
+# so its bytes are in BGRA order on little endian machines.  The GC of the
+# window draws in that order, so that the QImage can use its pixels as they
+# are.
+if sys.byteorder == "little":
+    NATIVE_PIX_FORMAT = "bgra32"
+else:
+    NATIVE_PIX_FORMAT = "argb32"
+
 class Window(BaseWindow):
-    def _create_gc(self, size, pix_format="bgra32"):
-        gc = GraphicsContext((size[0]+1, size[1]+1), pix_format=pix_format,
-                # We have to set bottom_up=0 or otherwise the PixelMap will
-                # appear upside down in the QImage.
-                bottom_up = 0)
+    def _create_gc(self, size, pix_format=NATIVE_PIX_FORMAT):
+        gc = default_pool.create_gc((size[0]+1, size[1]+1),
+                                    pix_format=pix_format)
 
         gc.translate_ctm(0.5, 0.5)
 
         return gc
 
+    def _get_paint_region(self, event):
+        if event is None:
+            return []
+        # Flip the rectangle of the paint event to Kiva's y axis, as the
+        # damaged regions are flipped below.
+        rect = event.rect()
+        h = self._gc.height()
+        return [(rect.x(), h - rect.y() - rect.height(), rect.width(),
+                 rect.height())]
+
     def _window_paint(self, event):
         if self.control is None:
            return
 
-        # self._gc is an image context
-        w = self._gc.width()
-        h = self._gc.height()
-        data = self._gc.pixel_map.convert_to_argb32string()
-        image = QtGui.QImage(data, w, h, QtGui.QImage.Format_ARGB32)
-        rect = QtCore.QRect(0,0,w,h)
+        # The QImage is created over the pixels of the GC, without copying
+        # them; the buffer must be kept until the painting is done.
+        pixels = self._gc.bmp_array
+        h, w = pixels.shape[:2]
+        buffer = pixel_buffer(pixels)
+        image = QtGui.QImage(buffer, w, h, pixels.strides[0],
+                             QtGui.QImage.Format_ARGB32_Premultiplied)
         painter = QtGui.QPainter(self.control)
-        painter.drawImage(rect, image)
+        if self._update_region is None:
+            rect = QtCore.QRect(0,0,w,h)
+            painter.drawImage(rect, image)
+        else:
+            # Only copy the damaged regions, flipping them to Qt's y axis.
+            for x, y, dx, dy in self._update_region:
+                rect = QtCore.QRect(int(x), int(h - y - dy), int(dx), int(dy))
+                painter.drawImage(rect, image, rect)
+        painter.end()
 
 def font_metrics_provider():
     from kiva.fonttools import Font
@@ -0,0 +1,116 @@
+""" Defines the GridIndex class, a spatial index of rectangles """
+
+from math import floor
+
+
+class GridIndex(object):
+    """ A spatial index which finds the items whose rectangle contains a
+    point or intersects a rectangle, without checking all the items.
+
+    The plane is divided into square cells of **cell_size**, and each item is
+    stored in the cells that its rectangle overlaps.  Items which overlap
+    more than **max_cells** cells are kept in a separate list which every
+    query returns, so that large items don't fill the grid.
+
+    Queries return candidates: all the items which may match, and possibly
+    some which don't.  The caller does the exact test on the candidates.
+    Rectangles are given as coordinates (x, y, x2, y2).
+    """
+
+    def __init__(self, cell_size=64.0, max_cells=256):
+        self.cell_size = float(cell_size)
+        self.max_cells = max_cells
+        # Maps cells (i, j) to the set of items in them
+        self._cells = {}
+        # Maps items to the range of cells (i, j, i2, j2) they are in, or
+        # None for large items
+        self._items = {}
+        self._large_items = set()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def clear(self):
+        """ Removes all the items. """
+        self._cells.clear()
+        self._items.clear()
+        self._large_items.clear()
+
+    def insert(self, item, coordinates):
+        """ Adds an item with the given rectangle, or moves it if it is
+        already in the index.
+        """
+        cells = self._cell_range(coordinates)
+        if item in self._items:
+            if self._items[item] == cells:
+                return
+            self.remove(item)
+        self._items[item] = cells
+        if cells is None:
+            self._large_items.add(item)
+            return
+        i1, j1, i2, j2 = cells
+        for i in xrange(i1, i2 + 1):
+            for j in xrange(j1, j2 + 1):
+                self._cells.setdefault((i, j), set()).add(item)
+
+    def remove(self, item):
+        """ Removes an item, if it is in the index. """
+        if item not in self._items:
+            return
+        cells = self._items.pop(item)
+        if cells is None:
+            self._large_items.discard(item)
+            return
+        i1, j1, i2, j2 = cells
+        for i in xrange(i1, i2 + 1):
+            for j in xrange(j1, j2 + 1):
+                cell = self._cells[(i, j)]
+                cell.discard(item)
+                if not cell:
+                    del self._cells[(i, j)]
+
+    def query_point(self, x, y):
+        """ Returns the set of candidate items containing the point (x, y).
+        """
+        size = self.cell_size
+        result = set(self._large_items)
+        result.update(self._cells.get((int(floor(x / size)),
+                                       int(floor(y / size))), ()))
+        return result
+
+    def query_rect(self, coordinates):
+        """ Returns the set of candidate items intersecting a rectangle.
+        """
+        result = set(self._large_items)
+        i1, j1, i2, j2 = self._cell_bounds(coordinates)
+        if (i2 - i1 + 1) * (j2 - j1 + 1) > len(self._cells):
+            # It is faster to check the cells which are not empty.
+            for (i, j), items in self._cells.iteritems():
+                if i1 <= i <= i2 and j1 <= j <= j2:
+                    result.update(items)
+        else:
+            for i in xrange(i1, i2 + 1):
+                for j in xrange(j1, j2 + 1):
+                    result.update(self._cells.get((i, j), ()))
+        return result
+
+    def _cell_bounds(self, coordinates):
+        size = self.cell_size
+        x, y, x2, y2 = coordinates
+        x, x2 = min(x, x2), max(x, x2)
+        y, y2 = min(y, y2), max(y, y2)
+        return (int(floor(x / size)), int(floor(y / size)),
+                int(floor(x2 / size)), int(floor(y2 / size)))
+
+    def _cell_range(self, coordinates):
+        """ Returns the range of cells a rectangle overlaps, or None if they
+        are more than max_cells.
+        """
+        i1, j1, i2, j2 = cells = self._cell_bounds(coordinates)
+        if (i2 - i1 + 1) * (j2 - j1 + 1) > self.max_cells:
+            return None
+        return cells
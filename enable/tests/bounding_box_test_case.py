@@ -0,0 +1,123 @@
+import random
+import unittest
+
+from enable.api import Component, Container
+from enable.bounding_box import BoundingBox
+
+
+class BoundingBoxTestCase(unittest.TestCase):
+
+    def test_insert_and_move(self):
+        box = BoundingBox()
+        self.assertEqual(box.coordinates(), None)
+        box.insert('a', (0, 0, 10, 10))
+        box.insert('b', (5, 5, 20, 30))
+        self.assertEqual(box.coordinates(), (0, 0, 20, 30))
+        self.assertEqual(box.recomputes, 1)
+
+        # Growing the box and moving items inside it needs no recompute.
+        box.insert('c', (-5, 2, 3, 4))
+        box.insert('b', (6, 5, 20, 31))
+        box.insert('c', (-5, 3, 3, 4))
+        self.assertEqual(box.coordinates(), (-5, 0, 20, 31))
+        self.assertEqual(box.recomputes, 1)
+
+        # Shrinking an edge with another item on it needs no recompute.
+        box.insert('d', (-5, 1, 0, 1))
+        box.insert('c', (-4, 3, 3, 4))
+        self.assertEqual(box.coordinates(), (-5, 0, 20, 31))
+        self.assertEqual(box.recomputes, 1)
+
+        # Shrinking the last item on an edge does.
+        box.insert('b', (6, 5, 8, 8))
+        self.assertEqual(box.coordinates(), (-5, 0, 10, 10))
+        self.assertEqual(box.recomputes, 2)
+
+    def test_remove_and_translate(self):
+        box = BoundingBox()
+        box.insert('a', (0, 0, 10, 10))
+        box.insert('b', (5, 5, 20, 30))
+        box.coordinates()
+        box.translate(1, -1)
+        self.assertEqual(box.coordinates(), (1, -1, 21, 29))
+        box.remove('b')
+        box.remove('missing')
+        self.assertEqual(box.coordinates(), (1, -1, 11, 9))
+        box.remove('a')
+        self.assertEqual(len(box), 0)
+        self.assertEqual(box.coordinates(), None)
+
+
+class ContainerBoundingBoxTestCase(unittest.TestCase):
+
+    def calc_bounding_box(self, container):
+        """ Computes the bounding box of the components of a container
+        from scratch.
+        """
+        coordinates = [(c.outer_x, c.outer_y, c.outer_x2, c.outer_y2)
+                       for c in container.components]
+        return (min(c[0] for c in coordinates), min(c[1] for c in coordinates),
+                max(c[2] for c in coordinates), max(c[3] for c in coordinates))
+
+    def test_follows_changes(self):
+        rng = random.Random(0)
+        container = Container(bounds=[1000, 1000])
+        for i in range(50):
+            container.add(Component(position=[rng.uniform(0, 900),
+                                               rng.uniform(0, 900)],
+                                    bounds=[10, 10]))
+        for i in range(200):
+            component = rng.choice(container.components)
+            if i % 3:
+                component.position = [rng.uniform(-100, 1000),
+                                      rng.uniform(-100, 1000)]
+            else:
+                component.bounds = [rng.uniform(1, 200), rng.uniform(1, 200)]
+            if i % 50 == 0:
+                container.remove(container.components[0])
+                container.insert(3, Component(position=[-200, 5],
+                                              bounds=[5, 5]))
+            self.assertEqual(container._calc_bounding_box(),
+                             self.calc_bounding_box(container))
+        tracker = container._bounding_box_tracker
+        self.assertTrue(tracker.recomputes < 100)
+
+    def test_moves_inside_do_not_reposition(self):
+        container = Container(auto_size=True)
+        components = [Component(position=[10 * i, 10 * i], bounds=[10, 10])
+                      for i in range(10)]
+        container.add(*components)
+        self.assertEqual(container.bounds, [99, 99])
+
+        changes = []
+        components[0].on_trait_change(lambda: changes.append(1), 'position')
+        components[5].position = [20, 30]
+        self.assertEqual(changes, [])
+        self.assertEqual(container.bounds, [99, 99])
+
+        # Moving a component out of the bounds moves the others.
+        container.position = [100, 100]
+        components[5].position = [-10, 0]
+        self.assertEqual(container.position, [90, 100])
+        self.assertEqual(components[0].position, [10, 0])
+        self.assertEqual(components[5].position, [0, 0])
+        self.assertEqual(container.bounds, [109, 99])
+        self.assertEqual(container._calc_bounding_box(), (0, 0, 109, 99))
+
+    def test_follows_padding_and_border(self):
+        container = Container(bounds=[1000, 1000])
+        component = Component(position=[10, 20], bounds=[10, 10])
+        container.add(component, Component(position=[50, 50],
+                                           bounds=[10, 10]))
+        self.assertEqual(container._calc_bounding_box(), (10, 20, 59, 59))
+        component.padding_left = 5
+        component.padding_bottom = 8
+        self.assertEqual(container._calc_bounding_box(), (5, 12, 59, 59))
+        component.set(border_visible=True, inset_border=False, border_width=2)
+        self.assertEqual(container._calc_bounding_box(),
+                         self.calc_bounding_box(container))
+        self.assertEqual(container._calc_bounding_box(), (3, 10, 59, 59))
+
+
+if __name__ == "__main__":
+    unittest.main()
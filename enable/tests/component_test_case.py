@@ -1,6 +1,35 @@
 import unittest
 
-from enable.api import Component
+from traits.api import Dict
+
+from kiva.agg import GraphicsContextArray
+from kiva.buffer_pool import default_pool
+from enable.api import Component, Container
+
+
+class LayerCountingComponent(Component):
+    """ A component which counts the draws of its layers, and draws
+    translucent shapes on them.
+    """
+
+    layer_draws = Dict
+
+    def _dispatch_draw(self, layer, gc, view_bounds, mode):
+        self.layer_draws[layer] = self.layer_draws.get(layer, 0) + 1
+        super(LayerCountingComponent, self)._dispatch_draw(layer, gc,
+                                                           view_bounds, mode)
+
+    def _draw_underlay(self, gc, view_bounds=None, mode="normal"):
+        with gc:
+            gc.set_fill_color((0.2, 0.6, 0.2, 0.5))
+            gc.arc(self.x + 25, self.y + 25, 15, 0, 6.283)
+            gc.fill_path()
+
+    def _draw_mainlayer(self, gc, view_bounds=None, mode="normal"):
+        with gc:
+            gc.set_fill_color((0.0, 0.0, 1.0, 0.7))
+            gc.rect(self.x + 10.3, self.y + 10.6, 20, 20)
+            gc.fill_path()
 
 
 class ComponentTestCase(unittest.TestCase):
@@ -77,6 +106,85 @@ class ComponentTestCase(unittest.TestCase):
         self.assert_(c.container is None)
         return
 
+
+class LayerCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.component = LayerCountingComponent(
+            position=[5, 7], bounds=[50, 50], padding=4, border_visible=True,
+            cached_layers=["background", "underlay", "border"])
+        self.gc = GraphicsContextArray((70, 70))
+
+    def draw_counts(self):
+        self.component.draw(self.gc)
+        return [self.component.layer_draws.get(layer, 0)
+                for layer in ("background", "underlay", "mainlayer")]
+
+    def test_cached_layers_are_drawn_once(self):
+        self.assertEqual(self.draw_counts(), [1, 1, 1])
+        self.assertEqual(self.draw_counts(), [1, 1, 2])
+
+    def test_invalidate_layer(self):
+        self.draw_counts()
+        self.component.invalidate_layer("underlay")
+        self.assertEqual(self.draw_counts(), [1, 2, 2])
+        self.component.invalidate_draw()
+        self.assertEqual(self.draw_counts(), [2, 3, 3])
+
+    def test_resize_invalidates_layers(self):
+        self.draw_counts()
+        self.component.bounds = [40, 40]
+        self.assertEqual(self.draw_counts(), [2, 2, 2])
+
+    def test_resized_layers_reuse_buffers(self):
+        self.draw_counts()
+        reuses = default_pool.reuses
+        self.component.bounds = [51, 51]
+        self.draw_counts()
+        self.assertEqual(default_pool.reuses, reuses + 3)
+
+    def test_cleanup_releases_buffers(self):
+        self.draw_counts()
+        in_use = default_pool.in_use_count()
+        self.component.cleanup(None)
+        self.assertEqual(self.component._layer_backbuffers, {})
+        self.assertEqual(default_pool.in_use_count(), in_use - 3)
+
+    def test_container_layers(self):
+        container = Container(bounds=[70, 70],
+                              cached_layers=["background", "mainlayer"])
+        container.add(self.component)
+        container.draw(self.gc)
+        self.component.invalidate_layer("underlay")
+        container.draw(self.gc)
+        self.assertEqual(sorted(container._layer_backbuffers),
+                         ["background", "mainlayer"])
+        self.component.invalidate_layer("mainlayer")
+        self.assertEqual(sorted(container._layer_backbuffers),
+                         ["background"])
+
+    def test_layers_ignore_view_bounds(self):
+        container = Container(bounds=[70, 70], cached_layers=["background"])
+        container.add(self.component)
+        other = Component(position=[60, 60], bounds=[5, 5], bgcolor="red")
+        container.add(other)
+        container.draw(self.gc, view_bounds=(0, 0, 30, 30))
+        self.gc.clear()
+        container.draw(self.gc, view_bounds=(40, 40, 30, 30))
+        # The cached layer holds the background of the component which was
+        # out of view on the first draw.
+        self.assertEqual(tuple(self.gc.bmp_array[7, 62, :3]), (0, 0, 255))
+
+    def test_same_pixels(self):
+        self.component.draw(self.gc)
+        cached = self.gc.bmp_array.astype(int)
+        self.gc.clear()
+        self.component.cached_layers = []
+        self.component.draw(self.gc)
+        difference = abs(self.gc.bmp_array.astype(int) - cached)
+        # Rounding may differ slightly for translucent pixels.
+        self.assertTrue(difference.max() <= 3)
+
 if __name__ == "__main__":
     import nose
     nose.main()
@@ -1,6 +1,9 @@
 import unittest
 
+from traits.api import Int, List
+
 from enable.api import Component, Container
+from enable.stacked_container import HStackedContainer
 
 
 class EnableUnitTest(unittest.TestCase):
@@ -84,6 +87,94 @@ class ContainerTestCase(EnableUnitTest):
         return
 
 
+class NotificationRecordingContainer(Container):
+    """ A container which records the damaged regions and redraw requests
+    it gets.
+    """
+
+    damaged = List
+
+    redraws = Int(0)
+
+    def invalidate_draw(self, damaged_regions=None, self_relative=False):
+        self.damaged.append(damaged_regions)
+        super(NotificationRecordingContainer, self).invalidate_draw(
+            damaged_regions, self_relative)
+
+    def request_redraw(self):
+        self.redraws += 1
+
+
+class LayoutTransactionTestCase(EnableUnitTest):
+
+    def create_containers(self, n=20, **traits):
+        """ Returns a container of **n** containers, inside of a container
+        recording notifications.
+        """
+        container = Container(bounds=[1000, 1000], **traits)
+        for i in range(n):
+            container.add(Container(position=[10 * i, 0], bounds=[10, 10]))
+        top = NotificationRecordingContainer(container, bounds=[1000, 1000])
+        container.position = [5, 5]
+        del top.damaged[:]
+        return top, container
+
+    def test_notifications_are_merged(self):
+        top, container = self.create_containers()
+        with container.layout_transaction():
+            for i, component in enumerate(container.components):
+                component.position = [20 * i, 100]
+                component.bounds = [20, 20]
+                component.request_redraw()
+            self.assertEqual(top.damaged, [])
+            self.assertEqual(top.redraws, 0)
+
+        # The damage is a single rectangle covering the damaged regions of
+        # the components (here, their new bounds and their empty drawn
+        # bounds), in the coordinates of the top container.
+        self.assertEqual(top.damaged, [[[5, 5, 400, 120]]])
+        self.assertEqual(top.redraws, 1)
+
+        # Without a transaction, there is a notification per change.
+        del top.damaged[:]
+        for component in container.components:
+            component.bounds = [10, 10]
+        self.assertEqual(len(top.damaged), 20)
+
+    def test_nested_transactions(self):
+        top, container = self.create_containers()
+        with container.layout_transaction():
+            with container.layout_transaction():
+                container.components[0].bounds = [30, 30]
+            self.assertEqual(top.damaged, [])
+        self.assertEqual(len(top.damaged), 1)
+
+    def test_auto_size_compacts_once(self):
+        top, container = self.create_containers(auto_size=True)
+        compacts = []
+        container.on_trait_change(lambda: compacts.append(1), 'bounds')
+        with container.layout_transaction():
+            for component in container.components:
+                component.position = [component.x - 10, component.y + 5]
+            # The positions of the components are not touched until the
+            # transaction ends.
+            self.assertEqual(container.components[0].position, [-10, 5])
+        self.assertEqual(container.components[0].position, [0, 0])
+        self.assertEqual(container._calc_bounding_box(), (0, 0, 199, 9))
+        self.assertEqual(len(compacts), 1)
+
+    def test_do_layout(self):
+        container = HStackedContainer(bounds=[500, 100])
+        for i in range(10):
+            container.add(Container(bounds=[10, 10], resizable="v"))
+        top = NotificationRecordingContainer(container, bounds=[1000, 1000])
+        del top.damaged[:]
+        container.do_layout(force=True)
+        self.assertEqual(container.components[-1].position, [90, 0])
+        self.assertEqual(container.components[-1].bounds, [10, 100])
+        self.assertEqual(len(top.damaged), 1)
+
+
 if __name__ == "__main__":
     import nose
     nose.main()
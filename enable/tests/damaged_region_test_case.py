@@ -0,0 +1,145 @@
+import unittest
+
+from traits.api import Any, List
+
+from kiva.agg import GraphicsContextArray
+from enable.api import AbstractWindow, Component, Container
+from enable.base import coalesce_coordinates
+
+
+class DrawCountingComponent(Component):
+    """ A component which records the draws of its windows.
+    """
+
+    draws = List
+
+    def _draw_mainlayer(self, gc, view_bounds=None, mode="normal"):
+        self.draws.append(view_bounds)
+
+
+class DamagedRegionWindow(AbstractWindow):
+    """ A window which paints into an Agg GC, and records the update region
+    of each paint.
+    """
+
+    painted_regions = List
+
+    # The bounds which the toolkit asks the next paint to draw.
+    paint_region = List
+
+    # Stands in for the toolkit control.
+    control = Any(True)
+
+    def _create_gc(self, size, pix_format="rgba32"):
+        return GraphicsContextArray((size[0] + 1, size[1] + 1),
+                                    pix_format=pix_format)
+
+    def _get_control_size(self):
+        return (200, 200)
+
+    def _get_paint_region(self, event):
+        return self.paint_region
+
+    def _redraw(self, coordinates=None):
+        pass
+
+    def _window_paint(self, event):
+        self.painted_regions.append(self._update_region)
+
+
+class CoalesceCoordinatesTestCase(unittest.TestCase):
+
+    def test_disjoint(self):
+        rects = [(0, 0, 10, 10), (20, 20, 30, 30)]
+        self.assertEqual(coalesce_coordinates(rects), rects)
+
+    def test_overlapping(self):
+        rects = [(0, 0, 10, 10), (5, 5, 15, 15), (50, 50, 60, 60)]
+        self.assertEqual(sorted(coalesce_coordinates(rects)),
+                         [(0, 0, 15, 15), (50, 50, 60, 60)])
+
+    def test_merge_cascades(self):
+        # Merging the last rectangle with the second makes it overlap the
+        # first.
+        rects = [(0, 0, 10, 10), (20, 0, 30, 10), (8, 5, 25, 8)]
+        self.assertEqual(coalesce_coordinates(rects), [(0, 0, 30, 10)])
+
+    def test_empty_rectangles_are_dropped(self):
+        self.assertEqual(coalesce_coordinates([(0, 0, 0, 10)]), [])
+
+
+class DamagedRegionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.container = Container(bounds=[200, 200])
+        self.lower_left = DrawCountingComponent(position=[10, 10],
+                                                bounds=[20, 20])
+        self.upper_right = DrawCountingComponent(position=[170, 170],
+                                                 bounds=[20, 20])
+        self.middle = DrawCountingComponent(position=[90, 90],
+                                            bounds=[20, 20])
+        self.container.add(self.lower_left, self.upper_right, self.middle)
+        self.window = DamagedRegionWindow(component=self.container,
+                                          use_damaged_region=True)
+        # The first paint draws the whole window.
+        self.window._paint()
+
+    def test_first_paint_is_complete(self):
+        self.assertEqual(self.window.painted_regions, [None])
+        for component in (self.lower_left, self.upper_right, self.middle):
+            self.assertEqual(len(component.draws), 1)
+
+    def test_only_damaged_components_are_drawn(self):
+        self.lower_left.invalidate_draw()
+        self.upper_right.invalidate_draw()
+        self.window._paint()
+
+        self.assertEqual(len(self.lower_left.draws), 2)
+        self.assertEqual(len(self.upper_right.draws), 2)
+        self.assertEqual(len(self.middle.draws), 1)
+
+        # The two corners are painted separately, grown to whole pixels
+        # and by one pixel on each side.
+        regions = sorted(self.window.painted_regions[-1])
+        self.assertEqual(regions, [(9, 9, 22, 22), (169, 169, 22, 22)])
+
+    def test_paint_region_is_drawn(self):
+        self.lower_left.invalidate_draw()
+        # The toolkit also asks for the middle of the window, for instance
+        # because a dialog over it was closed.
+        self.window.paint_region = [(85, 85, 30, 30)]
+        self.window._paint()
+
+        self.assertEqual(len(self.lower_left.draws), 2)
+        self.assertEqual(len(self.middle.draws), 2)
+        self.assertEqual(len(self.upper_right.draws), 1)
+        regions = sorted(self.window.painted_regions[-1])
+        self.assertEqual(regions, [(9, 9, 22, 22), (84, 84, 32, 32)])
+
+    def test_update_region_in_nested_container(self):
+        inner = Container(position=[100, 100], bounds=[100, 100])
+        component = DrawCountingComponent(position=[70, 70], bounds=[20, 20])
+        other = DrawCountingComponent(position=[0, 0], bounds=[20, 20])
+        inner.add(component, other)
+        self.container.add(inner)
+        self.window._paint()
+
+        component.invalidate_draw()
+        self.window._paint()
+        self.assertEqual(len(component.draws), 2)
+        self.assertEqual(len(other.draws), 1)
+        self.assertEqual(self.window.painted_regions[-1],
+                         [(169, 169, 22, 22)])
+        self.assertEqual(len(self.upper_right.draws), 3)
+
+    def test_clipping_is_undone(self):
+        self.lower_left.invalidate_draw()
+        self.window._paint()
+        self.assertEqual(self.window._gc.get_num_clip_regions(), 1)
+        self.window.invalidate_draw()
+        self.window._paint()
+        self.assertEqual(len(self.middle.draws), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
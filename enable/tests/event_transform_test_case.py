@@ -3,12 +3,16 @@
 import copy
 import unittest
 
+# Major library imports
+import numpy
+
 # Enthought library imports
+from kiva import affine
 from traits.api import Any, Tuple
 
 # Enable imports
 from enable.api import BasicEvent, Canvas, Component, Container, \
-        Viewport, AbstractWindow
+        Viewport, AbstractWindow, KeyEvent, LightweightMouseEvent, MouseEvent
 
 
 class EnableUnitTest(unittest.TestCase):
@@ -188,6 +192,138 @@ class EventTransformTestCase(EnableUnitTest):
 
         return
 
+    def test_offset_and_scale(self):
+        """ Tests that offset_xy and scale_xy transform the event like the
+        equivalent affine matrices.
+        """
+        event = BasicEvent(x=105, y=110)
+        event.offset_xy(5, 10)
+        event.scale_xy(2.0, 4.0)
+        event.push_transform(affine.affine_from_translation(-3, 7))
+        event.offset_xy(-1, 2)
+        self.assertEqual((event.x, event.y), (48, 30))
+
+        transforms = [affine.affine_from_translation(-5, -10),
+                      affine.affine_from_scale(0.5, 0.25),
+                      affine.affine_from_translation(-3, 7),
+                      affine.affine_from_translation(1, -2)]
+        expected = reduce(numpy.dot, transforms[::-1])
+        self.assertTrue(numpy.allclose(event.net_transform(), expected))
+
+        # Only scales and translations
+        event.pop()
+        event.pop()
+        expected = reduce(numpy.dot, transforms[1::-1])
+        self.assertTrue(numpy.allclose(event.net_transform(), expected))
+
+        event.pop(2)
+        self.assertEqual((event.x, event.y), (105, 110))
+        self.assertTrue(numpy.allclose(event.net_transform(),
+                                       affine.affine_identity()))
+
+    def test_mouse_owner_history_transform(self):
+        """ Tests that the net transform of the dispatch history of the mouse
+        owner is reused until one of the transforms changes.
+        """
+        comp = TestComponent(position=[20,20])
+        container = TestContainer(bounds=[100,100], position=[50,50])
+        container.add(comp)
+        outer = TestContainer(bounds=[400,400], position=[10,10],
+                              fit_window=False, resizable="")
+        outer.add(container)
+
+        window = DummyWindow(_size=(500,500))
+        window.component = outer
+        window.set_mouse_owner(comp, history=[outer, container])
+
+        window._handle_mouse_event("left_down", BasicEvent(x=105, y=105))
+        self.assertEqual((comp.last_event.x, comp.last_event.y), (45, 45))
+        transform = window._history_transform_cache[1]
+
+        window._handle_mouse_event("left_down", BasicEvent(x=107, y=106))
+        self.assertEqual((comp.last_event.x, comp.last_event.y), (47, 46))
+        self.assertTrue(window._history_transform_cache[1] is transform)
+
+        container.position = [60, 50]
+        window._handle_mouse_event("left_down", BasicEvent(x=107, y=106))
+        self.assertEqual((comp.last_event.x, comp.last_event.y), (37, 46))
+
+        window.set_mouse_owner(None)
+        self.assertEqual(window._history_transform_cache, None)
+
+    def test_history_transform_hit_skips_transforms(self):
+        """ Tests that reusing the net transform of the mouse owner's history
+        doesn't compute the transforms of the components again, unless one
+        of them overrides get_event_transform().
+        """
+        class OffsetContainer(TestContainer):
+            def get_event_transform(self, event=None, suffix=""):
+                return affine.affine_from_translation(-self.x - 1, -self.y)
+
+        comp = TestComponent(position=[20,20])
+        container = TestContainer(bounds=[100,100], position=[50,50])
+        container.add(comp)
+        window = DummyWindow(_size=(500,500))
+        window.component = container
+        calls = []
+        def get_event_transform(event=None, suffix=""):
+            calls.append(1)
+            return affine.affine_from_translation(-container.x, -container.y)
+        container.get_event_transform = get_event_transform
+        window.set_mouse_owner(comp, history=[container])
+        for i in range(3):
+            window._handle_mouse_event("left_down", BasicEvent(x=105, y=105))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((comp.last_event.x, comp.last_event.y), (55, 55))
+
+        offset = OffsetContainer(bounds=[100,100], position=[50,50])
+        self.assertEqual(offset._event_transform_key(), None)
+        window.set_mouse_owner(comp, history=[offset])
+        window._handle_mouse_event("left_down", BasicEvent(x=105, y=105))
+        self.assertEqual((comp.last_event.x, comp.last_event.y), (54, 55))
+        offset.position = [40, 50]
+        window._handle_mouse_event("left_down", BasicEvent(x=105, y=105))
+        self.assertEqual((comp.last_event.x, comp.last_event.y), (64, 55))
+
+    def test_lightweight_event(self):
+        """ Tests that lightweight events are transformed like HasTraits
+        events, and pass for them.
+        """
+        comp = TestComponent(position=[20,20])
+        container = TestContainer(bounds=[100,100], position=[50,50])
+        container.add(comp)
+        viewport = Viewport(component=container, bounds=[400,400],
+                            position=[30,30], zoom=2.0, enable_zoom=True,
+                            view_position=[-50, -50], view_bounds=[200, 200])
+
+        event = LightweightMouseEvent(x=280, y=280, left_down=True)
+        self.assertTrue(isinstance(event, MouseEvent))
+        self.assertTrue(isinstance(event, BasicEvent))
+        self.assertFalse(isinstance(event, KeyEvent))
+        viewport.dispatch(event, "left_down")
+        self.assertEqual((container.last_event.x, container.last_event.y),
+                         (75, 75))
+        self.assertEqual((comp.last_event.x, comp.last_event.y), (25, 25))
+        self.assertTrue(comp.last_event.left_down)
+        self.assertEqual((event.x, event.y), (280, 280))
+        self.assertEqual(event._transform_stack, [])
+
+        traits_event = MouseEvent(x=280, y=280)
+        for e in (event, traits_event):
+            e.offset_xy(30, 30)
+            e.scale_xy(2.0, 2.0)
+        self.assertTrue(numpy.allclose(event.net_transform(),
+                                       traits_event.net_transform()))
+
+    def test_window_lightweight_events(self):
+        window = DummyWindow()
+        event = window._make_event(MouseEvent, x=1, y=2, window=window)
+        self.assertTrue(type(event) is LightweightMouseEvent)
+        self.assertEqual(event.window, window)
+        window.lightweight_events = False
+        event = window._make_event(MouseEvent, x=1, y=2)
+        self.assertTrue(type(event) is MouseEvent)
+
 
 if __name__ == "__main__":
     import nose
@@ -0,0 +1,157 @@
+import unittest
+
+from traits.api import Any, Int, List
+
+from kiva.agg import GraphicsContextArray
+from enable.api import AbstractWindow, BasicEvent, Component
+
+
+class MoveRecordingComponent(Component):
+    """ A component which records the mouse events it receives.
+    """
+
+    events = List
+
+    def normal_mouse_move(self, event):
+        self.events.append(("mouse_move", event.x, event.y))
+
+    def normal_left_down(self, event):
+        self.events.append(("left_down", event.x, event.y))
+
+
+class CoalescingWindow(AbstractWindow):
+    """ A window which takes Enable events as toolkit events, counts the
+    redraws it is asked for and keeps the callables to invoke later.
+    """
+
+    # Stands in for the toolkit control.
+    control = Any(True)
+
+    redraws = Int(0)
+
+    later = List
+
+    # Whether the window stands in for a toolkit with idle callbacks.
+    idle_callbacks = Any(True)
+
+    def _create_gc(self, size, pix_format="rgba32"):
+        return GraphicsContextArray((size[0] + 1, size[1] + 1),
+                                    pix_format=pix_format)
+
+    def _create_mouse_event(self, event):
+        event.window = self
+        return event
+
+    def _get_control_size(self):
+        return (100, 100)
+
+    def _invoke_later(self, callable):
+        if self.idle_callbacks:
+            self.later.append(callable)
+        return self.idle_callbacks
+
+    def _redraw(self, coordinates=None):
+        self.redraws += 1
+
+    def _set_focus(self):
+        pass
+
+    def _window_paint(self, event):
+        pass
+
+
+class MouseMoveCoalescingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.component = MoveRecordingComponent(bounds=[100, 100])
+        self.window = CoalescingWindow(component=self.component,
+                                       coalesce_mouse_moves=True)
+        self.window._paint()
+
+    def move(self, x, y):
+        return self.window._handle_mouse_event("mouse_move",
+                                               BasicEvent(x=x, y=y))
+
+    def test_moves_between_paints_are_merged(self):
+        self.move(1, 1)
+        self.assertEqual(self.component.events, [("mouse_move", 1, 1)])
+
+        # The next moves are held until the paint, and only the last one is
+        # dispatched.
+        redraws = self.window.redraws
+        self.assertTrue(self.move(2, 2))
+        self.move(3, 3)
+        self.move(4, 4)
+        self.assertEqual(len(self.component.events), 1)
+        self.assertEqual(len(self.window.later), 1)
+        # Holding the moves doesn't repaint the window.
+        self.assertEqual(self.window.redraws, redraws)
+
+        self.window._paint()
+        self.assertEqual(self.component.events,
+                         [("mouse_move", 1, 1), ("mouse_move", 4, 4)])
+        self.assertEqual(self.window.dropped_mouse_moves, 2)
+        self.assertEqual(self.window.merged_mouse_moves, 1)
+
+        # A paint dispatched a held move, so the next move is held too.
+        self.move(5, 5)
+        self.assertEqual(len(self.component.events), 2)
+        self.window._paint()
+        self.assertEqual(self.component.events[-1], ("mouse_move", 5, 5))
+
+        # After a paint without held moves, the next move is dispatched
+        # at once.
+        self.window._paint()
+        self.move(6, 6)
+        self.assertEqual(self.component.events[-1], ("mouse_move", 6, 6))
+
+    def test_held_move_is_dispatched_when_idle(self):
+        self.move(1, 1)
+        redraws = self.window.redraws
+        self.move(2, 2)
+        self.move(3, 3)
+
+        # Holding the moves doesn't repaint the window.
+        self.assertEqual(self.window.redraws, redraws)
+        for callable in self.window.later:
+            callable()
+        self.assertEqual(self.component.events,
+                         [("mouse_move", 1, 1), ("mouse_move", 3, 3)])
+        self.assertEqual(self.window.redraws, redraws)
+
+        # A paint before the idle callback dispatches the held move instead.
+        del self.window.later[:]
+        self.move(4, 4)
+        self.window._paint()
+        for callable in self.window.later:
+            callable()
+        self.assertEqual(self.component.events[-1], ("mouse_move", 4, 4))
+        self.assertEqual(len(self.component.events), 3)
+
+    def test_held_move_without_idle_callbacks(self):
+        self.window.idle_callbacks = False
+        self.move(1, 1)
+        redraws = self.window.redraws
+        self.move(2, 2)
+        self.assertEqual(self.window.redraws, redraws + 1)
+        self.window._paint()
+        self.assertEqual(self.component.events[-1], ("mouse_move", 2, 2))
+
+    def test_held_move_comes_before_other_events(self):
+        self.move(1, 1)
+        self.move(2, 2)
+        self.window._handle_mouse_event("left_down", BasicEvent(x=3, y=3))
+        self.assertEqual(self.component.events,
+                         [("mouse_move", 1, 1), ("mouse_move", 2, 2),
+                          ("left_down", 3, 3)])
+
+    def test_disabled(self):
+        self.window.coalesce_mouse_moves = False
+        for i in range(3):
+            self.move(i, i)
+        self.assertEqual(len(self.component.events), 3)
+        self.assertEqual(self.window.dropped_mouse_moves, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import cPickle
+import os
+import shutil
+import tempfile
+import unittest
+
+from enable.api import Component, Container
+from kiva.image import render_component, render_components
+
+
+def make_container(color="red"):
+    container = Container(bounds=[40, 30], bgcolor="white")
+    container.add(Component(position=[10, 5], bounds=[10, 10],
+                            bgcolor=color))
+    return container
+
+
+class RenderComponentTestCase(unittest.TestCase):
+
+    def assert_drawn(self, pixels, color=(255, 0, 0, 255)):
+        """ Checks that an rgba32 or bgra32 array has the small component of
+        make_container() in **color** and white elsewhere.
+        """
+        # The rows of the array start from the top.
+        self.assertEqual(pixels.shape, (30, 40, 4))
+        inside = pixels[15:25, 10:20]
+        self.assertTrue((inside == inside[0, 0]).all())
+        self.assertEqual(sorted(inside[0, 0]), sorted(color))
+        self.assertTrue((pixels[:15] == 255).all())
+        self.assertTrue((pixels[:, 20:] == 255).all())
+
+    def test_render_component(self):
+        container = make_container()
+        gc = render_component(container)
+        self.assertEqual((gc.width(), gc.height()), (40, 30))
+        self.assert_drawn(gc.bmp_array)
+
+        # The container is laid out at the given size.
+        gc = render_component(container, size=(50, 60))
+        self.assertEqual((gc.width(), gc.height()), (50, 60))
+        self.assertEqual(container.bounds, [50, 60])
+
+    def test_unknown_backend(self):
+        self.assertRaises(ValueError, render_component, make_container(),
+                          backend="gl")
+
+    def test_pickled_component(self):
+        container = make_container()
+        render_component(container)
+        copy = cPickle.loads(cPickle.dumps(container, 2))
+        self.assertTrue(copy.components[0].container is copy)
+        self.assertEqual(copy._layer_backbuffers, {})
+        self.assert_drawn(render_component(copy).bmp_array)
+
+    def test_render_components(self):
+        containers = [make_container(), make_container("blue")]
+        for processes in (1, 2):
+            red, blue = render_components(containers, processes=processes)
+            self.assert_drawn(red)
+            self.assert_drawn(blue, (0, 0, 255, 255))
+
+    def test_render_components_to_files(self):
+        directory = tempfile.mkdtemp()
+        try:
+            filenames = [os.path.join(directory, "page%d.png" % i)
+                         for i in range(3)]
+            result = render_components([make_container()] * 3, filenames,
+                                       processes=2)
+            self.assertEqual(result, filenames)
+            for filename in filenames:
+                self.assertTrue(os.path.getsize(filename) > 0)
+        finally:
+            shutil.rmtree(directory)
+        self.assertRaises(ValueError, render_components, [make_container()],
+                          ["a.png", "b.png"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import random
+import unittest
+
+from enable.api import Component, Container
+from enable.spatial_index import GridIndex
+
+
+class GridIndexTestCase(unittest.TestCase):
+
+    def test_point_query(self):
+        index = GridIndex(cell_size=10)
+        index.insert('a', (0, 0, 5, 5))
+        index.insert('b', (25, 25, 50, 50))
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.query_point(2, 2), set(['a']))
+        self.assertEqual(index.query_point(45, 31), set(['b']))
+        self.assertEqual(index.query_point(15, 15), set())
+
+    def test_rect_query(self):
+        index = GridIndex(cell_size=10)
+        index.insert('a', (0, 0, 5, 5))
+        index.insert('b', (25, 25, 50, 50))
+        self.assertEqual(index.query_rect((-10, -10, 30, 30)),
+                         set(['a', 'b']))
+        self.assertEqual(index.query_rect((12, 12, 18, 18)), set())
+        # A query covering more cells than the index has
+        self.assertEqual(index.query_rect((-1e4, -1e4, 1e4, 1e4)),
+                         set(['a', 'b']))
+
+    def test_move_and_remove(self):
+        index = GridIndex(cell_size=10)
+        index.insert('a', (0, 0, 5, 5))
+        index.insert('a', (100, 100, 105, 105))
+        self.assertEqual(index.query_point(2, 2), set())
+        self.assertEqual(index.query_point(102, 102), set(['a']))
+        index.remove('a')
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index._cells, {})
+
+    def test_large_items(self):
+        index = GridIndex(cell_size=10, max_cells=4)
+        index.insert('large', (0, 0, 1000, 1000))
+        self.assertEqual(index._cells, {})
+        self.assertEqual(index.query_point(-50, -50), set(['large']))
+        index.remove('large')
+        self.assertEqual(index.query_point(500, 500), set())
+
+
+class ContainerSpatialIndexTestCase(unittest.TestCase):
+
+    def create_containers(self, n=200):
+        """ Returns two containers with the same random components, one of
+        which uses a spatial index.
+        """
+        rng = random.Random(0)
+        containers = Container(bounds=[1000, 1000]), \
+            Container(bounds=[1000, 1000], use_spatial_index=True,
+                      spatial_index_cell_size=50)
+        for i in range(n):
+            position = [rng.uniform(0, 950), rng.uniform(0, 950)]
+            bounds = [rng.uniform(1, 100), rng.uniform(1, 100)]
+            for container in containers:
+                container.add(Component(position=position, bounds=bounds))
+        return containers
+
+    def assert_same_components(self, plain, indexed, expected, components):
+        """ Checks that the components of both containers are at the same
+        positions in their components lists.
+        """
+        self.assertEqual([indexed.components.index(c) for c in components],
+                         [plain.components.index(c) for c in expected])
+
+    def test_components_at(self):
+        plain, indexed = self.create_containers()
+        for x, y in [(10, 10), (500, 500), (990, 10), (250, 750)]:
+            self.assert_same_components(
+                plain, indexed, plain.components_at(x, y),
+                indexed.components_at(x, y))
+
+    def test_visible_components(self):
+        plain, indexed = self.create_containers()
+        for bounds in [(0, 0, 100, 100), (400, 300, 250, 20),
+                       (-10, -10, 2000, 2000)]:
+            self.assert_same_components(
+                plain, indexed, plain._get_visible_components(bounds),
+                indexed._get_visible_components(bounds))
+
+    def test_index_follows_changes(self):
+        plain, indexed = self.create_containers(n=20)
+        points = [(605, 605), (700, 700), (10, 10)]
+        index = indexed._get_spatial_index()
+
+        # Moved and resized components are updated in the index.
+        for container in (plain, indexed):
+            container.components[3].position = [600, 600]
+            container.components[4].bounds = [300, 300]
+        self.assertTrue(indexed._spatial_index is index)
+        self.assertTrue(indexed.components[3] in
+                        indexed.components_at(605, 605))
+        for x, y in points:
+            self.assert_same_components(
+                plain, indexed, plain.components_at(x, y),
+                indexed.components_at(x, y))
+
+        # Changes to the components list rebuild it.
+        for container in (plain, indexed):
+            container.remove(container.components[5])
+            container.insert(0, Component(position=[590, 590],
+                                          bounds=[20, 20]))
+            container.raise_component(container.components[0])
+        for x, y in points:
+            self.assert_same_components(
+                plain, indexed, plain.components_at(x, y),
+                indexed.components_at(x, y))
+
+if __name__ == "__main__":
+    unittest.main()
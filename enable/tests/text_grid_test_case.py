@@ -0,0 +1,41 @@
+from mock import patch
+from numpy import array
+
+from kiva.image import font_metrics_provider
+from traits.testing.unittest_tools import unittest
+
+from enable.text_grid import TextGrid
+
+
+class OneAtATimeGC(object):
+    """ A font metrics provider without get_text_extents(), like the Quartz
+    graphics contexts.
+    """
+
+    def __init__(self):
+        self.gc = font_metrics_provider()
+
+    def set_font(self, font):
+        self.gc.set_font(font)
+
+    def get_text_extent(self, text):
+        return self.gc.get_text_extent(text)
+
+
+class TextGridTestCase(unittest.TestCase):
+
+    def cell_size(self, gc):
+        grid = TextGrid(string_array=array([["a", "bbb"], ["Wg", ""]]))
+        with patch("enable.text_grid.font_metrics_provider", lambda: gc):
+            grid._compute_cell_sizes()
+        return grid._cached_cell_size, tuple(grid._text_offset)
+
+    def test_cell_size(self):
+        gc = font_metrics_provider()
+        self.assertEqual(self.cell_size(gc), self.cell_size(OneAtATimeGC()))
+        (w, h), offset = self.cell_size(gc)
+        self.assertTrue(w > 0 and h > 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -174,21 +174,24 @@ class TextGrid(Component):
     def _compute_cell_sizes(self):
         if not self._cache_valid:
             gc = font_metrics_provider()
+            gc.set_font(self.font)
             max_w = 0
             max_h = 0
             min_l = 0
             min_d = 0
-            for text in self.string_array.ravel():
-                gc.set_font(self.font)
-                l, d, w, h = gc.get_text_extent(text)
-                if -l+w > max_w:
-                    max_w = -l+w
-                if -d+h > max_h:
-                    max_h = -d+h
-                if l < min_l:
-                    min_l = l
-                if d < min_d:
-                    min_d = d
+            strings = self.string_array.ravel()
+            if len(strings) > 0:
+                if hasattr(gc, "get_text_extents"):
+                    extents = gc.get_text_extents(strings)
+                else:
+                    # The Quartz GCs only measure one string at a time.
+                    extents = array([gc.get_text_extent(text)
+                                     for text in strings], dtype=float)
+                l, d, w, h = extents.T
+                max_w = max(max_w, (w - l).max())
+                max_h = max(max_h, (h - d).max())
+                min_l = min(min_l, l.min())
+                min_d = min(min_d, d.min())
 
             self._cached_cell_size = (max_w, max_h)
             self._text_offset = array([-min_l, -min_d])
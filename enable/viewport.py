@@ -117,6 +117,7 @@ class Viewport(Component):
         delete any transient state it may have (such as backbuffers)."""
         if self.component:
             self.component.cleanup(window)
+        super(Viewport, self).cleanup(window)
 
     def get_preferred_size(self):
         """If we're initiating layout, act like an OverlayPlotContainer,
@@ -166,6 +167,13 @@ class Viewport(Component):
 
         return transform
 
+    def _event_transform_key(self):
+        if type(self).get_event_transform == Viewport.get_event_transform:
+            return (isinstance(self.component, Component), self.enable_zoom,
+                    self.zoom, tuple(self.view_position),
+                    tuple(self.outer_position))
+        return None
+
 
 
     #------------------------------------------------------------------------
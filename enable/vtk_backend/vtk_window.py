@@ -300,7 +300,8 @@ class EnableVTKWindow(AbstractWindow, CoordinateBox):
 
         x, y = self.control.event_position
 
-        return KeyEvent(event_type = event_type,
+        return self._make_event(KeyEvent,
+                event_type = event_type,
                 character=key, x=x, y=y,
                 alt_down=bool(self.control.alt_key),
                 shift_down=bool(self.control.shift_key),
@@ -335,7 +336,7 @@ class EnableVTKWindow(AbstractWindow, CoordinateBox):
             # Reset the wheel amount for next time
             self._wheel_amount = 0
 
-        tmp = MouseEvent(x = x, y = y,
+        tmp = self._make_event(MouseEvent, x = x, y = y,
                     alt_down = bool(rwi.alt_key),
                     control_down = bool(rwi.control_key),
                     shift_down = bool(rwi.shift_key),
@@ -441,6 +442,7 @@ class EnableVTKWindow(AbstractWindow, CoordinateBox):
 
     def _paint(self, event=None):
 
+        self._begin_paint()
         control_size = self._get_control_size()
         size = list(control_size)
         if self._layout_needed or (size != self._size):
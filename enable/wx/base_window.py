@@ -331,7 +331,7 @@ class BaseWindow(AbstractWindow):
             # x = event.GetX()
             # y = event.GetY()
 
-            return KeyEvent(
+            return self._make_event(KeyEvent,
                 event_type = event_type,
                 character = key,
                 alt_down = event.AltDown(),
@@ -362,31 +362,33 @@ class BaseWindow(AbstractWindow):
             if float(wx.VERSION_STRING[:3]) < 2.8:
                 if mouse_wheel != 0 and sys.platform == "win32":
                     x, y = self.control.ScreenToClientXY( x, y )
-            return MouseEvent( x            = x,
-                               y            = self._flip_y( y ),
-                               alt_down     = event.AltDown(),
-                               control_down = event.ControlDown(),
-                               shift_down   = event.ShiftDown(),
-                               left_down    = event.LeftIsDown(),
-                               middle_down  = event.MiddleIsDown(),
-                               right_down   = event.RightIsDown(),
-                               mouse_wheel  = mouse_wheel,
-                               window = self )
+            return self._make_event(MouseEvent,
+                                    x            = x,
+                                    y            = self._flip_y( y ),
+                                    alt_down     = event.AltDown(),
+                                    control_down = event.ControlDown(),
+                                    shift_down   = event.ShiftDown(),
+                                    left_down    = event.LeftIsDown(),
+                                    middle_down  = event.MiddleIsDown(),
+                                    right_down   = event.RightIsDown(),
+                                    mouse_wheel  = mouse_wheel,
+                                    window = self )
 
         # If no event specified, make one up:
         x, y = wx.GetMousePosition()
         x, y = self.control.ScreenToClientXY( x, y )
         self._last_mouse_pos = (x, y)
-        return MouseEvent( x            = x,
-                           y            = self._flip_y( y ),
-                           alt_down     = self.alt_pressed,
-                           control_down = self.ctrl_pressed,
-                           shift_down   = self.shift_pressed,
-                           left_down    = False,
-                           middle_down  = False,
-                           right_down   = False,
-                           mouse_wheel  = 0,
-                           window = self)
+        return self._make_event(MouseEvent,
+                                x            = x,
+                                y            = self._flip_y( y ),
+                                alt_down     = self.alt_pressed,
+                                control_down = self.ctrl_pressed,
+                                shift_down   = self.shift_pressed,
+                                left_down    = False,
+                                middle_down  = False,
+                                right_down   = False,
+                                mouse_wheel  = 0,
+                                window = self)
 
     def _create_gc(self, size, pix_format=None):
         "Create a Kiva graphics context of a specified size"
@@ -408,6 +410,11 @@ class BaseWindow(AbstractWindow):
                 self.control.Refresh(False, rect)
         return
 
+    def _invoke_later(self, callable):
+        "Call the callable once wx has processed the pending events"
+        wx.CallAfter(callable)
+        return True
+
     def _get_control_size ( self ):
         "Get the size of the underlying toolkit control"
         result = None
@@ -474,7 +481,8 @@ class BaseWindow(AbstractWindow):
         "Handle wxPython drag and drop events"
         # Process the 'dropped_on' event for the object(s) it was dropped on:
         y = self._flip_y(y)
-        drag_event = DragEvent(x=x, y=y, obj=drag_object, window=self)
+        drag_event = self._make_event(DragEvent,
+                                      x=x, y=y, obj=drag_object, window=self)
         self._drag_result = wx.DragNone
         if self.component.is_in(x, y):
             self.component.dispatch(drag_event, "dropped_on")
@@ -484,14 +492,15 @@ class BaseWindow(AbstractWindow):
 
     def wx_drag_over ( self, x, y, drag_object, drag_result ):
         y = self._flip_y( y )
-        drag_over_event = DragEvent( x    = x,
-                                     y    = y,
-                                     x0   = 0.0,
-                                     y0   = 0.0,
-                                     copy = drag_result != wx.DragMove,
-                                     obj = drag_object,
-                                     start_event = default_start_event,
-                                     window = self )
+        drag_over_event = self._make_event(DragEvent,
+                                           x    = x,
+                                           y    = y,
+                                           x0   = 0.0,
+                                           y0   = 0.0,
+                                           copy = drag_result != wx.DragMove,
+                                           obj = drag_object,
+                                           start_event = default_start_event,
+                                           window = self )
 
         # By default, don't indicate that we can be dropped on.  It is up
         # to the component to set this correctly.
@@ -502,14 +511,15 @@ class BaseWindow(AbstractWindow):
         return self._drag_result
 
     def wx_drag_leave ( self, drag_object ):
-        drag_leave_event = DragEvent( x    = 0.0,
-                                     y    = 0.0,
-                                     x0   = 0.0,
-                                     y0   = 0.0,
-                                     copy = False,
-                                     obj = drag_object,
-                                     start_event = default_start_event,
-                                     window = self )
+        drag_leave_event = self._make_event(DragEvent,
+                                            x    = 0.0,
+                                            y    = 0.0,
+                                            x0   = 0.0,
+                                            y0   = 0.0,
+                                            copy = False,
+                                            obj = drag_object,
+                                            start_event = default_start_event,
+                                            window = self )
         self.component.dispatch(drag_leave_event, "drag_leave")
         return
 
@@ -55,6 +55,7 @@ class Window(BaseWindow):
             event.Skip()
             return
 
+        self._begin_paint()
         size = self._get_control_size()
         self._size = tuple(size)
         self._gc = self._create_gc(size)
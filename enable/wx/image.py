@@ -14,35 +14,40 @@ import sys
 import wx
 
 from kiva.agg import CompiledPath, GraphicsContextSystem as GraphicsContext
+from kiva.buffer_pool import default_pool
 
 from base_window import BaseWindow
 from scrollbar import NativeScrollBar
 
-def _wx_bitmap_from_buffer(buf, width, height):
-    """ Given a pixel buffer in ARGB order, return a WX bitmap
-        object with the pixels in BGRA order.
-    """
-    arr = np.frombuffer(buf, dtype=np.uint8).reshape((width, height, 4))
-    copy = np.zeros_like(arr)
-    copy[...,0::4] = arr[...,2::4]
-    copy[...,1::4] = arr[...,1::4]
-    copy[...,2::4] = arr[...,0::4]
-    copy[...,3::4] = arr[...,3::4]
-    return wx.BitmapFromBufferRGBA(width, height, np.ravel(copy))
-
 
 class Window(BaseWindow):
-    def _create_gc(self, size, pix_format="bgra32"):
+    def _create_gc(self, size, pix_format=None):
         "Create a Kiva graphics context of a specified size"
-        # We have to set bottom_up=0 or otherwise the PixelMap will
-        # appear upside down when blitting. Note that this is not the
-        # case on Windows.
-        bottom_up = 0 if sys.platform != 'win32' else 1
-        gc = GraphicsContext((size[0]+1, size[1]+1), pix_format = pix_format,
-                             bottom_up = bottom_up)
+        if sys.platform == 'win32':
+            # The pixel map of the GC is drawn to the window by Windows.
+            gc = GraphicsContext((size[0]+1, size[1]+1),
+                                 pix_format = pix_format or "bgra32",
+                                 bottom_up = 1)
+        else:
+            # The pixels of the GC are given to wx.BitmapFromBufferRGBA as
+            # they are.
+            gc = default_pool.create_gc((size[0]+1, size[1]+1),
+                                        pix_format = pix_format or "rgba32")
         gc.translate_ctm(0.5, 0.5)
         return gc
 
+    def _get_paint_region(self, event):
+        "Return the update region of the control, flipped to Kiva's y axis"
+        h = self._gc.height()
+        region = []
+        rects = wx.RegionIterator(self.control.GetUpdateRegion())
+        while rects.HaveRects():
+            rect = rects.GetRect()
+            region.append((rect.x, h - rect.y - rect.height, rect.width,
+                           rect.height))
+            rects.Next()
+        return region
+
     def _window_paint(self, event):
         "Do a GUI toolkit specific screen update"
         if self.control is None:
@@ -50,16 +55,36 @@ class Window(BaseWindow):
             return
 
         control = self.control
-        pixel_map = self._gc.pixel_map
         wdc = control._dc = wx.PaintDC(control)
+        h = self._gc.height()
 
-        if hasattr(pixel_map, 'draw_to_wxwindow'):
-            pixel_map.draw_to_wxwindow(control, 0, 0)
+        if sys.platform == 'win32':
+            if self._update_region is not None:
+                # Only copy the damaged regions, flipping them to wx's y
+                # axis.
+                region = wx.Region()
+                for x, y, dx, dy in self._update_region:
+                    region.UnionRect(wx.Rect(int(x), int(h - y - dy),
+                                             int(dx), int(dy)))
+                wdc.SetClippingRegionAsRegion(region)
+            self._gc.pixel_map.draw_to_wxwindow(control, 0, 0)
         else:
-            # This should just be the Mac OS X code path
-            bmp = _wx_bitmap_from_buffer(pixel_map.convert_to_argb32string(),
-                                         self._gc.width(), self._gc.height())
-            wdc.DrawBitmap(bmp, 0, 0)
+            # Make bitmaps of only the damaged regions, flipped to wx's y
+            # axis; only their pixels are copied.
+            pixels = self._gc.bmp_array
+            if self._update_region is None:
+                rects = [(0, 0, self._gc.width(), h)]
+            else:
+                rects = [(int(x), int(h - y - dy), int(x + dx), int(h - y))
+                         for x, y, dx, dy in self._update_region]
+            for x, y, x2, y2 in rects:
+                x, y = max(x, 0), max(y, 0)
+                region = np.ascontiguousarray(pixels[y:y2, x:x2])
+                if region.size == 0:
+                    continue
+                height, width = region.shape[:2]
+                bmp = wx.BitmapFromBufferRGBA(width, height, region)
+                wdc.DrawBitmap(bmp, x, y)
 
         control._dc = None
         return
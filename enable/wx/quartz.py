@@ -87,6 +87,7 @@ class Window(BaseWindow):
     #### 'AbstractWindow' interface ############################################
 
     def _paint(self, event=None):
+        self._begin_paint()
         size = self._get_control_size()
         if (self._size != tuple(size)) or (self._gc is None):
             self._gc = self._create_gc(size)
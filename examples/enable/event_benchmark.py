@@ -0,0 +1,76 @@
+"""
+Benchmarks the creation of mouse events, and their dispatch through 10
+nested containers, with HasTraits and lightweight events.
+"""
+import time
+
+from enable.api import Component, Container, LightweightMouseEvent, \
+    MouseEvent
+
+
+def make_event(event_class):
+    return event_class(x=105.0, y=105.0, alt_down=False, control_down=False,
+                       shift_down=False, left_down=True, middle_down=False,
+                       right_down=False, mouse_wheel=0, window=None)
+
+
+def make_containers(depth=10):
+    """ Returns the outermost of **depth** nested containers, with a
+    component in the innermost one.
+    """
+    component = Component(position=[1, 1], bounds=[10, 10])
+    for i in range(depth):
+        container = Container(position=[1, 1], bounds=[200, 200])
+        container.add(component)
+        component = container
+    return component
+
+
+def time_creation(event_class, n):
+    t1 = time.time()
+    for i in xrange(n):
+        make_event(event_class)
+    return (time.time() - t1) / n
+
+
+def time_transforms(event_class, n, depth=10):
+    """ Times the event operations of a dispatch through **depth** levels,
+    without the components.
+    """
+    t1 = time.time()
+    for i in xrange(n):
+        event = make_event(event_class)
+        for level in range(depth):
+            event.offset_xy(1.0, 1.0)
+            event.x, event.y
+            event.handled
+        for level in range(depth):
+            event.pop()
+    return (time.time() - t1) / n
+
+
+def time_dispatch(event_class, container, n):
+    t1 = time.time()
+    for i in xrange(n):
+        container.dispatch(make_event(event_class), 'mouse_move')
+    return (time.time() - t1) / n
+
+
+def main():
+    container = make_containers()
+    n = 2000
+    print 'Per event:'
+    for event_class in (MouseEvent, LightweightMouseEvent):
+        print '    %s creation: %.1f us' % (
+            event_class.__name__, time_creation(event_class, n) * 1e6)
+    for event_class in (MouseEvent, LightweightMouseEvent):
+        print '    %s offset and pop at 10 levels: %.1f us' % (
+            event_class.__name__, time_transforms(event_class, n) * 1e6)
+    for event_class in (MouseEvent, LightweightMouseEvent):
+        print '    %s dispatch through 10 containers: %.1f us' % (
+            event_class.__name__,
+            time_dispatch(event_class, container, n) * 1e6)
+
+
+if __name__ == '__main__':
+    main()
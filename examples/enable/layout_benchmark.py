@@ -0,0 +1,71 @@
+"""
+Benchmarks the layout of a stacked container of 10000 components, with the
+notifications of the changes to the components sent one by one and merged
+by a layout transaction.
+"""
+import time
+
+from enable.api import Component, Container
+from enable.stacked_container import VStackedContainer
+
+
+class CountingContainer(Container):
+    """ A container which counts the damage notifications and the redraw
+    requests it gets.
+    """
+
+    def __init__(self, *components, **traits):
+        self.invalidations = self.redraws = 0
+        super(CountingContainer, self).__init__(*components, **traits)
+
+    def invalidate_draw(self, damaged_regions=None, self_relative=False):
+        self.invalidations += 1
+        super(CountingContainer, self).invalidate_draw(damaged_regions,
+                                                       self_relative)
+
+    def request_redraw(self):
+        self.redraws += 1
+
+
+def make_containers(n=10000):
+    """ Returns a stacked container of **n** containers, and the container
+    that it is in.
+    """
+    stacked = VStackedContainer(bounds=[200, 10 * n], auto_size=True)
+    for i in range(n):
+        stacked.add(Container(Component(bounds=[5, 5]), bounds=[10, 10],
+                              resizable="h"))
+    return stacked, CountingContainer(stacked, bounds=[200, 10 * n])
+
+
+def time_layout(layout):
+    """ Lays out the components at two widths, and returns the time per
+    layout and the number of notifications of the outer container.
+    """
+    stacked, top = make_containers()
+    n = 4
+    t1 = time.time()
+    for i in range(n):
+        stacked.bounds = [200 + i % 2, stacked.height]
+        layout(stacked)
+        stacked.request_redraw()
+    return (time.time() - t1) / n, top.invalidations / n, top.redraws / n
+
+
+def main():
+    def layout_without_transaction(stacked):
+        Component.do_layout(stacked, force=True)
+
+    def layout_with_transaction(stacked):
+        stacked.do_layout(force=True)
+
+    print 'Per layout of 10000 components:'
+    for name, layout in (('without transaction', layout_without_transaction),
+                         ('with transaction', layout_with_transaction)):
+        seconds, invalidations, redraws = time_layout(layout)
+        print '    %s: %.1f ms, %d damage notifications, %d redraws' % (
+            name, seconds * 1e3, invalidations, redraws)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmarks FontManager.findfont with a list of 5,000 fonts.
+"""
+import os
+import tempfile
+import time
+
+from kiva.fonttools.font_manager import FontEntry, FontManager, FontProperties
+
+
+def make_font_list(fname, n_fonts=5000):
+    """ Make font entries for 1,000 families, all using the font file
+    fname.
+    """
+    styles = ['normal', 'italic', 'oblique']
+    weights = ['light', 'normal', 'medium', 'bold', 'heavy']
+    return [FontEntry(fname, 'Family %d' % (i // 5), styles[i % 3],
+                      weight=weights[i % 5], size='scalable')
+            for i in range(n_fonts)]
+
+
+def make_properties(n_props=200):
+    return [FontProperties(family=['Family %d' % (i * 7 % 1200)],
+                           style=['normal', 'italic'][i % 2],
+                           weight=[300, 'bold', 'normal'][i % 3], size=12)
+            for i in range(n_props)]
+
+
+def linear_search(manager, prop):
+    """ Score every font, like findfont did before it had an index.
+    """
+    best_score = 1e64
+    best_font = None
+    for font in manager.ttflist:
+        score = \
+            manager.score_family(prop.get_family(), font.name) * 10.0 + \
+            manager.score_style(prop.get_style(), font.style) + \
+            manager.score_variant(prop.get_variant(), font.variant) + \
+            manager.score_weight(prop.get_weight(), font.weight) + \
+            manager.score_stretch(prop.get_stretch(), font.stretch) + \
+            manager.score_size(prop.get_size(), font.size)
+        if score < best_score:
+            best_score = score
+            best_font = font
+        if score == 0:
+            break
+    return best_font
+
+
+def main():
+    fd, fname = tempfile.mkstemp(suffix='.ttf')
+    os.close(fd)
+    try:
+        manager = FontManager()
+        manager.ttflist = make_font_list(fname)
+        manager.clear_lookup_caches()
+        # Only look up the fonts which exist, so that there is no
+        # fallback to the default font.
+        props = [prop for prop in make_properties()
+                 if int(prop.get_family()[0].split()[1]) < 1000]
+
+        t1 = time.time()
+        for prop in props:
+            linear_search(manager, prop)
+        t2 = time.time()
+        for prop in props:
+            manager.findfont(prop)
+        t3 = time.time()
+        for prop in props:
+            manager.findfont(prop)
+        t4 = time.time()
+    finally:
+        os.remove(fname)
+
+    n = len(props)
+    print 'findfont with %d fonts, per lookup:' % len(manager.ttflist)
+    print '    linear search: %.3f ms' % ((t2 - t1) / n * 1000)
+    print '    indexed search: %.3f ms' % ((t3 - t2) / n * 1000)
+    print '    cached: %.3f ms' % ((t4 - t3) / n * 1000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Benchmarks drawing the markers of a scatter plot with the Agg backend, with
+the marker path rasterized at every point and rasterized once as sprites.
+"""
+import time
+
+from numpy import pi, random
+
+from kiva.agg import GraphicsContextArray
+from kiva.constants import FILL_STROKE
+
+
+def draw_markers(points, add_marker, line_width, sprites):
+    """ Draws a marker at each of the points, and returns the time it took.
+    """
+    gc = GraphicsContextArray((800, 600))
+    gc.set_fill_color((1.0, 0.0, 0.0, 0.5))
+    gc.set_line_width(line_width)
+    path = gc.get_empty_path()
+    add_marker(path)
+    t1 = time.time()
+    gc.draw_path_at_points(points, path, FILL_STROKE, sprites=sprites)
+    return time.time() - t1
+
+
+def main():
+    points = random.uniform(0, 600, size=(100000, 2))
+    print 'Drawing %d markers:' % len(points)
+    for name, add_marker in (
+            ('circle', lambda path: path.arc(0, 0, 4, 0, 2 * pi)),
+            ('square', lambda path: path.rect(-4, -4, 8, 8))):
+        for line_width in (1.0, 2.5):
+            per_point = draw_markers(points, add_marker, line_width, False)
+            sprites = draw_markers(points, add_marker, line_width, True)
+            print '    %s, line width %.1f: %.3f s at every point, ' \
+                  '%.3f s with sprites' % (name, line_width, per_point,
+                                           sprites)
+
+
+if __name__ == '__main__':
+    main()
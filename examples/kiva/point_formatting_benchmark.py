@@ -0,0 +1,59 @@
+"""
+Benchmarks writing a polyline of a million points to SVG and PostScript.
+"""
+import time
+
+from numpy import linspace, column_stack, sin
+
+from kiva.point_formatting import format_points
+from kiva.ps import PSGC
+from kiva.svg import GraphicsContext
+
+
+def make_points(n_pts=1000000, sz=(1000, 1000)):
+    width, height = sz
+    x = linspace(0, width, n_pts)
+    y = height / 2. + height / 2. * sin(x * 50 / width)
+    return column_stack((x, y))
+
+
+def benchmark_format_points(pts):
+    """ Compare format_points with string formatting of each point.
+    """
+    t1 = time.time()
+    text = ''.join(['%3.2f,%3.2f ' % (x, y) for x, y in pts])
+    t2 = time.time()
+    fast = format_points(pts, 2)
+    t3 = time.time()
+    assert fast == text
+    print 'format %d points:' % len(pts)
+    print '    string formatting:', t2 - t1
+    print '    format_points:', t3 - t2
+
+
+def benchmark_backend(name, gc, pts):
+    """ Draw the points as a single polyline and render the document.
+    """
+    t1 = time.time()
+    gc.begin_path()
+    gc.lines(pts)
+    gc.stroke_path()
+    t2 = time.time()
+    print '%s: %f s, %d bytes' % (name, t2 - t1,
+                                  len(gc.contents.getvalue()))
+
+
+def main():
+    pts = make_points()
+    benchmark_format_points(pts)
+    sz = (1000, 1000)
+    benchmark_backend('svg', GraphicsContext(sz), pts)
+    benchmark_backend('svg, relative', GraphicsContext(sz, relative_paths=True),
+                      pts)
+    benchmark_backend('svg, 1 decimal', GraphicsContext(sz, precision=1), pts)
+    benchmark_backend('ps', PSGC(sz), pts)
+    benchmark_backend('ps, relative', PSGC(sz, relative_paths=True), pts)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmarks drawing the tick labels of a plot with the Agg backend, with and
+without the cache of the text drawn by show_text(), and with one call per
+label or one show_text_at_points() call per frame.  Also benchmarks
+measuring the labels one by one and with get_text_extents().
+"""
+import time
+
+from numpy import array
+
+from kiva.agg import GraphicsContextArray, global_text_run_cache
+from kiva.fonttools import Font
+from kiva.svg import GraphicsContext as SVGGraphicsContext
+from kiva.text_extents import default_cache
+
+
+def make_ticks():
+    """ Returns the labels and the points of the ticks of two axes, with 20
+    ticks each.
+    """
+    labels = ['%.1f' % (0.5 * i) for i in range(20)]
+    points = ([(40.5 + 37.3 * i, 10) for i in range(20)] +
+              [(5, 40.5 + 27.1 * i) for i in range(20)])
+    return labels * 2, array(points)
+
+
+def draw_ticks(gc, frames=50):
+    """ Draws the tick labels one by one **frames** times, and returns the
+    time per frame.
+    """
+    labels, points = make_ticks()
+    t1 = time.time()
+    for frame in range(frames):
+        for label, (x, y) in zip(labels, points):
+            gc.show_text_at_point(label, x, y)
+    return (time.time() - t1) / frames
+
+
+def draw_ticks_at_points(gc, frames=50):
+    """ Draws the tick labels in one call **frames** times, and returns the
+    time per frame.
+    """
+    labels, points = make_ticks()
+    t1 = time.time()
+    for frame in range(frames):
+        gc.show_text_at_points(labels, points)
+    return (time.time() - t1) / frames
+
+
+def measure_ticks(gc, frames=50):
+    """ Measures the tick labels one by one and in one call **frames** times,
+    and returns the times per frame.
+    """
+    labels, points = make_ticks()
+    t1 = time.time()
+    for frame in range(frames):
+        for label in labels:
+            gc.get_full_text_extent(label)
+    t2 = time.time()
+    default_cache.clear()
+    for frame in range(frames):
+        gc.get_text_extents(labels)
+    t3 = time.time()
+    return (t2 - t1) / frames, (t3 - t2) / frames
+
+
+def main():
+    gc = GraphicsContextArray((800, 600))
+    gc.set_font(Font('Arial', 12))
+    cache = global_text_run_cache()
+
+    print 'Per frame of 40 tick labels:'
+    for name, max_bytes, draw in (
+            ('without cache', 0, draw_ticks),
+            ('with cache', cache.max_bytes, draw_ticks),
+            ('with cache, show_text_at_points', cache.max_bytes,
+             draw_ticks_at_points)):
+        cache.set_max_bytes(max_bytes)
+        cache.clear()
+        cache.reset_counters()
+        seconds = draw(gc)
+        print '    %s: %.2f ms, %d hits, %d misses' % (
+            name, seconds * 1e3, cache.hits, cache.misses)
+
+    print 'Measuring 40 tick labels:'
+    svg_gc = SVGGraphicsContext((800, 600))
+    svg_gc.set_font(Font('Arial', 12))
+    for name, measured_gc in (('agg', gc), ('svg', svg_gc)):
+        one_by_one, batched = measure_ticks(measured_gc)
+        print '    %s: %.3f ms one by one, %.3f ms with get_text_extents' % (
+            name, one_by_one * 1e3, batched * 1e3)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,9 @@ from __future__ import absolute_import
 
 from abc import ABCMeta, abstractmethod
 
-from .constants import FILL_STROKE, SQUARE_MARKER
+import numpy as np
+
+from .constants import FILL_STROKE, SQUARE_MARKER, TEXT_ALIGNMENTS
 
 
 class AbstractGraphicsContext(object):
@@ -394,6 +396,19 @@ class AbstractGraphicsContext(object):
 
         """
 
+    def get_text_extents(self, strings):
+        """ Return the extents of many strings as an Nx4 array
+
+        Each row is the (x, y, w, h) extent of a string, as described in
+        get_text_extent().  Backends which can measure all the strings in
+        one call, or remember the extents of strings, override this.
+
+        """
+        extents = np.zeros((len(strings), 4))
+        for i, text in enumerate(strings):
+            extents[i] = self.get_text_extent(text)
+        return extents
+
     @abstractmethod
     def select_font(self, name, size=12, style="regular", encoding=None):
         """ Set the font based on the provided parameters
@@ -456,6 +471,27 @@ class AbstractGraphicsContext(object):
     def show_text_at_point(self, x, y):
         """ Draw text at the absolute position specified by the point """
 
+    def show_text_at_points(self, strings, points, align="left"):
+        """ Draw each string at the corresponding point
+
+        align is "left", "center" or "right", and gives the horizontal
+        position of each string relative to its point.  Backends which can
+        draw all the strings in one call override this.
+
+        """
+        if len(strings) != len(points):
+            raise ValueError("Expected as many points as strings")
+        if align not in TEXT_ALIGNMENTS:
+            raise ValueError("Unknown text alignment: %r" % (align,))
+        fraction = TEXT_ALIGNMENTS[align]
+        position = self.get_text_position()
+        for text, (x, y) in zip(strings, points):
+            if fraction:
+                x -= fraction * self.get_full_text_extent(text)[0]
+            self.set_text_position(x, y)
+            self.show_text(text)
+        self.set_text_position(*position)
+
     # -------------------------------------------
     # Misc functions
     # -------------------------------------------
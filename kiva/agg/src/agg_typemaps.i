@@ -265,6 +265,65 @@
     }
 }
 
+// --------------------------------------------------------------------------
+// Typemaps for (char** strings, int string_count)
+//
+//    For: show_text_at_points
+//
+//    This typemap takes any sequence of strings.  Unicode strings are
+//    encoded as utf8, and the encoded strings are kept alive until the call
+//    returns.
+// --------------------------------------------------------------------------
+
+%typemap(in) (char** strings, int string_count) (PyObject* seq=NULL,
+                                                 PyObject* encoded=NULL)
+{
+    seq = PySequence_Fast($input, "Expected a sequence of strings");
+    if (!seq)
+    {
+        goto fail;
+    }
+    $2 = PySequence_Fast_GET_SIZE(seq);
+    encoded = PyList_New($2);
+    if (!encoded)
+    {
+        goto fail;
+    }
+    $1 = new char*[$2 + 1];
+    for (int i = 0; i < $2; i++)
+    {
+        PyObject* item = PySequence_Fast_GET_ITEM(seq, i);
+        PyObject* text = NULL;
+        if (PyUnicode_Check(item))
+        {
+            text = PyUnicode_AsUTF8String(item);
+            if (!text)
+            {
+                goto fail;
+            }
+        }
+        else if (PyString_Check(item))
+        {
+            text = item;
+            Py_INCREF(text);
+        }
+        else
+        {
+            PyErr_SetString(PyExc_TypeError, "Expected a sequence of strings");
+            goto fail;
+        }
+        PyList_SET_ITEM(encoded, i, text);
+        $1[i] = PyString_AS_STRING(text);
+    }
+}
+
+%typemap(freearg) (char** strings, int string_count)
+{
+    delete [] $1;
+    Py_XDECREF(seq$argnum);
+    Py_XDECREF(encoded$argnum);
+}
+
 // --------------------------------------------------------------------------
 // Image typemaps
 //
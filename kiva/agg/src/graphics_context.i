@@ -212,7 +212,11 @@ namespace kiva {
         import numpy
 
         # Define paths for the two markers that Agg renders incorrectly
-        from kiva.constants import DIAMOND_MARKER, CIRCLE_MARKER, FILL_STROKE
+        from kiva.constants import SQUARE_MARKER, DIAMOND_MARKER, \
+            CIRCLE_MARKER, CROSSED_CIRCLE_MARKER, CROSS_MARKER, \
+            TRIANGLE_MARKER, INVERTED_TRIANGLE_MARKER, PLUS_MARKER, \
+            DOT_MARKER, PIXEL_MARKER, FILL, STROKE, FILL_STROKE, \
+            TEXT_ALIGNMENTS
 
         def circle_marker_path(path, size):
             circle_points = array([[ 1.   ,  0.   ],
@@ -252,11 +256,63 @@ namespace kiva {
             CIRCLE_MARKER: (circle_marker_path, FILL_STROKE)
         }
 
+        # Paths for the markers which are drawn as sprites, in the shapes of
+        # the Agg markers
+        def square_marker_path(path, size):
+            path.rect(-size, -size, size * 2, size * 2)
+
+        def diamond_marker_path(path, size):
+            path.lines(array(((0, -size), (-size, 0), (0, size), (size, 0))))
+            path.close_path()
+
+        def triangle_marker_path(path, size):
+            path.lines(array(((-size, -size), (size, -size), (0, size))))
+            path.close_path()
+
+        def inverted_triangle_marker_path(path, size):
+            path.lines(array(((-size, size), (size, size), (0, -size))))
+            path.close_path()
+
+        def cross_marker_path(path, size):
+            path.move_to(-size, -size)
+            path.line_to(size, size)
+            path.move_to(size, -size)
+            path.line_to(-size, size)
+
+        def plus_marker_path(path, size):
+            path.move_to(0, -size)
+            path.line_to(0, size)
+            path.move_to(-size, 0)
+            path.line_to(size, 0)
+
+        def crossed_circle_marker_path(path, size):
+            circle_marker_path(path, size)
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                path.move_to(dx * size, dy * size)
+                path.line_to(dx * size * 1.5, dy * size * 1.5)
+
+        def pixel_marker_path(path, size):
+            path.rect(-0.5, -0.5, 1, 1)
+
+        marker_paths = {
+            SQUARE_MARKER: (square_marker_path, FILL_STROKE),
+            DIAMOND_MARKER: (diamond_marker_path, FILL_STROKE),
+            CIRCLE_MARKER: (circle_marker_path, FILL_STROKE),
+            CROSSED_CIRCLE_MARKER: (crossed_circle_marker_path, FILL_STROKE),
+            CROSS_MARKER: (cross_marker_path, STROKE),
+            TRIANGLE_MARKER: (triangle_marker_path, FILL_STROKE),
+            INVERTED_TRIANGLE_MARKER: (inverted_triangle_marker_path,
+                                       FILL_STROKE),
+            PLUS_MARKER: (plus_marker_path, STROKE),
+            DOT_MARKER: (circle_marker_path, FILL),
+            PIXEL_MARKER: (pixel_marker_path, FILL),
+        }
+
         # global freetype engine for text rendering.
         #from enthought import freetype
         #ft_engine = freetype.FreeType(dpi=120.0)
 
-        from kiva import fonttools
+        from kiva import fonttools, text_extents
 
         def handle_unicode(text):
             "Returns a utf8 encoded 8-bit string from 'text'"
@@ -283,6 +339,31 @@ namespace kiva {
 
     %}
 
+    %nodefault text_run_cache;
+    %rename(TextRunCache) text_run_cache;
+
+    class text_run_cache
+    {
+        public:
+            %immutable;
+            unsigned hits;
+            unsigned misses;
+            unsigned evictions;
+            unsigned bytes;
+            unsigned max_bytes;
+            %mutable;
+
+            unsigned size();
+            void clear();
+            void reset_counters();
+            void set_max_bytes(unsigned value);
+    };
+
+    // The cache of the text drawn by show_text(), which is shared by all
+    // the graphics contexts.
+    %rename(global_text_run_cache) GlobalTextRunCache;
+    kiva::text_run_cache* GlobalTextRunCache();
+
     %nodefault;
     %rename(GraphicsContextArray) graphics_context_base;
 
@@ -446,6 +527,29 @@ namespace kiva {
             %}
             bool show_text_at_point(char *text, double dx, double dy);
 
+            %feature("shadow") show_text_at_points(char** strings, int string_count,
+                                                   double* point_array, int point_count,
+                                                   double align)
+            %{
+            def show_text_at_points(self, strings, points, align="left"):
+                """ Draws each string at the corresponding point of an Nx2
+                    array, in one call.  align is "left", "center" or "right",
+                    and gives the horizontal position of the text relative to
+                    its point.  Newlines are not handled.
+                """
+                if len(strings) != len(points):
+                    raise ValueError("Expected as many points as strings")
+                if align not in TEXT_ALIGNMENTS:
+                    raise ValueError("Unknown text alignment: %r" % (align,))
+                success = _agg.GraphicsContextArray_show_text_at_points(
+                    self, strings, points, TEXT_ALIGNMENTS[align])
+                if not success:
+                    raise RuntimeError, "Font not loaded/initialized."
+            %}
+            bool show_text_at_points(char** strings, int string_count,
+                                     double* point_array, int point_count,
+                                     double align);
+
             %pythoncode
             %{
             def show_text(self, text, point = None):
@@ -464,13 +568,15 @@ namespace kiva {
                 orig_tm = self.get_text_matrix()
                 next_tm = orig_tm
                 success = True
-                for line in linelist:
+                for i, line in enumerate(linelist):
                     self.set_text_matrix(next_tm)
                     success = success and self.show_text_simple(line)
-                    extent = self.get_text_extent(line)
-                    txt_xlat = translation_matrix(0,(extent[1]-extent[3])*1.4)
-                    txt_xlat.multiply(next_tm)
-                    next_tm = txt_xlat
+                    # Only the lines after the first one need the extent.
+                    if i + 1 < len(linelist):
+                        extent = self.get_text_extent(line)
+                        txt_xlat = translation_matrix(0,(extent[1]-extent[3])*1.4)
+                        txt_xlat.multiply(next_tm)
+                        next_tm = txt_xlat
 
                 if point:
                     self.set_text_position(*savepoint)
@@ -490,6 +596,29 @@ namespace kiva {
             %}
             kiva::rect_type get_text_extent(char *text);
 
+            %feature("shadow") get_text_extents(char** strings, int string_count,
+                                                double* rect_array, int rect_count)
+            %{
+            def get_text_extents(self, strings):
+                """ Returns the extents of strings, as returned by
+                    get_text_extent(), in the rows of an Nx4 array.  The
+                    extents are remembered by font and string.
+                """
+                if not self.is_font_initialized():
+                    raise RuntimeError, "Font not loaded/initialized."
+                font = self.get_font()
+                return text_extents.default_cache.get_extents(
+                    ('agg', font.filename, font.name, font.size), strings,
+                    self._measure_text_extents)
+
+            def _measure_text_extents(self, strings):
+                extents = zeros((len(strings), 4))
+                _agg.GraphicsContextArray_get_text_extents(self, strings, extents)
+                return extents
+            %}
+            void get_text_extents(char** strings, int string_count,
+                                  double* rect_array, int rect_count);
+
             bool is_font_initialized();
 
             %feature("shadow") set_text_matrix(agg24::trans_affine& value)
@@ -731,30 +860,63 @@ namespace kiva {
             %feature("shadow") draw_marker_at_points(double* pts,int Npts, int size,
                                        agg24::marker_e type = agg24::marker_square)
             %{
-            def draw_marker_at_points(self, pts, size, kiva_marker_type):
+            def draw_marker_at_points(self, pts, size, kiva_marker_type,
+                                      sprites=True):
+                """ Draws a marker at each of the points.
+
+                The Agg markers are drawn on whole pixels when the ctm is a
+                translation and the line width is 0 or 1.  Otherwise, and for
+                circles, the marker is drawn as a path.  If sprites is True,
+                the path is rasterized once and blended at each point (see
+                draw_path_at_points), else it is rasterized at every point.
+
+                Returns 1 if the markers were drawn and 0 otherwise.
+                """
                 marker = kiva_marker_to_agg.get(kiva_marker_type, None)
                 if marker is None:
-                    success = 0
-                elif kiva_marker_type in (CIRCLE_MARKER,):
-                    # The kiva circle marker is rather jagged so lets
-                    # use our own
-                    path_func, mode = substitute_markers[kiva_marker_type]
-                    path = self.get_empty_path()
-                    path_func(path, size)
-                    success = _agg.GraphicsContextArray_draw_path_at_points(self, pts, path, mode)
-                else:
-                    args = (self,pts,int(size),marker)
-                    success = _agg.GraphicsContextArray_draw_marker_at_points(self, pts,
-                                    int(size), marker)
-                return success
+                    return 0
+                if kiva_marker_type not in substitute_markers:
+                    success = _agg.GraphicsContextArray_draw_marker_at_points(
+                        self, pts, int(size), marker)
+                    if success or not sprites:
+                        return success
+                path_func, mode = marker_paths[kiva_marker_type]
+                path = self.get_empty_path()
+                path_func(path, size)
+                self.draw_path_at_points(pts, path, mode, sprites)
+                return 1
             %}
             int draw_marker_at_points(double* pts,int Npts, int size,
                                        agg24::marker_e type = agg24::marker_square);
 
+            %feature("shadow") draw_path_at_points(double* pts,int Npts,
+                                  kiva::compiled_path& marker,
+                                  kiva::draw_mode_e mode)
+            %{
+            def draw_path_at_points(self, pts, path, mode, sprites=False):
+                """ Draws a path at each of the points.
+
+                If sprites is True, the path is rasterized once for each
+                quarter of a pixel which the points fall on, and its
+                coverage is blended at each point.  This is much faster for
+                many points, but moves them by up to an eighth of a pixel.
+                Gradient fills and very large paths are still rasterized at
+                every point.
+                """
+                if not (sprites and
+                        _agg.GraphicsContextArray_draw_path_sprites_at_points(
+                            self, pts, path, mode)):
+                    _agg.GraphicsContextArray_draw_path_at_points(self, pts,
+                                                                  path, mode)
+            %}
             void draw_path_at_points(double* pts,int Npts,
                                   kiva::compiled_path& marker,
                                   kiva::draw_mode_e mode);
 
+            int draw_path_sprites_at_points(double* pts,int Npts,
+                                  kiva::compiled_path& marker,
+                                  kiva::draw_mode_e mode);
+
             // additional methods added as pure python
             %pythoncode
             %{
@@ -880,6 +1042,9 @@ def init(self, ary_or_size, pix_format="bgra32",
     """ When specifying size, it must be a two element tuple.
         Array input is always treated as an image.
 
+        The array may be a view of a sub-rectangle of a larger image, which
+        the GC draws into, but the pixels of each row must be contiguous.
+
         This class handles the polymorphism of the underlying
         template classes for individual pixel formats.
     """
@@ -908,6 +1073,9 @@ def init(self, ary_or_size, pix_format="bgra32",
             raise TypeError, msg
         msg = "Only UnsignedInt8 arrays are supported but got "
         assert ary.dtype == dtype('uint8'), msg + repr(ary.dtype)
+        if ary.strides[-1] != 1 or ary.strides[1] != ary.itemsize * img_depth:
+            msg = "The pixels of each row of the array must be contiguous"
+            raise ValueError(msg)
 
     if cvar.ALWAYS_32BIT_WORKAROUND_FLAG:
         if ary.shape[-1] == 3:
@@ -9,6 +9,7 @@
 #include <assert.h>
 #include <string.h>
 #include <stack>
+#include <algorithm>
 
 #if defined(_WIN32) || defined(__WIN32__) || defined(__CYGWIN__)
 #include <windows.h>
@@ -34,6 +35,7 @@
 #include "agg_scanline_u.h"
 #include "agg_scanline_bin.h"
 #include "agg_scanline_p.h"
+#include "agg_scanline_storage_aa.h"
 
 #include "agg_renderer_mclip.h"
 #include "agg_renderer_scanline.h"
@@ -56,6 +58,7 @@
 #include "kiva_graphics_context_base.h"
 #include "kiva_alpha_gamma.h"
 #include "kiva_gradient.h"
+#include "kiva_text_run_cache.h"
 
 namespace kiva
 {
@@ -141,6 +144,15 @@ namespace kiva
                                   kiva::compiled_path& marker,
                                   draw_mode_e mode);
 
+        int draw_path_sprites_at_points(double* pts,int Npts,
+                                        kiva::compiled_path& marker,
+                                        draw_mode_e mode);
+
+        private:
+        void _sprite_scanlines(agg24::rendering_buffer& sprite_buf,
+                               std::vector<agg24::int8u>& scanlines);
+
+        public:
         //---------------------------------------------------------------
         // Text handling
         //---------------------------------------------------------------
@@ -1282,43 +1294,238 @@ namespace kiva
 
     }
 
+    // Number of sprites across a pixel in each direction.  The points are
+    // rounded to the nearest 1/sprite_subpixels of a pixel.
+    const int sprite_subpixels = 4;
+    // Markers larger than this (in pixels) are drawn point by point.
+    const double max_sprite_area = 512.0 * 512.0;
+
+    template <class agg_pixfmt>
+    int graphics_context<agg_pixfmt>::draw_path_sprites_at_points(double* pts,int Npts,
+                              kiva::compiled_path& marker,
+                              draw_mode_e mode)
+    {
+        // This routine draws a path (i.e. marker) at multiple points like
+        // draw_path_at_points(), but only rasterizes it once for each
+        // fraction of a pixel the points fall on.  Markers have the same
+        // shape at every point, so the coverage of the fill and of the
+        // stroke is rendered into a sprite, with the current line width,
+        // caps, joins, dashes and antialiasing, and blended with the fill
+        // and stroke colors at each point.
+
+        bool fill = (mode != STROKE && this->state.fill_color.a != 0);
+        bool stroke = (mode == STROKE || mode == FILL_STROKE ||
+                       mode == EOF_FILL_STROKE) &&
+                      this->state.line_color.a != 0 &&
+                      this->state.line_width != 0.0;
+        // Gradients depend on where the marker is drawn.
+        if (fill && this->state.gradient_fill.gradient_type != kiva::grad_none)
+        {
+            return 0;
+        }
+
+        // The shape of the marker only depends on the linear part of the
+        // ctm.
+        agg24::trans_affine ctm = this->get_ctm();
+        double linear[6];
+        ctm.store_to(linear);
+        agg24::trans_affine linear_ctm(linear[0], linear[1], linear[2],
+                                       linear[3], 0.0, 0.0);
+
+        bool empty = true;
+        double x1 = 0., y1 = 0., x2 = 0., y2 = 0.;
+        for (unsigned i = 0; i < marker.total_vertices(); ++i)
+        {
+            double x, y;
+            if (!agg24::is_vertex(marker.vertex(i, &x, &y)))
+            {
+                continue;
+            }
+            linear_ctm.transform(&x, &y);
+            if (empty)
+            {
+                x1 = x2 = x;
+                y1 = y2 = y;
+                empty = false;
+            }
+            x1 = std::min(x1, x); x2 = std::max(x2, x);
+            y1 = std::min(y1, y); y2 = std::max(y2, y);
+        }
+        if (empty || !(fill || stroke))
+        {
+            return 1;
+        }
+
+        // Leave room for the stroke and for the offsets of the sprites.  The
+        // stroker uses Agg's default miter limit of 4, so a miter join
+        // reaches out at most 4 half line widths from its vertex, which
+        // also covers square caps.  The Frobenius norm of the linear ctm
+        // bounds how much it stretches the line width.
+        const double reach = 4.0;
+        double stretch = sqrt(linear[0] * linear[0] + linear[1] * linear[1] +
+                              linear[2] * linear[2] + linear[3] * linear[3]);
+        int pad = 0;
+        if (stroke)
+        {
+            pad = int(ceil(reach * this->state.line_width / 2 * stretch));
+        }
+        pad += 2;
+        int left = int(floor(x1)) - pad;
+        int bottom = int(floor(y1)) - pad;
+        int width = int(ceil(x2)) + pad + 1 - left;
+        int height = int(ceil(y2)) + pad + 1 - bottom;
+        if (double(width) * height > max_sprite_area)
+        {
+            return 0;
+        }
+
+        std::vector<agg24::int8u> pixels(width * height * 4);
+        graphics_context<agg24::pixfmt_rgba32> sprite(&pixels[0], width,
+                                                      height, width * 4);
+        sprite.state.fill_color = agg24::rgba(1, 1, 1, 1);
+        sprite.state.line_color = agg24::rgba(1, 1, 1, 1);
+        sprite.state.line_width = this->state.line_width;
+        sprite.state.line_cap = this->state.line_cap;
+        sprite.state.line_join = this->state.line_join;
+        sprite.state.line_dash = this->state.line_dash;
+        sprite.state.miter_limit = this->state.miter_limit;
+        sprite.state.should_antialias = this->state.should_antialias;
+
+        draw_mode_e fill_mode = (mode == EOF_FILL || mode == EOF_FILL_STROKE) ?
+                                EOF_FILL : FILL;
+
+        // The fill and stroke coverage of each sprite, rasterized when a
+        // point first falls on it.
+        const int sprite_count = sprite_subpixels * sprite_subpixels;
+        std::vector<bool> rasterized(sprite_count, false);
+        std::vector< std::vector<agg24::int8u> > fill_scanlines(sprite_count);
+        std::vector< std::vector<agg24::int8u> > stroke_scanlines(sprite_count);
+
+        typedef agg24::renderer_scanline_aa_solid<renderer_base_type> renderer_type;
+        renderer_type fill_renderer(this->renderer);
+        renderer_type stroke_renderer(this->renderer);
+        agg24::rgba color = this->state.fill_color;
+        color.a *= this->state.alpha;
+        fill_renderer.color(color);
+        color = this->state.line_color;
+        color.a *= this->state.alpha;
+        stroke_renderer.color(color);
+        agg24::serialized_scanlines_adaptor_aa8::embedded_scanline scanline;
+
+        for(int i = 0; i < Npts*2; i+=2)
+        {
+            double x = pts[i];
+            double y = pts[i+1];
+            ctm.transform(&x, &y);
+            double origin_x = floor(x);
+            double origin_y = floor(y);
+            int sub_x = int(floor((x - origin_x) * sprite_subpixels + 0.5));
+            int sub_y = int(floor((y - origin_y) * sprite_subpixels + 0.5));
+            if (sub_x == sprite_subpixels)
+            {
+                origin_x += 1;
+                sub_x = 0;
+            }
+            if (sub_y == sprite_subpixels)
+            {
+                origin_y += 1;
+                sub_y = 0;
+            }
+
+            int index = sub_y * sprite_subpixels + sub_x;
+            if (!rasterized[index])
+            {
+                agg24::trans_affine offset(linear[0], linear[1], linear[2],
+                        linear[3],
+                        double(sub_x) / sprite_subpixels - left,
+                        double(sub_y) / sprite_subpixels - bottom);
+                sprite.set_ctm(offset);
+                if (fill)
+                {
+                    sprite.clear(agg24::rgba(0, 0, 0, 0));
+                    sprite.add_path(marker);
+                    sprite.draw_path(fill_mode);
+                    this->_sprite_scanlines(sprite.buf, fill_scanlines[index]);
+                }
+                if (stroke)
+                {
+                    sprite.clear(agg24::rgba(0, 0, 0, 0));
+                    sprite.add_path(marker);
+                    sprite.draw_path(STROKE);
+                    this->_sprite_scanlines(sprite.buf, stroke_scanlines[index]);
+                }
+                rasterized[index] = true;
+            }
+
+            if (!fill_scanlines[index].empty())
+            {
+                agg24::serialized_scanlines_adaptor_aa8 adaptor(
+                    &fill_scanlines[index][0], fill_scanlines[index].size(),
+                    origin_x + left, origin_y + bottom);
+                agg24::render_scanlines(adaptor, scanline, fill_renderer);
+            }
+            if (!stroke_scanlines[index].empty())
+            {
+                agg24::serialized_scanlines_adaptor_aa8 adaptor(
+                    &stroke_scanlines[index][0], stroke_scanlines[index].size(),
+                    origin_x + left, origin_y + bottom);
+                agg24::render_scanlines(adaptor, scanline, stroke_renderer);
+            }
+        }
+        return 1;
+    }
+
+    template <class agg_pixfmt>
+    void graphics_context<agg_pixfmt>::_sprite_scanlines(
+                              agg24::rendering_buffer& sprite_buf,
+                              std::vector<agg24::int8u>& scanlines)
+    {
+        // Stores the alpha channel of an RGBA sprite as serialized scanlines
+        // of coverage.
+        agg24::scanline_storage_aa8 storage;
+        agg24::scanline_u8 scanline;
+        storage.prepare();
+        scanline.reset(0, sprite_buf.width() - 1);
+        for (unsigned y = 0; y < sprite_buf.height(); y++)
+        {
+            const agg24::int8u* row = sprite_buf.row_ptr(y);
+            scanline.reset_spans();
+            for (unsigned x = 0; x < sprite_buf.width(); x++)
+            {
+                agg24::int8u cover = row[4 * x + agg24::order_rgba::A];
+                if (cover)
+                {
+                    scanline.add_cell(x, cover);
+                }
+            }
+            if (scanline.num_spans())
+            {
+                scanline.finalize(y);
+                storage.render(scanline);
+            }
+        }
+
+        scanlines.clear();
+        if (storage.rewind_scanlines())
+        {
+            scanlines.resize(storage.byte_size());
+            storage.serialize(&scanlines[0]);
+        }
+    }
+
     template <class agg_pixfmt>
     bool graphics_context<agg_pixfmt>::show_text(char*text)
     {
-        typedef agg24::glyph_raster_bin<agg24::rgba8>                   GlyphGeneratorType;
         typedef agg24::renderer_scanline_aa_solid<renderer_base_type> ScanlineRendererType;
 
-        //GlyphGeneratorType glyphGen(0);
         ScanlineRendererType scanlineRenderer(this->renderer);
 
-        const agg24::glyph_cache *glyph = NULL;
-#if defined(_WIN32) || defined(__WIN32__) || defined(__CYGWIN__)
-        int required = MultiByteToWideChar(CP_UTF8, 0, text, -1, 0, 0);
-        std::vector<wchar_t> p_(required + 1);
-        MultiByteToWideChar(CP_UTF8, 0, text, -1, &p_[0], required);
-        wchar_t *p = &p_[0];
-#else
-        std::vector <wchar_t> p_(1024);
-        size_t length = mbstowcs(&p_[0], text, 1024);
-        if (length > 1024)
-          {
-            p_.resize (length + 1);
-            mbstowcs(&p_[0], text, length);
-          }
-        wchar_t *p = &p_[0];
-#endif
-        bool retval = true;
-
         // Check to make sure the font's loaded.
         if (!this->is_font_initialized())
         {
             return false;
         }
 
-        this->_grab_font_manager();
-        font_engine_type *font_engine = kiva::GlobalFontEngine();
-        font_manager_type *font_manager = kiva::GlobalFontManager();
-
         // Concatenate the CTM with the text matrix to get the full transform for the
         // font engine.
     	agg24::trans_affine full_text_xform(this->text_matrix * this->path.get_ctm());
@@ -1338,7 +1545,6 @@ namespace kiva
        text_xform_array[5] = 0.0;
 
        full_text_xform.load_from(text_xform_array);
-       font_engine->transform(full_text_xform);
 
         if (this->state.text_drawing_mode == kiva::TEXT_FILL)
         {
@@ -1350,40 +1556,52 @@ namespace kiva
             scanlineRenderer.color(this->state.line_color);
         }
 
-        double advance_x = 0.0;
-        double advance_y = 0.0;
+        // The glyphs are placed on whole pixels, so the coverage of a run
+        // only depends on the fractional part of its starting point, and
+        // is drawn from the integer part.
+        double origin_x = floor(start_x);
+        double origin_y = floor(start_y);
+        double dx = start_x - origin_x;
+        double dy = start_y - origin_y;
 
-        while (*p)
+        bool retval = true;
+        kiva::text_run run;
+        const kiva::text_run *drawn = &run;
+        if (this->state.text_drawing_mode == kiva::TEXT_INVISIBLE)
         {
-            double x = start_x + advance_x;
-            double y = start_y + advance_y;
-            glyph = font_manager->glyph(*p);
-
-            if (glyph == NULL)
+            retval = this->_rasterize_text_run(text, full_text_xform, dx, dy,
+                                               run, false);
+        }
+        else
+        {
+            kiva::text_run_cache *cache = kiva::GlobalTextRunCache();
+            std::string key = kiva::text_run_key(this->state.font.filename,
+                                                 this->state.font.name,
+                                                 this->state.font.size,
+                                                 text_xform_array, dx, dy,
+                                                 text);
+            drawn = cache->find(key);
+            if (drawn == NULL)
             {
-                retval = false;
-                break;
+                retval = this->_rasterize_text_run(text, full_text_xform,
+                                                   dx, dy, run, true);
+                // Runs with missing glyphs are drawn as far as they go,
+                // but not cached.
+                drawn = retval ? cache->insert(key, run) : &run;
             }
-            font_manager->add_kerning(&x, &y);
-            font_manager->init_embedded_adaptors(glyph, x, y);
-            if (this->state.text_drawing_mode != kiva::TEXT_INVISIBLE)
+
+            if (!drawn->scanlines.empty())
             {
-                agg24::render_scanlines(font_manager->gray8_adaptor(),
-                                      font_manager->gray8_scanline(),
-                                      scanlineRenderer);
+                agg24::serialized_scanlines_adaptor_aa8 adaptor(
+                    &drawn->scanlines[0], drawn->scanlines.size(),
+                    origin_x, origin_y);
+                agg24::serialized_scanlines_adaptor_aa8::embedded_scanline scanline;
+                agg24::render_scanlines(adaptor, scanline, scanlineRenderer);
             }
-
-            advance_x += glyph->advance_x;
-            advance_y += glyph->advance_y;
-            p++;
         }
 
-        agg24::trans_affine null_xform = agg24::trans_affine_translation(0., 0.);
-        font_engine->transform(null_xform);
-        this->_release_font_manager();
-
-        agg24::trans_affine trans = agg24::trans_affine_translation(advance_x,
-    	                                                        advance_y);
+        agg24::trans_affine trans = agg24::trans_affine_translation(drawn->advance_x,
+    	                                                        drawn->advance_y);
         this->text_matrix.multiply(trans);
         return retval;
     }
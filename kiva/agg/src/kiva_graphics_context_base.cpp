@@ -10,6 +10,7 @@
 
 #include <assert.h>
 #include "agg_path_storage.h"
+#include "agg_scanline_storage_aa.h"
 #include "kiva_exceptions.h"
 #include "kiva_graphics_context_base.h"
 
@@ -53,6 +54,7 @@ graphics_context_base::graphics_context_base(unsigned char *data, int width,
                        _image_interpolation(interp)
 {
    this->buf.attach(data, width, height, stride);
+   this->_holding_font_manager = false;
 }
 
 graphics_context_base::~graphics_context_base()
@@ -516,6 +518,14 @@ agg24::path_storage graphics_context_base::boundary_path(agg24::trans_affine& af
     return clip_path;
 }
 
+int graphics_context_base::draw_path_sprites_at_points(double* pts, int Npts,
+                                                       kiva::compiled_path& marker,
+                                                       draw_mode_e mode)
+{
+    // Only the Agg pixel formats can blend sprites.
+    return 0;
+}
+
 /////////////////////////////////////////////////////////////////////////////
 // Text methods
 /////////////////////////////////////////////////////////////////////////////
@@ -576,7 +586,83 @@ bool graphics_context_base::show_text_at_point(char *text,
     return retval;
 }
 
+bool graphics_context_base::show_text_at_points(char** strings,
+                                                int string_count,
+                                                double* point_array,
+                                                int point_count,
+                                                double align)
+{
+    if (!this->is_font_initialized())
+    {
+        return false;
+    }
+
+    double oldx, oldy;
+    bool retval = true;
+
+    this->get_text_position(&oldx, &oldy);
+    // The strings are measured and rasterized with the font loaded once.
+    this->_grab_font_manager();
+    this->_holding_font_manager = true;
+    for (int i = 0; i < string_count && i < point_count; i++)
+    {
+        double tx = point_array[2*i];
+        double ty = point_array[2*i+1];
+        if (align != 0.0)
+        {
+            tx -= align * this->_measure_text(strings[i]).w;
+        }
+        this->set_text_position(tx, ty);
+        retval = this->show_text(strings[i]) && retval;
+    }
+    this->_holding_font_manager = false;
+    this->_release_font_manager();
+    this->set_text_position(oldx, oldy);
+    return retval;
+}
+
 kiva::rect_type graphics_context_base::get_text_extent(char *text)
+{
+    static font_manager_type *font_manager = GlobalFontManager();
+
+    if (font_manager == NULL)
+        return kiva::rect_type(0, 0, 0, 0);
+
+    this->_grab_font_manager();
+    kiva::rect_type extent = this->_measure_text(text);
+    this->_release_font_manager();
+
+    return extent;
+}
+
+void graphics_context_base::get_text_extents(char** strings,
+                                             int string_count,
+                                             double* rect_array,
+                                             int rect_count)
+{
+    static font_manager_type *font_manager = GlobalFontManager();
+
+    int count = (string_count < rect_count) ? string_count : rect_count;
+    for (int i = 0; i < 4*count; i++)
+    {
+        rect_array[i] = 0.0;
+    }
+    if (font_manager == NULL)
+        return;
+
+    this->_grab_font_manager();
+    for (int i = 0; i < count; i++)
+    {
+        kiva::rect_type extent = this->_measure_text(strings[i]);
+        rect_array[4*i] = extent.x;
+        rect_array[4*i+1] = extent.y;
+        rect_array[4*i+2] = extent.w;
+        rect_array[4*i+3] = extent.h;
+    }
+    this->_release_font_manager();
+}
+
+kiva::rect_type graphics_context_base::_measure_text(char *text)
 {
     const agg24::glyph_cache *glyph = NULL;
 
@@ -598,15 +684,7 @@ kiva::rect_type graphics_context_base::get_text_extent(char *text)
 
     double x1 = 0.0, x2 = 0.0, y1 = 0.0, y2= 0.0;
 
-    static font_manager_type *font_manager = GlobalFontManager();
-
-    if (font_manager == NULL)
-        return kiva::rect_type(0, 0, 0, 0);
-
-    this->_grab_font_manager();
-
-    //typedef agg24::glyph_raster_bin<agg24::rgba8> GlyphGeneratorType;
-    //GlyphGeneratorType glyphGen(this->font_manager.glyph(*p)->data);
+    font_manager_type *font_manager = GlobalFontManager();
 
     while (*p)
     {
@@ -624,8 +702,6 @@ kiva::rect_type graphics_context_base::get_text_extent(char *text)
         p++;
     }
 
-    this->_release_font_manager();
-
     return kiva::rect_type(x1, y1, x2-x1, y2 - y1);
 }
 
@@ -706,6 +782,108 @@ void graphics_context_base::_grab_font_manager()
 
 }
 
+bool graphics_context_base::_rasterize_text_run(char *text,
+                                                agg24::trans_affine& transform,
+                                                double dx, double dy,
+                                                kiva::text_run& run,
+                                                bool rasterize)
+{
+    if (this->_holding_font_manager)
+    {
+        return this->_rasterize_grabbed_text_run(text, transform, dx, dy,
+                                                 run, rasterize);
+    }
+
+    this->_grab_font_manager();
+    bool retval = this->_rasterize_grabbed_text_run(text, transform, dx, dy,
+                                                    run, rasterize);
+    this->_release_font_manager();
+    return retval;
+}
+
+bool graphics_context_base::_rasterize_grabbed_text_run(char *text,
+                                                agg24::trans_affine& transform,
+                                                double dx, double dy,
+                                                kiva::text_run& run,
+                                                bool rasterize)
+{
+    const agg24::glyph_cache *glyph = NULL;
+#if defined(_WIN32) || defined(__WIN32__) || defined(__CYGWIN__)
+    int required = MultiByteToWideChar(CP_UTF8, 0, text, -1, 0, 0);
+    std::vector<wchar_t> p_(required + 1);
+    MultiByteToWideChar(CP_UTF8, 0, text, -1, &p_[0], required);
+    wchar_t *p = &p_[0];
+#else
+    std::vector <wchar_t> p_(1024);
+    size_t length = mbstowcs(&p_[0], text, 1024);
+    if (length > 1024)
+      {
+        p_.resize (length + 1);
+        mbstowcs(&p_[0], text, length);
+      }
+    wchar_t *p = &p_[0];
+#endif
+    bool retval = true;
+
+    font_engine_type *font_engine = GlobalFontEngine();
+    font_manager_type *font_manager = GlobalFontManager();
+    font_engine->transform(transform);
+
+    // The glyphs are gathered in one scanline storage, in the order they
+    // are drawn.
+    agg24::scanline_storage_aa8 storage;
+    storage.prepare();
+    double advance_x = 0.0;
+    double advance_y = 0.0;
+
+    while (*p)
+    {
+        double x = dx + advance_x;
+        double y = dy + advance_y;
+        glyph = font_manager->glyph(*p);
+
+        if (glyph == NULL)
+        {
+            retval = false;
+            break;
+        }
+        font_manager->add_kerning(&x, &y);
+        font_manager->init_embedded_adaptors(glyph, x, y);
+        if (rasterize)
+        {
+            font_manager_type::gray8_adaptor_type& adaptor =
+                font_manager->gray8_adaptor();
+            font_manager_type::gray8_scanline_type& scanline =
+                font_manager->gray8_scanline();
+            if (adaptor.rewind_scanlines())
+            {
+                scanline.reset(adaptor.min_x(), adaptor.max_x());
+                while (adaptor.sweep_scanline(scanline))
+                {
+                    storage.render(scanline);
+                }
+            }
+        }
+
+        advance_x += glyph->advance_x;
+        advance_y += glyph->advance_y;
+        p++;
+    }
+
+    agg24::trans_affine null_xform = agg24::trans_affine_translation(0., 0.);
+    font_engine->transform(null_xform);
+
+    run.scanlines.clear();
+    if (storage.rewind_scanlines())
+    {
+        run.scanlines.resize(storage.byte_size());
+        storage.serialize(&run.scanlines[0]);
+    }
+    run.advance_x = advance_x;
+    run.advance_y = advance_y;
+    return retval;
+}
+
 void graphics_context_base::_release_font_manager()
 {
 
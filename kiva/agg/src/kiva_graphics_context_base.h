@@ -23,6 +23,7 @@
 #include "kiva_rect.h"
 #include "kiva_graphics_state.h"
 #include "kiva_affine_helpers.h"
+#include "kiva_text_run_cache.h"
 
 // text includes
 #include "agg_glyph_raster_bin.h"
@@ -152,6 +153,14 @@ namespace kiva
 
         bool show_text_at_point(char *text, double tx, double ty);
 
+        // Draws each string at the corresponding point, shifted left by
+        // align times its width (0 is left aligned, 0.5 centered and 1
+        // right aligned).  The font manager is grabbed once for the whole
+        // batch.
+        bool show_text_at_points(char** strings, int string_count,
+                                 double* point_array, int point_count,
+                                 double align=0.0);
+
         // This will always return a font_type object.  The font's
         // is_loaded() method should be checked to see if the font is valid.
         kiva::font_type& get_font();
@@ -164,6 +173,12 @@ namespace kiva
         // has been properly loaded and initialized.
         kiva::rect_type get_text_extent(char *text);
 
+        // Stores the extent of each string, as returned by
+        // get_text_extent(), in a row of rect_array, which must have a row
+        // per string.  The font manager is grabbed once for all of them.
+        void get_text_extents(char** strings, int string_count,
+                              double* rect_array, int rect_count);
+
         bool get_text_bbox_as_rect(char *text);
 
         //---------------------------------------------------------------
@@ -309,6 +324,19 @@ namespace kiva
                                   kiva::compiled_path& marker,
                                   draw_mode_e mode) = 0;
 
+        // Draw a path (i.e. marker) at all the points in the list by
+        // rasterizing it once into a coverage mask, or sprite, and
+        // blending the sprite at each point.  The points are rounded to
+        // a fraction of a pixel, but any ctm, line width, or antialiasing
+        // may be used.
+        //
+        // Returns: int
+        //          0 on failure (e.g. gradient fills, or no sprite support)
+        //          1 on success
+        virtual int draw_path_sprites_at_points(double* pts,int Npts,
+                                  kiva::compiled_path& marker,
+                                  draw_mode_e mode);
+
         //---------------------------------------------------------------
         // Image handling
         //---------------------------------------------------------------
@@ -351,6 +379,31 @@ namespace kiva
         void _grab_font_manager();
         void _release_font_manager();
 
+        // Returns the extent of utf8 text in the current font, for a font
+        // manager which has been grabbed.
+        kiva::rect_type _measure_text(char *text);
+
+        // Lays out utf8 text with the current font and the linear part of
+        // a transform, from the starting point (dx, dy), and stores its
+        // advance in run.  If rasterize is true, also stores the coverage
+        // of its glyphs in run.  Returns false if a glyph could not be
+        // rendered, in which case run holds the glyphs before it.  The font
+        // manager is grabbed, unless show_text_at_points() holds it.
+        bool _rasterize_text_run(char *text, agg24::trans_affine& transform,
+                                 double dx, double dy, kiva::text_run& run,
+                                 bool rasterize);
+
+        // Same as _rasterize_text_run(), for a font manager which has been
+        // grabbed.
+        bool _rasterize_grabbed_text_run(char *text,
+                                         agg24::trans_affine& transform,
+                                         double dx, double dy,
+                                         kiva::text_run& run, bool rasterize);
+
+        // Whether show_text_at_points() holds the font manager while it
+        // draws its strings.
+        bool _holding_font_manager;
+
         bool _is_font_initialized;
 
     };
@@ -0,0 +1,131 @@
+#include <string.h>
+
+#include "kiva_text_run_cache.h"
+
+namespace kiva
+{
+
+text_run_cache::text_run_cache(unsigned max_bytes) :
+    hits(0),
+    misses(0),
+    evictions(0),
+    bytes(0),
+    max_bytes(max_bytes)
+{
+}
+
+const text_run* text_run_cache::find(const std::string& key)
+{
+    entry_map::iterator found = this->entries.find(key);
+    if (found == this->entries.end())
+    {
+        this->misses++;
+        return NULL;
+    }
+    this->hits++;
+    // Move the key to the front of the list, without copying it.
+    this->lru.splice(this->lru.begin(), this->lru, found->second.position);
+    return &found->second.run;
+}
+
+const text_run* text_run_cache::insert(const std::string& key, text_run& run)
+{
+    unsigned run_bytes = run.scanlines.size();
+    if (run_bytes > this->max_bytes)
+    {
+        this->uncached.scanlines.swap(run.scanlines);
+        this->uncached.advance_x = run.advance_x;
+        this->uncached.advance_y = run.advance_y;
+        return &this->uncached;
+    }
+
+    entry_map::iterator found = this->entries.find(key);
+    if (found != this->entries.end())
+    {
+        this->bytes -= found->second.run.scanlines.size();
+        this->lru.erase(found->second.position);
+        this->entries.erase(found);
+    }
+    this->evict(this->max_bytes - run_bytes);
+
+    this->lru.push_front(key);
+    entry& new_entry = this->entries[key];
+    new_entry.run.scanlines.swap(run.scanlines);
+    new_entry.run.advance_x = run.advance_x;
+    new_entry.run.advance_y = run.advance_y;
+    new_entry.position = this->lru.begin();
+    this->bytes += run_bytes;
+    return &new_entry.run;
+}
+
+unsigned text_run_cache::size()
+{
+    return this->entries.size();
+}
+
+void text_run_cache::clear()
+{
+    this->entries.clear();
+    this->lru.clear();
+    this->bytes = 0;
+}
+
+void text_run_cache::reset_counters()
+{
+    this->hits = 0;
+    this->misses = 0;
+    this->evictions = 0;
+}
+
+void text_run_cache::set_max_bytes(unsigned value)
+{
+    this->max_bytes = value;
+    this->evict(value);
+}
+
+void text_run_cache::evict(unsigned max_bytes)
+{
+    while (this->bytes > max_bytes && !this->lru.empty())
+    {
+        entry_map::iterator oldest = this->entries.find(this->lru.back());
+        this->bytes -= oldest->second.run.scanlines.size();
+        this->entries.erase(oldest);
+        this->lru.pop_back();
+        this->evictions++;
+    }
+}
+
+static void append_bytes(std::string& key, const void* value, unsigned size)
+{
+    key.append(static_cast<const char*>(value), size);
+}
+
+std::string text_run_key(const std::string& font_filename,
+                         const std::string& font_name, int font_size,
+                         const double transform[6], double dx, double dy,
+                         const char* text)
+{
+    std::string key;
+    key.reserve(font_filename.size() + font_name.size() + 64 + strlen(text));
+    key.append(font_filename);
+    key.push_back('\0');
+    key.append(font_name);
+    key.push_back('\0');
+    append_bytes(key, &font_size, sizeof(font_size));
+    // Only the linear part of the transform matters; the translation is
+    // given by the starting point.
+    append_bytes(key, transform, 4 * sizeof(double));
+    append_bytes(key, &dx, sizeof(dx));
+    append_bytes(key, &dy, sizeof(dy));
+    key.append(text);
+    return key;
+}
+
+static text_run_cache gTextRunCache;
+
+text_run_cache* GlobalTextRunCache()
+{
+    return &gTextRunCache;
+}
+
+}
@@ -0,0 +1,98 @@
+#ifndef KIVA_TEXT_RUN_CACHE_H
+#define KIVA_TEXT_RUN_CACHE_H
+
+#include <list>
+#include <map>
+#include <string>
+#include <vector>
+
+#include "agg_basics.h"
+
+namespace kiva
+{
+    //-----------------------------------------------------------------------
+    // A string of text rasterized by show_text(): the coverage of its glyphs,
+    // as serialized gray8 scanlines relative to the integer part of the
+    // starting point of the text, and the advance of the text.
+    //-----------------------------------------------------------------------
+    class text_run
+    {
+        public:
+            std::vector<agg24::int8u> scanlines;
+            double advance_x;
+            double advance_y;
+
+            text_run() : advance_x(0.0), advance_y(0.0) {}
+    };
+
+    //-----------------------------------------------------------------------
+    // A least recently used cache of text runs, bounded by the total size of
+    // their scanlines.  The keys describe everything the coverage of a run
+    // depends on: the font, the transform, the fractional part of the
+    // starting point and the text (see text_run_key()).
+    //-----------------------------------------------------------------------
+    class text_run_cache
+    {
+        public:
+            // The number of lookups which found their run, and which did not
+            unsigned hits;
+            unsigned misses;
+            // The number of runs dropped to stay within max_bytes
+            unsigned evictions;
+            // The total size of the scanlines of the cached runs
+            unsigned bytes;
+            unsigned max_bytes;
+
+            text_run_cache(unsigned max_bytes=4*1024*1024);
+
+            // Returns the run of a key and marks it as the most recently
+            // used one, or returns NULL if it is not cached.
+            const text_run* find(const std::string& key);
+
+            // Adds a run, whose content is moved into the cache, and returns
+            // the cached run.  The run is not kept if it is larger than
+            // max_bytes by itself.
+            const text_run* insert(const std::string& key, text_run& run);
+
+            // The number of cached runs
+            unsigned size();
+
+            void clear();
+            void reset_counters();
+            void set_max_bytes(unsigned value);
+
+        private:
+            typedef std::list<std::string> lru_list;
+
+            class entry
+            {
+                public:
+                    text_run run;
+                    // The position of the key in lru
+                    lru_list::iterator position;
+            };
+
+            typedef std::map<std::string, entry> entry_map;
+
+            entry_map entries;
+            // The keys, from the most to the least recently used
+            lru_list lru;
+            // Holds a run which is too large to be cached for insert()
+            text_run uncached;
+
+            void evict(unsigned max_bytes);
+    };
+
+    // Returns the key of a run of utf8 text in a font (given by its file
+    // name, name and size), drawn with a transform whose translation is
+    // ignored, from a starting point whose fractional part is (dx, dy).
+    std::string text_run_key(const std::string& font_filename,
+                             const std::string& font_name, int font_size,
+                             const double transform[6], double dx, double dy,
+                             const char* text);
+
+    // The cache shared by all the graphics contexts
+    text_run_cache* GlobalTextRunCache();
+}
+
+#endif
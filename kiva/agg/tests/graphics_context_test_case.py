@@ -5,6 +5,8 @@ import unittest
 from numpy import all, allclose, array, dtype, pi, ones
 
 from kiva import agg
+from kiva.constants import (CIRCLE_MARKER, EOF_FILL_STROKE, FILL, FILL_STROKE,
+                           JOIN_MITER, SQUARE_MARKER, STROKE)
 from kiva.fonttools import Font
 
 
@@ -325,6 +327,72 @@ class GraphicsContextArrayTestCase(unittest.TestCase):
         self.assertEqual(gc.bmp_array[-1,0,0], gc.bmp_array[0,-1,0])
         self.assertNotEqual(gc.bmp_array[-1,0,0], 255)
 
+    def draw_circles(self, points, sprites, mode=FILL_STROKE, antialias=True):
+        gc = agg.GraphicsContextArray((60,60))
+        gc.set_fill_color((1,0,0,0.5))
+        gc.set_line_width(3)
+        gc.set_line_dash([2,2])
+        gc.set_antialias(antialias)
+        gc.clip_to_rect(0,0,50,60)
+        gc.translate_ctm(3,4)
+        gc.scale_ctm(2,2)
+        path = gc.get_empty_path()
+        path.arc(0,0,4,0,2*pi)
+        path.close_path()
+        gc.draw_path_at_points(points, path, mode, sprites=sprites)
+        return gc.bmp_array.astype(int)
+
+    def test_draw_path_sprites_at_points(self):
+        # Sprites on whole pixels are the same as drawing every point.
+        points = array(((5,5), (6,5), (20,12), (22,20)), dtype=float)
+        for mode in (FILL, STROKE, EOF_FILL_STROKE):
+            for antialias in (True, False):
+                expected = self.draw_circles(points, False, mode, antialias)
+                actual = self.draw_circles(points, True, mode, antialias)
+                self.assertTrue((expected != 255).any())
+                self.assertTrue(all(actual == expected))
+
+        # Other points are moved by up to an eighth of a pixel.
+        expected = self.draw_circles(points + 0.3, False)
+        actual = self.draw_circles(points + 0.3, True)
+        self.assertTrue(abs(actual - expected).max() < 128)
+
+    def draw_spike(self, sprites):
+        gc = agg.GraphicsContextArray((60,60))
+        gc.set_line_width(3)
+        gc.set_line_join(JOIN_MITER)
+        gc.translate_ctm(10,30)
+        gc.scale_ctm(4,4)
+        path = gc.get_empty_path()
+        path.move_to(0,0)
+        path.line_to(4,2)
+        path.line_to(0,4)
+        path.close_path()
+        gc.draw_path_at_points([(0,0)], path, STROKE, sprites=sprites)
+        return gc.bmp_array.astype(int)
+
+    def test_draw_path_sprites_with_scaled_miters(self):
+        # The sprite leaves room for the miter at the tip of the spike,
+        # which the ctm scales with the line width.
+        expected = self.draw_spike(False)
+        actual = self.draw_spike(True)
+        self.assertTrue((expected[:, 36:] != 255).any())
+        self.assertTrue(all(actual == expected))
+
+    def test_draw_marker_at_points_sprites(self):
+        gc = agg.GraphicsContextArray((20,20))
+        gc.set_line_width(3)
+        # The Agg markers can't draw thick lines.
+        self.assertEqual(gc.draw_marker_at_points([(10,10)], 4,
+                                                  SQUARE_MARKER,
+                                                  sprites=False), 0)
+        self.assertTrue(all(gc.bmp_array == 255))
+        self.assertEqual(gc.draw_marker_at_points([(10,10)], 4,
+                                                  SQUARE_MARKER), 1)
+        self.assertNotEqual(gc.bmp_array[10,10,0], 255)
+        self.assertEqual(gc.draw_marker_at_points([(5,5)], 4,
+                                                  CIRCLE_MARKER), 1)
+
     def test_set_get_text_position(self):
         #print 'testing text position'
         gc = agg.GraphicsContextArray((5,5))
@@ -333,6 +401,48 @@ class GraphicsContextArrayTestCase(unittest.TestCase):
         desired = (1,1)
         self.assertTrue(allclose(actual,desired))
 
+    def test_show_text_at_points(self):
+        font = Font(size=12)
+        strings = ["one", u"two", "three"]
+        points = array([[5.0, 10.0], [40.5, 20.0], [80.0, 30.25]])
+        for align, fraction in (("left", 0.0), ("center", 0.5),
+                                ("right", 1.0)):
+            gc = agg.GraphicsContextArray((100, 50))
+            gc.set_font(font)
+            gc.set_text_position(3, 4)
+            gc.show_text_at_points(strings, points, align=align)
+            self.assertEqual(gc.get_text_position(), (3, 4))
+
+            gc2 = agg.GraphicsContextArray((100, 50))
+            gc2.set_font(font)
+            for text, (x, y) in zip(strings, points):
+                width = gc2.get_text_extent(text)[2]
+                gc2.show_text_at_point(text, x - fraction * width, y)
+            self.assertTrue((gc.bmp_array != 255).any())
+            self.assertTrue((gc.bmp_array == gc2.bmp_array).all())
+
+    def test_get_text_extents(self):
+        gc = agg.GraphicsContextArray((5, 5))
+        gc.set_font(Font(size=14))
+        strings = ["one", u"two", "", "Wgjq", "one"]
+        extents = gc.get_text_extents(strings)
+        self.assertEqual(extents.shape, (5, 4))
+        for text, extent in zip(strings, extents):
+            self.assertEqual(tuple(extent), tuple(gc.get_text_extent(text)))
+        self.assertTrue(allclose(gc.get_text_extents(strings[::-1]),
+                                 extents[::-1]))
+
+        gc.set_font(Font(size=28))
+        self.assertTrue(gc.get_text_extents(["one"])[0, 2] > extents[0, 2])
+
+    def test_show_text_at_points_errors(self):
+        gc = agg.GraphicsContextArray((5, 5))
+        gc.set_font(Font())
+        self.assertRaises(ValueError, gc.show_text_at_points, ["a"], [])
+        self.assertRaises(ValueError, gc.show_text_at_points, ["a"],
+                          [(1, 1)], align="top")
+        self.assertRaises(TypeError, gc.show_text_at_points, [1], [(1, 1)])
+
 
     def test_get_set_font(self):
         gc = agg.GraphicsContextArray((5,5))
@@ -0,0 +1,84 @@
+import unittest
+
+from kiva import agg
+from kiva.fonttools import Font
+
+
+class TextRunCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = agg.global_text_run_cache()
+        self.max_bytes = self.cache.max_bytes
+        self.cache.clear()
+        self.cache.reset_counters()
+
+    def tearDown(self):
+        self.cache.set_max_bytes(self.max_bytes)
+        self.cache.clear()
+        self.cache.reset_counters()
+
+    def draw_labels(self, color=(0, 0, 0, 1)):
+        gc = agg.GraphicsContextArray((100, 60))
+        gc.set_font(Font(size=12))
+        gc.set_fill_color(color)
+        for i in range(3):
+            gc.show_text_at_point("label", 5.25 + 20 * i, 10.5 + 15 * i)
+        gc.show_text("other\nlines", (40.75, 30))
+        return gc
+
+    def test_hits_and_misses(self):
+        self.draw_labels()
+        # The labels start on the same fraction of a pixel.
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 3))
+        self.assertEqual(self.cache.size(), 3)
+        self.assertTrue(self.cache.bytes > 0)
+
+        # The color is not part of the cached coverage.
+        self.draw_labels((1, 0, 0, 1))
+        self.assertEqual((self.cache.hits, self.cache.misses), (7, 3))
+
+    def test_cached_text_is_unchanged(self):
+        self.cache.set_max_bytes(0)
+        uncached = self.draw_labels().bmp_array
+        self.assertEqual(self.cache.size(), 0)
+        self.assertTrue((uncached != 255).any())
+
+        self.cache.set_max_bytes(self.max_bytes)
+        self.draw_labels()
+        cached = self.draw_labels().bmp_array
+        self.assertTrue(self.cache.hits > 0)
+        self.assertTrue((cached == uncached).all())
+
+    def test_text_position(self):
+        gc = agg.GraphicsContextArray((100, 60))
+        gc.set_font(Font(size=12))
+        for i in range(2):
+            gc.set_text_position(5.5, 10)
+            gc.show_text("abc")
+            x, y = gc.get_text_position()
+            self.assertTrue(x > 5.5)
+            self.assertEqual(y, 10)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_eviction(self):
+        self.draw_labels()
+        full_size = self.cache.bytes
+        self.cache.set_max_bytes(full_size - 1)
+        self.assertTrue(self.cache.evictions > 0)
+        self.assertTrue(self.cache.bytes < full_size)
+
+        # The least recently used runs go first.
+        self.cache.clear()
+        self.cache.set_max_bytes(self.max_bytes)
+        gc = self.draw_labels()
+        self.cache.set_max_bytes(self.cache.bytes)
+        self.cache.reset_counters()
+        gc.show_text_at_point("a new label", 5.25, 10.5)
+        self.assertTrue(self.cache.evictions > 0)
+        self.assertTrue(self.cache.bytes <= self.cache.max_bytes)
+        gc.show_text_at_point("a new label", 5.25, 10.5)
+        gc.show_text_at_point("label", 5.25, 10.5)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -35,7 +35,9 @@ from __future__ import absolute_import, print_function
 import numpy as np
 from numpy import alltrue, array, asarray, float64, shape, pi, concatenate
 
-from .constants import (POINT, LINE, LINES, RECT, NO_DASH, CLOSE,
+from .constants import (POINT, LINE, NO_DASH, CLOSE,
+                        LINE_SET, RECT_SET,
+                        CUBIC_SEGMENT, QUAD_SEGMENT, ARC_SEGMENT,
                         CAP_ROUND, CAP_BUTT, CAP_SQUARE,
                         JOIN_ROUND, JOIN_BEVEL, JOIN_MITER,
                         STROKE, FILL_STROKE, EOF_FILL_STROKE,
@@ -58,14 +60,6 @@ import kiva.affine as affine
 # drawing command is supposed to be executed.
 # --------------------------------------------------------------------
 
-def is_point(tup):
-    return tup[0] == POINT
-
-
-def is_line(tup):
-    return tup[0] == LINE
-
-
 def is_fully_transparent(color):
     """ Tests a color array to see whether it is fully transparent or not.
 
@@ -81,6 +75,216 @@ def fill_equal(fill1, fill2):
     return alltrue(fill1 == fill2)
 
 
+# --------------------------------------------------------------------
+# Path storage.
+# --------------------------------------------------------------------
+
+# Path entries which change the coordinate transform instead of adding
+# vertices to the path.
+CTM_OPS = (SCALE_CTM, TRANSLATE_CTM, ROTATE_CTM, CONCAT_CTM, LOAD_CTM)
+
+# Path entries which add a vertex to the path.
+VERTEX_OPS = (POINT, LINE, CLOSE)
+
+# Path entries which carry a whole array of primitives in their args.  Each
+# of them is a subpath of its own.
+BULK_OPS = (LINE_SET, RECT_SET)
+
+# Path entries for curves ending at their vertex.  Their args hold the whole
+# curve: (x0, y0, x_ctrl1, y_ctrl1, x_ctrl2, y_ctrl2, x_to, y_to) for a
+# cubic and (x0, y0, x_ctrl, y_ctrl, x_to, y_to) for a quadratic Bezier
+# curve, and (x, y, radius, start_angle, end_angle) for an arc, with the
+# angles ordered in the direction of drawing.
+CURVE_OPS = (CUBIC_SEGMENT, QUAD_SEGMENT, ARC_SEGMENT)
+
+# The number of points a curve is flattened into.
+# XXX: pick the number from the current scale and the size of the curve.
+CURVE_STEPS = 100
+
+
+def transform_ctm(ctm, func, args):
+    """ Returns `ctm` modified by the CTM path entry (func, args).
+    """
+    if func == SCALE_CTM:
+        ctm = affine.scale(ctm, args[0], args[1])
+    elif func == ROTATE_CTM:
+        ctm = affine.rotate(ctm, args[0])
+    elif func == TRANSLATE_CTM:
+        ctm = affine.translate(ctm, args[0], args[1])
+    elif func == CONCAT_CTM:
+        ctm = affine.concat(ctm, args[0])
+    elif func == LOAD_CTM:
+        ctm = args[0].copy()
+    return ctm
+
+
+def curve_points(op, args):
+    """ Returns the points of a curve path entry flattened into lines.
+
+    The start point of the curve is not included.
+    """
+    if op == ARC_SEGMENT:
+        x, y, radius, start_angle, end_angle = args
+        theta = np.linspace(start_angle, end_angle, CURVE_STEPS)[1:]
+        pts = radius * np.column_stack([np.cos(theta), np.sin(theta)])
+        pts += np.array([x, y])
+        return pts
+    if op == QUAD_SEGMENT:
+        # A quadratic Bezier curve is a special case of the cubic.
+        x0, y0, x_ctrl, y_ctrl, x_to, y_to = args
+        args = (x0, y0,
+                (x0 + x_ctrl + x_ctrl) / 3.0, (y0 + y_ctrl + y_ctrl) / 3.0,
+                (x_to + x_ctrl + x_ctrl) / 3.0, (y_to + y_ctrl + y_ctrl) / 3.0,
+                x_to, y_to)
+    x0, y0, x_ctrl1, y_ctrl1, x_ctrl2, y_ctrl2, x_to, y_to = args
+    t = np.arange(1, CURVE_STEPS+1) / float(CURVE_STEPS)
+    t2 = t*t
+    t3 = t2*t
+    u = 1 - t
+    u2 = u*u
+    u3 = u2*u
+    return np.column_stack([
+        x0*u3 + 3*(x_ctrl1*t*u2 + x_ctrl2*t2*u) + x_to*t3,
+        y0*u3 + 3*(y_ctrl1*t*u2 + y_ctrl2*t2*u) + y_to*t3,
+    ])
+
+
+def flatten_subpath(ops, vertices, args):
+    """ Returns the vertices of a subpath with its curves replaced by
+    lines.
+
+    `args` holds the args of the curve entries in `ops`, in order.
+    """
+    curves = np.flatnonzero(np.in1d(ops, CURVE_OPS)).tolist()
+    pieces = []
+    last = 0
+    for i, curve_args in zip(curves, args):
+        pieces.append(vertices[last:i])
+        pieces.append(curve_points(ops[i], curve_args))
+        last = i + 1
+    pieces.append(vertices[last:])
+    return concatenate(pieces)
+
+
+class PathBuffer(object):
+    """ Growable, array-backed storage for a drawing path.
+
+    The path is kept as a struct of arrays: `ops` holds one opcode per entry
+    and `vertices` the matching (x, y) pair.  Entries with a payload other
+    than a point (the CTM operations, the LINE_SET and RECT_SET bulk
+    entries and the curves) keep it in the `args` dictionary, keyed by the
+    index of the entry.
+
+    The storage grows geometrically, so appending single entries is
+    amortized O(1) and runs of points are added with one slice assignment
+    instead of one Python object per vertex.
+
+    The vertex of a CLOSE entry is the first point of the subpath it closes,
+    so every subpath is a contiguous slice of `vertices`.
+    """
+
+    def __init__(self, capacity=64):
+        self._ops = np.empty(capacity, dtype=np.uint8)
+        self._vertices = np.empty((capacity, 2), dtype=float64)
+        self.size = 0
+        self.args = {}
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def ops(self):
+        """ The opcodes of the path entries. """
+        return self._ops[:self.size]
+
+    @property
+    def vertices(self):
+        """ An Nx2 array with the vertex of each path entry. """
+        return self._vertices[:self.size]
+
+    def reserve(self, count):
+        """ Makes sure there is room for `count` more entries.
+        """
+        needed = self.size + count
+        capacity = len(self._ops)
+        if needed <= capacity:
+            return
+        capacity = max(capacity, 1)
+        while capacity < needed:
+            capacity *= 2
+        ops = np.empty(capacity, dtype=np.uint8)
+        vertices = np.empty((capacity, 2), dtype=float64)
+        ops[:self.size] = self._ops[:self.size]
+        vertices[:self.size] = self._vertices[:self.size]
+        self._ops = ops
+        self._vertices = vertices
+
+    def append(self, op, x=0.0, y=0.0, args=None):
+        """ Appends a single entry and returns its index.
+        """
+        i = self.size
+        if i == len(self._ops):
+            self.reserve(1)
+        self._ops[i] = op
+        self._vertices[i] = (x, y)
+        if args is not None:
+            self.args[i] = args
+        self.size = i + 1
+        return i
+
+    def extend(self, ops, vertices):
+        """ Appends a block of entries.
+
+        `ops` is either a single opcode used for every entry, or an array
+        with one opcode per row of the Nx2 array `vertices`.
+        """
+        n = len(vertices)
+        self.reserve(n)
+        i = self.size
+        self._ops[i:i+n] = ops
+        self._vertices[i:i+n] = vertices
+        self.size = i + n
+
+    def clear(self):
+        """ Removes all entries, keeping the allocated storage.
+        """
+        self.size = 0
+        self.args = {}
+
+    def subpaths(self):
+        """ Splits the path into subpaths.
+
+        A subpath starts at every POINT entry and after every CLOSE entry.
+        Bulk entries form a subpath on their own.  Returns two arrays with
+        the start and end index of each subpath.
+        """
+        ops = self.ops
+        if len(ops) == 0:
+            empty = np.empty(0, dtype=int)
+            return empty, empty
+        unknown = ~np.in1d(ops, VERTEX_OPS + CTM_OPS + BULK_OPS + CURVE_OPS)
+        if unknown.any():
+            raise ValueError("Unknown path entry: %d" % ops[unknown][0])
+        is_bulk = np.in1d(ops, BULK_OPS)
+        breaks = (ops == POINT) | is_bulk
+        breaks[1:] |= (ops[:-1] == CLOSE) | is_bulk[:-1]
+        breaks[0] = True
+        starts = np.flatnonzero(breaks)
+        ends = np.append(starts[1:], len(ops))
+        return starts, ends
+
+    def take(self, indices):
+        """ Returns a new buffer holding only the entries at `indices`.
+        """
+        indices = list(indices)
+        new = PathBuffer(max(len(indices), 1))
+        new.extend(self._ops[indices], self._vertices[indices])
+        for new_index, old_index in enumerate(indices):
+            if old_index in self.args:
+                new.args[new_index] = self.args[old_index]
+        return new
+
+
 class GraphicsContextBase(AbstractGraphicsContext):
     """ Concrete base implementation of a GraphicsContext
 
@@ -92,9 +296,7 @@ class GraphicsContextBase(AbstractGraphicsContext):
     state_stack
         Stack used to save graphics states
     path
-        The drawing path.
-    active_subpath
-        The active drawing subpath
+        The drawing path, a PathBuffer.
 
     This class needs to be sub-classed by device types that handle
     drawing but don't handle more advanced concepts like paths, graphics state,
@@ -119,12 +321,11 @@ class GraphicsContextBase(AbstractGraphicsContext):
         self.state_stack = []
 
         # Variables for used in drawing paths.
-        # The path_transform_indices holds a list of indices pointing into
-        # active_subpath that affect the ctm.  It is necessary to preserve
-        # these across begin_path calls.
-        self.active_subpath = []
-        self.path_transform_indices = []
-        self.path = [self.active_subpath]
+        # The _subpath_start holds the index of the first entry of the active
+        # subpath in the path.  CTM entries after it are preserved across
+        # begin_path calls.
+        self.path = PathBuffer()
+        self._subpath_start = 0
 
         # Whether the particular underlying graphics context considers the
         # "origin" of a pixel to be the center of the pixel or the lower-left
@@ -165,8 +366,7 @@ class GraphicsContextBase(AbstractGraphicsContext):
                 The new scale factor for the y axis
         """
         self.state.ctm = affine.scale(self.state.ctm, sx, sy)
-        self.active_subpath.append((SCALE_CTM, (sx, sy)))
-        self.path_transform_indices.append(len(self.active_subpath)-1)
+        self.path.append(SCALE_CTM, args=(sx, sy))
 
     def translate_ctm(self, tx, ty):
         """ Translates the coordinate system by the value given by (tx, ty)
@@ -179,8 +379,7 @@ class GraphicsContextBase(AbstractGraphicsContext):
                 The distance to move in the y direction
         """
         self.state.ctm = affine.translate(self.state.ctm, tx, ty)
-        self.active_subpath.append((TRANSLATE_CTM, (tx, ty)))
-        self.path_transform_indices.append(len(self.active_subpath)-1)
+        self.path.append(TRANSLATE_CTM, args=(tx, ty))
 
     def rotate_ctm(self, angle):
         """ Rotates the coordinate space for drawing by the given angle.
@@ -191,8 +390,7 @@ class GraphicsContextBase(AbstractGraphicsContext):
                 the angle, in radians, to rotate the coordinate system
         """
         self.state.ctm = affine.rotate(self.state.ctm, angle)
-        self.active_subpath.append((ROTATE_CTM, (angle,)))
-        self.path_transform_indices.append(len(self.active_subpath)-1)
+        self.path.append(ROTATE_CTM, args=(angle,))
 
     def concat_ctm(self, transform):
         """ Concatenates the transform to current coordinate transform matrix.
@@ -204,8 +402,7 @@ class GraphicsContextBase(AbstractGraphicsContext):
                 the current coordinate matrix.
         """
         self.state.ctm = affine.concat(self.state.ctm, transform)
-        self.active_subpath.append((CONCAT_CTM, (transform,)))
-        self.path_transform_indices.append(len(self.active_subpath)-1)
+        self.path.append(CONCAT_CTM, args=(transform,))
 
     def get_ctm(self):
         """ Returns the current coordinate transform matrix.
@@ -216,8 +413,7 @@ class GraphicsContextBase(AbstractGraphicsContext):
         """ Returns the current coordinate transform matrix.
         """
         self.state.ctm = transform
-        self.active_subpath.append((LOAD_CTM, (transform,)))
-        self.path_transform_indices.append(len(self.active_subpath)-1)
+        self.path.append(LOAD_CTM, args=(transform,))
 
     # ----------------------------------------------------------------
     # Save/Restore graphics state.
@@ -236,8 +432,7 @@ class GraphicsContextBase(AbstractGraphicsContext):
     def restore_state(self):
         """ Restores the previous graphics state. """
         self.state = self.state_stack.pop(-1)
-        self.active_subpath.append((LOAD_CTM, (self.state.ctm,)))
-        self.path_transform_indices.append(len(self.active_subpath)-1)
+        self.path.append(LOAD_CTM, args=(self.state.ctm,))
 
     # ----------------------------------------------------------------
     # context manager interface
@@ -443,15 +638,15 @@ class GraphicsContextBase(AbstractGraphicsContext):
         """
         # Need to check here if the current subpath contains matrix
         # transforms.  If  it does, pull these out, and stick them
-        # in the new subpath.
-        if self.path_transform_indices:
-            tf = array(self.active_subpath,
-                       object)[self.path_transform_indices, :]
-            self.path_transform_indices = range(len(tf))
-            self.active_subpath = list(tf)
+        # in the new path.
+        path = self.path
+        ops = path.ops[self._subpath_start:]
+        transforms = np.flatnonzero(np.in1d(ops, CTM_OPS))
+        if len(transforms):
+            self.path = path.take(transforms + self._subpath_start)
         else:
-            self.active_subpath = []
-        self.path = [self.active_subpath]
+            path.clear()
+        self._subpath_start = 0
 
     def move_to(self, x, y):
         """ Starts a new drawing subpath and place the current point at (x, y).
@@ -462,10 +657,8 @@ class GraphicsContextBase(AbstractGraphicsContext):
                 It looks like before in the PDF specs.
         """
         self._new_subpath()
-
-        pt = array((x, y), dtype=float64)
-        self.state.current_point = pt
-        self.active_subpath.append((POINT, pt))
+        self.state.current_point = (x, y)
+        self.path.append(POINT, x, y)
 
     def line_to(self, x, y):
         """ Adds a line from the current point to the given point (x, y).
@@ -478,9 +671,8 @@ class GraphicsContextBase(AbstractGraphicsContext):
             Notes:
                 See note in move_to about the current_point.
         """
-        pt = array((x, y), dtype=float64)
-        self.state.current_point = pt
-        self.active_subpath.append((LINE, pt))
+        self.state.current_point = (x, y)
+        self.path.append(LINE, x, y)
 
     def lines(self, points):
         """ Adds a series of lines as a new subpath.
@@ -493,10 +685,13 @@ class GraphicsContextBase(AbstractGraphicsContext):
 
             The current_point is moved to the last point in 'points'
         """
+        points = asarray(points, dtype=float64).reshape(-1, 2)
+        if not len(points):
+            return
         self._new_subpath()
-        pts = points
-        self.active_subpath.append((LINES, pts))
-        self.state.current_point = points[-1]
+        self.path.append(POINT, points[0, 0], points[0, 1])
+        self.path.extend(LINE, points[1:])
+        self.state.current_point = tuple(points[-1].tolist())
 
     def line_set(self, starts, ends):
         """ Adds a set of disjoint lines as a new subpath.
@@ -511,21 +706,30 @@ class GraphicsContextBase(AbstractGraphicsContext):
             Starts and ends should have the same length.
             The current point is moved to the last point in 'ends'.
         """
+        starts = asarray(starts, dtype=float64).reshape(-1, 2)
+        ends = asarray(ends, dtype=float64).reshape(-1, 2)
+        n = min(len(starts), len(ends))
+        if n == 0:
+            return
         self._new_subpath()
-        for i in xrange(min(len(starts), len(ends))):
-            self.active_subpath.append((POINT, starts[i]))
-            self.active_subpath.append((LINE, ends[i]))
-        self.state.current_point = ends[i]
+        segments = np.column_stack((starts[:n], ends[:n]))
+        x, y = ends[n-1]
+        self.path.append(LINE_SET, x, y, args=segments)
+        self.state.current_point = (x, y)
 
     def rect(self, x, y, sx, sy):
         """ Adds a rectangle as a new subpath.
         """
-        pts = array(((x, y),
-                     (x, y+sy),
-                     (x+sx, y+sy),
-                     (x+sx, y),))
-        self.lines(pts)
-        self.close_path('rect')
+        self._new_subpath()
+        # The vertex of the CLOSE entry is the start of the subpath.
+        vertices = array(((x, y),
+                          (x, y+sy),
+                          (x+sx, y+sy),
+                          (x+sx, y),
+                          (x, y)), dtype=float64)
+        self.path.extend(array([POINT, LINE, LINE, LINE, CLOSE], np.uint8),
+                         vertices)
+        self._new_subpath()
 
     def draw_rect(self, rect, mode):
         self.rect(*rect)
@@ -534,17 +738,28 @@ class GraphicsContextBase(AbstractGraphicsContext):
     def rects(self, rects):
         """ Adds multiple rectangles as separate subpaths to the path.
 
-            Not very efficient -- calls rect multiple times.
+            The rectangles are stored as a single RECT_SET entry, which
+            is drawn by device_draw_rects.
         """
-        for x, y, sx, sy in rects:
-            self.rect(x, y, sx, sy)
+        rects = array(rects, dtype=float64).reshape(-1, 4)
+        if len(rects) == 0:
+            return
+        self._new_subpath()
+        x, y = rects[-1, :2]
+        self.path.append(RECT_SET, x, y, args=rects)
+        self._new_subpath()
 
     def close_path(self, tag=None):
         """ Closes the path of the current subpath.
 
             Currently starts a new subpath -- is this what we want?
         """
-        self.active_subpath.append((CLOSE, (tag,)))
+        first = self._subpath_first_vertex()
+        if first is None:
+            x, y = self.state.current_point
+        else:
+            x, y = self.path.vertices[first]
+        self.path.append(CLOSE, x, y)
         self._new_subpath()
 
     def curve_to(self, x_ctrl1, y_ctrl1, x_ctrl2, y_ctrl2, x_to, y_to):
@@ -565,25 +780,13 @@ class GraphicsContextBase(AbstractGraphicsContext):
         y_to : float
             Y-value of the ending point of the curve.
         """
-        # XXX: figure out a reasonable number of points from the current scale
-        # and arc length. Since the arc length is expensive to calculate, the
-        # sum of the lengths of the line segments from (xy0, xy_ctrl1),
-        # (xy_ctrl1, xy_ctrl2), and (xy_ctrl2, xy_to) would be a reasonable
-        # approximation.
-        n = 100
-        t = np.arange(1, n+1) / float(n)
-        t2 = t*t
-        t3 = t2*t
-        u = 1 - t
-        u2 = u*u
-        u3 = u2*u
+        # The curve is kept whole in the path, for the backends which can
+        # draw it natively.  The others get it flattened into lines.
         x0, y0 = self.state.current_point
-        pts = np.column_stack([
-            x0*u3 + 3*(x_ctrl1*t*u2 + x_ctrl2*t2*u) + x_to*t3,
-            y0*u3 + 3*(y_ctrl1*t*u2 + y_ctrl2*t2*u) + y_to*t3,
-        ])
-        self.active_subpath.append((LINES, pts))
-        self.state.current_point = pts[-1]
+        self.path.append(CUBIC_SEGMENT, x_to, y_to,
+                         args=(x0, y0, x_ctrl1, y_ctrl1, x_ctrl2, y_ctrl2,
+                               x_to, y_to))
+        self.state.current_point = (x_to, y_to)
 
     def quad_curve_to(self, x_ctrl, y_ctrl, x_to, y_to):
         """ Draw a quadratic bezier curve from the current point.
@@ -599,15 +802,10 @@ class GraphicsContextBase(AbstractGraphicsContext):
         y_to : float
             Y-value of the ending point of the curve.
         """
-        # A quadratic Bezier curve is just a special case of the cubic. Reuse
-        # its implementation in case it has been implemented for the specific
-        # backend.
         x0, y0 = self.state.current_point
-        xc1 = (x0 + x_ctrl + x_ctrl) / 3.0
-        yc1 = (y0 + y_ctrl + y_ctrl) / 3.0
-        xc2 = (x_to + x_ctrl + x_ctrl) / 3.0
-        yc2 = (y_to + y_ctrl + y_ctrl) / 3.0
-        self.curve_to(xc1, yc1, xc2, yc2, x_to, y_to)
+        self.path.append(QUAD_SEGMENT, x_to, y_to,
+                         args=(x0, y0, x_ctrl, y_ctrl, x_to, y_to))
+        self.state.current_point = (x_to, y_to)
 
     def arc(self, x, y, radius, start_angle, end_angle, cw=False):
         """ Draw a circular arc.
@@ -633,18 +831,21 @@ class GraphicsContextBase(AbstractGraphicsContext):
         cw : bool, optional
             Whether the arc should be drawn clockwise or not.
         """
-        # XXX: pick the number of line segments based on the current scale and
-        # the radius.
-        n = 100
         if end_angle < start_angle and not cw:
             end_angle += 2*pi
         elif start_angle < end_angle and cw:
             start_angle += 2*pi
-        theta = np.linspace(start_angle, end_angle, n)
-        pts = radius * np.column_stack([np.cos(theta), np.sin(theta)])
-        pts += np.array([x, y])
-        self.active_subpath.append((LINES, pts))
-        self.state.current_point = pts[-1]
+        x0 = x + radius * np.cos(start_angle)
+        y0 = y + radius * np.sin(start_angle)
+        x_to = x + radius * np.cos(end_angle)
+        y_to = y + radius * np.sin(end_angle)
+        if self._subpath_first_vertex() is None:
+            self.path.append(POINT, x0, y0)
+        else:
+            self.path.append(LINE, x0, y0)
+        self.path.append(ARC_SEGMENT, x_to, y_to,
+                         args=(x, y, radius, start_angle, end_angle))
+        self.state.current_point = (x_to, y_to)
 
     def arc_to(self, x1, y1, x2, y2, radius):
         """
@@ -654,12 +855,24 @@ class GraphicsContextBase(AbstractGraphicsContext):
     def _new_subpath(self):
         """ Starts a new drawing subpath.
 
-            Only creates a new subpath if the current one contains objects.
+            Entries added from now on belong to the new subpath.
         """
-        if self.active_subpath:
-            self.active_subpath = []
-            self.path_transform_indices = []
-            self.path.append(self.active_subpath)
+        self._subpath_start = len(self.path)
+
+    def _subpath_first_vertex(self):
+        """ Returns the index of the starting point of the active subpath.
+
+            This is the last move_to of the subpath, or its first vertex if
+            there is no move_to.  Returns None if the subpath has no vertices.
+        """
+        ops = self.path.ops[self._subpath_start:]
+        points = np.flatnonzero(ops == POINT)
+        if len(points):
+            return self._subpath_start + points[-1]
+        lines = np.flatnonzero(np.in1d(ops, (LINE,) + CURVE_OPS))
+        if len(lines):
+            return self._subpath_start + lines[0]
+        return None
 
     # ----------------------------------------------------------------
     # Getting infomration on paths
@@ -668,16 +881,12 @@ class GraphicsContextBase(AbstractGraphicsContext):
     def is_path_empty(self):
         """ Tests to see whether the current drawing path is empty
         """
-        # If the first subpath is empty, then the path is empty
-        res = 0
-        if not self.path[0]:
-            res = 1
-        else:
-            res = 1
-            for sub in self.path:
-                if not is_point(sub[-1]):
-                    res = 0
-                    break
+        # Moving the current point or changing the CTM doesn't draw anything,
+        # so only a path with other entries is not empty.
+        ops = self.path.ops
+        res = 1
+        if len(ops) and np.any((ops != POINT) & ~np.in1d(ops, CTM_OPS)):
+            res = 0
         return res
 
     def get_path_current_point(self):
@@ -781,10 +990,23 @@ class GraphicsContextBase(AbstractGraphicsContext):
             self.device_set_clipping_path(xclip_min,  yclip_min,
                                           width_clip, height_clip)
 
-    def clip_to_rects(self):
+    def clip_to_rects(self, rects):
         """
+            Sets the clipping path to the intersection of the current clipping
+            path with the union of the rectangles.
+
+            This implementation clips to the bounding box of the rectangles;
+            backends which can clip to several rectangles should override it.
         """
-        pass
+        rects = asarray(rects, dtype=float64).reshape(-1, 4)
+        if not len(rects):
+            self.clip_to_rect(0, 0, 0, 0)
+            return
+        x = rects[:, 0].min()
+        y = rects[:, 1].min()
+        x2 = (rects[:, 0] + rects[:, 2]).max()
+        y2 = (rects[:, 1] + rects[:, 3]).max()
+        self.clip_to_rect(x, y, x2 - x, y2 - y)
 
     def clear_clip_path(self):
         self.state.clipping_path = None
@@ -1101,6 +1323,9 @@ class GraphicsContextBase(AbstractGraphicsContext):
         # is not needed.
         # ---------------------------------------------------------------------
 
+        path = self.path
+        starts, ends = path.subpaths()
+
         old_line_alpha = self.state.line_state.line_color[3]
         old_fill_alpha = self.state.fill_color[3]
         if mode not in [STROKE, FILL_STROKE, EOF_FILL_STROKE]:
@@ -1111,35 +1336,52 @@ class GraphicsContextBase(AbstractGraphicsContext):
         self.device_update_line_state()
         self.device_update_fill_state()
 
-        for subpath in self.path:
-            # reset the current point for drawing.
-            self.clear_subpath_points()
-            for func, args in subpath:
-                if func == POINT:
-                    self.draw_subpath(mode)
-                    self.add_point_to_subpath(args)
-                    self.first_point = args
-                elif func == LINE:
-                    self.add_point_to_subpath(args)
-                elif func == LINES:
-                    self.draw_subpath(mode)
-                    # add all points in list to subpath.
-                    self.add_point_to_subpath(args)
-                    self.first_point = args[0]
-                elif func == CLOSE:
-                    self.add_point_to_subpath(self.first_point)
-                    self.draw_subpath(mode)
-                elif func == RECT:
-                    self.draw_subpath(mode)
-                    self.device_draw_rect(args[0], args[1], args[2], args[3],
-                                          mode)
-                elif func in [SCALE_CTM, ROTATE_CTM, TRANSLATE_CTM,
-                              CONCAT_CTM, LOAD_CTM]:
-                    self.device_transform_device_ctm(func, args)
+        # Each subpath is a slice of the path.  CTM entries are applied
+        # before the subpath they are part of is drawn, consecutive ones
+        # composed into a single transform, and left out of the subpaths
+        # handed to the device.  The subpaths between two changes of the
+        # transform are handed over together.
+        ops = path.ops
+        vertices = path.vertices
+        is_ctm = np.in1d(ops, CTM_OPS)
+        ctm_indices = np.flatnonzero(is_ctm)
+        ctm_before = np.concatenate(([0], np.cumsum(is_ctm))).tolist()
+        is_curve = np.in1d(ops, CURVE_OPS)
+        curves_before = np.concatenate(([0], np.cumsum(is_curve))).tolist()
+        curve_indices = np.flatnonzero(is_curve).tolist()
+        applied = 0
+        subpaths = []
+        is_bulk = np.in1d(ops[starts], BULK_OPS).tolist()
+        for start, end, bulk in zip(starts.tolist(), ends.tolist(), is_bulk):
+            if ctm_before[end] > applied:
+                if subpaths:
+                    self.device_draw_subpaths(subpaths, mode)
+                    subpaths = []
+                self._apply_path_transforms(
+                    ctm_indices[applied:ctm_before[end]])
+                applied = ctm_before[end]
+            if bulk:
+                if subpaths:
+                    self.device_draw_subpaths(subpaths, mode)
+                    subpaths = []
+                if ops[start] == LINE_SET:
+                    self.device_draw_line_set(path.args[start], mode)
                 else:
-                    print('oops:', func)
-            # finally, draw any remaining paths.
-            self.draw_subpath(mode)
+                    self.device_draw_rects(path.args[start], mode)
+                continue
+            if ctm_before[end] == ctm_before[start]:
+                subpath_ops = ops[start:end]
+                pts = vertices[start:end]
+            else:
+                keep = ~is_ctm[start:end]
+                subpath_ops = ops[start:end][keep]
+                pts = vertices[start:end][keep]
+            if len(pts):
+                curve_args = [path.args[i] for i in
+                    curve_indices[curves_before[start]:curves_before[end]]]
+                subpaths.append((subpath_ops, pts, curve_args))
+        if subpaths:
+            self.device_draw_subpaths(subpaths, mode)
 
         # ---------------------------------------------------------------------
         # reset the alpha values for line and fill values.
@@ -1163,17 +1405,41 @@ class GraphicsContextBase(AbstractGraphicsContext):
             OpenGL, can benefit from overriding the method and using
             hardware acceleration.
         """
-        if func == SCALE_CTM:
-            self.device_ctm = affine.scale(self.device_ctm, args[0], args[1])
-        elif func == ROTATE_CTM:
-            self.device_ctm = affine.rotate(self.device_ctm, args[0])
-        elif func == TRANSLATE_CTM:
-            self.device_ctm = affine.translate(self.device_ctm, args[0],
-                                               args[1])
-        elif func == CONCAT_CTM:
-            self.device_ctm = affine.concat(self.device_ctm, args[0])
-        elif func == LOAD_CTM:
-            self.device_ctm = args[0].copy()
+        self.device_ctm = transform_ctm(self.device_ctm, func, args)
+
+    def _apply_path_transforms(self, indices):
+        """ Hands the CTM entries of the path at `indices` to the device.
+
+            A run of several entries is multiplied out and passed on as a
+            single LOAD_CTM or CONCAT_CTM.
+        """
+        path = self.path
+        indices = indices.tolist()
+        funcs = path.ops[indices].tolist()
+        if len(funcs) == 1:
+            self.device_transform_device_ctm(funcs[0], path.args[indices[0]])
+            return
+        func = CONCAT_CTM
+        ctm = affine.affine_identity()
+        for i, op in zip(indices, funcs):
+            if op == LOAD_CTM:
+                func = LOAD_CTM
+            ctm = transform_ctm(ctm, op, path.args[i])
+        self.device_transform_device_ctm(func, (ctm,))
+
+    def device_draw_subpaths(self, subpaths, mode):
+        """ Default implementation of drawing a sequence of subpaths.
+
+            Each subpath is an (ops, vertices, curve_args) tuple, with the
+            opcodes and vertices of its entries and the args of its curve
+            entries.  The subpaths are drawn one at a time, with the curves
+            flattened into lines; backends that can draw curves or whole
+            paths should override this.
+        """
+        for ops, pts, curve_args in subpaths:
+            if curve_args:
+                pts = flatten_subpath(ops, pts, curve_args)
+            self._draw_points(pts, mode)
 
     def device_draw_rect(self, x, y, sx, sy, mode):
         """ Default implementation of drawing  a rect.
@@ -1191,6 +1457,32 @@ class GraphicsContextBase(AbstractGraphicsContext):
         self.add_point_to_subpath(pts)
         self.draw_subpath(mode)
 
+    def device_draw_line_set(self, segments, mode):
+        """ Default implementation of drawing a set of disjoint lines.
+
+            `segments` is an Nx4 array of (x0, y0, x1, y1) rows.  Each line
+            is drawn as a subpath of its own; backends that can emit many
+            lines at once should override this.
+        """
+        for pts in segments.reshape(-1, 2, 2):
+            self._draw_points(pts, mode)
+
+    def device_draw_rects(self, rects, mode):
+        """ Default implementation of drawing a set of rectangles.
+
+            `rects` is an Nx4 array of (x, y, sx, sy) rows.  Each rectangle
+            is drawn as a closed subpath of its own; backends that can emit
+            many rectangles at once should override this.
+        """
+        x, y, sx, sy = rects.T
+        pts = np.empty((len(rects), 5, 2), dtype=float64)
+        pts[:, 0, 0] = pts[:, 1, 0] = pts[:, 4, 0] = x
+        pts[:, 0, 1] = pts[:, 3, 1] = pts[:, 4, 1] = y
+        pts[:, 1, 1] = pts[:, 2, 1] = y + sy
+        pts[:, 2, 0] = pts[:, 3, 0] = x + sx
+        for rect_pts in pts:
+            self._draw_points(rect_pts, mode)
+
     def stroke_rect(self):
         """
         """
@@ -1229,17 +1521,15 @@ class GraphicsContextBase(AbstractGraphicsContext):
     def get_subpath_points(self, debug=0):
         """ Gets the points that are in the current path.
 
-            The first entry in the draw_points list may actually
-            be an array.  If this is true, the other points are
-            converted to an array and concatenated with the first
+            The entries in the draw_points list are either single points
+            or Nx2 arrays of points.  They are concatenated into a single
+            Nx2 array.
         """
-        if self.draw_points and len(shape(self.draw_points[0])) > 1:
-            first_points = self.draw_points[0]
-            other_points = asarray(self.draw_points[1:])
-            if len(other_points):
-                pts = concatenate((first_points, other_points), 0)
-            else:
-                pts = first_points
+        if len(self.draw_points) == 1 and len(shape(self.draw_points[0])) > 1:
+            pts = self.draw_points[0]
+        elif self.draw_points:
+            pts = concatenate([asarray(pt, dtype=float64).reshape(-1, 2)
+                               for pt in self.draw_points])
         else:
             pts = asarray(self.draw_points)
         return pts
@@ -1282,11 +1572,15 @@ class GraphicsContextBase(AbstractGraphicsContext):
                 and allow devices to specify a faster version if the path is
                 closed.
         """
-        pts = self.get_subpath_points()
+        self._draw_points(self.get_subpath_points(), mode)
+        self.clear_subpath_points()
+
+    def _draw_points(self, pts, mode):
+        """ Fills and strokes an Nx2 array of points as one subpath.
+        """
         if len(pts) > 1:
             self.device_fill_points(pts, mode)
             self.device_stroke_points(pts, mode)
-        self.clear_subpath_points()
 
     def get_text_extent(self, textstring):
         """
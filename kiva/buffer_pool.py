@@ -0,0 +1,206 @@
+#------------------------------------------------------------------------------
+# Copyright (c) 2014, Enthought, Inc.
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in enthought/LICENSE.txt and may be redistributed only
+# under the conditions described in the aforementioned license.  The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+# Thanks for using Enthought open source!
+#------------------------------------------------------------------------------
+""" A pool of pixel buffers for the offscreen GCs of the Agg backend.
+
+Backbuffers and window GCs are created again each time their size changes,
+which, while a window is being resized, happens on every frame.  A
+`BufferPool` hands out GCs which draw into the top left corner of a larger
+pixel buffer, and reuses the buffer for another GC once the GC is released.
+Buffers are allocated larger than requested, so that one buffer serves a
+window which keeps growing for a while; a free buffer which is much larger
+than the requests, or which has not been used for a while, is dropped.
+"""
+
+from math import ceil
+import weakref
+
+import numpy
+from numpy.lib.stride_tricks import as_strided
+
+
+class BufferPool(object):
+    """ A pool of pixel buffers, keyed by pixel format.
+
+    Parameters
+    ----------
+    growth : float
+        The factor by which a new buffer is larger than requested, in each
+        dimension.
+    max_idle : int
+        The number of requests that a free buffer can go without being
+        used before it is dropped.
+    max_free_bytes : int
+        The total size of the free buffers which are kept.
+
+    The number of requests which were served by a new buffer and by a free
+    buffer are counted in `allocations` and `reuses`.
+    """
+
+    def __init__(self, growth=1.25, max_idle=16, max_free_bytes=64*2**20):
+        self.growth = growth
+        self.max_idle = max_idle
+        self.max_free_bytes = max_free_bytes
+        self.allocations = 0
+        self.reuses = 0
+        # Maps pixel formats to the list of free buffers, as lists
+        # [buffer, number of requests since it was released]
+        self._free = {}
+        # Maps the ids of the buffers in use to (weak reference to the
+        # buffer, pixel format).  A buffer which is dropped without being
+        # released is freed with its GC rather than kept by the pool.
+        self._in_use = {}
+
+    def acquire(self, size, pix_format='bgra32'):
+        """ Returns a height x width x depth array of pixels, with undefined
+        content, for a (width, height) size.
+
+        The array is a view of the top left corner of a buffer of the pool,
+        so its rows are usually not contiguous with each other.
+        """
+        from kiva.agg import pix_format_bytes
+
+        width, height = max(int(size[0]), 1), max(int(size[1]), 1)
+        free = self._free.setdefault(pix_format, [])
+        best = None
+        for entry in free:
+            entry[1] += 1
+            buffer_height, buffer_width = entry[0].shape[:2]
+            if buffer_width < width or buffer_height < height:
+                continue
+            # Don't hand out buffers which are much too large; they will be
+            # dropped if nothing else uses them.
+            area = buffer_width * buffer_height
+            if area > 4 * width * height:
+                continue
+            if best is None or area < best[0].shape[0] * best[0].shape[1]:
+                best = entry
+
+        if best is not None:
+            _remove_entry(free, best)
+            buffer = best[0]
+            self.reuses += 1
+        else:
+            shape = (int(ceil(height * self.growth)),
+                     int(ceil(width * self.growth)),
+                     pix_format_bytes[pix_format])
+            buffer = numpy.empty(shape, numpy.uint8)
+            self.allocations += 1
+        self._trim()
+
+        key = id(buffer)
+        in_use = self._in_use
+        ref = weakref.ref(buffer, lambda ref: in_use.pop(key, None))
+        in_use[key] = (ref, pix_format)
+        return buffer[:height, :width]
+
+    def release(self, pixels):
+        """ Returns the buffer of an array obtained from acquire() to the
+        pool.  The array must not be used afterwards.
+
+        Returns False if the array doesn't come from the pool.
+        """
+        base = pixels.base if pixels.base is not None else pixels
+        entry = self._in_use.get(id(base))
+        if entry is None or entry[0]() is not base:
+            return False
+        del self._in_use[id(base)]
+        buffer, pix_format = base, entry[1]
+        self._free.setdefault(pix_format, []).append([buffer, 0])
+        self._trim()
+        return True
+
+    def create_gc(self, size, pix_format='bgra32', interpolation='nearest',
+                  bottom_up=1):
+        """ Returns a GraphicsContextArray of the given (width, height) size
+        over a buffer of the pool, cleared to white like a new one.
+        """
+        from kiva.agg import GraphicsContextArray
+
+        gc = GraphicsContextArray(self.acquire(size, pix_format), pix_format,
+                                  interpolation, bottom_up)
+        gc.clear()
+        return gc
+
+    def release_gc(self, gc):
+        """ Returns the buffer of a GC obtained from create_gc() to the pool.
+        The GC must not be used afterwards.
+
+        Returns False if the GC doesn't come from the pool.
+        """
+        pixels = getattr(gc, 'bmp_array', None)
+        if not isinstance(pixels, numpy.ndarray):
+            return False
+        return self.release(pixels)
+
+    def clear(self):
+        """ Drops the free buffers. """
+        self._free.clear()
+
+    def in_use_count(self):
+        """ Returns the number of buffers which are in use. """
+        return len(self._in_use)
+
+    def free_bytes(self):
+        """ Returns the total size of the free buffers. """
+        return sum(entry[0].nbytes for free in self._free.values()
+                   for entry in free)
+
+    def _trim(self):
+        """ Drops the free buffers which have not been used for max_idle
+        requests, and then the oldest ones until the free buffers fit in
+        max_free_bytes.
+        """
+        entries = []
+        for free in self._free.values():
+            free[:] = [entry for entry in free if entry[1] <= self.max_idle]
+            entries.extend(free)
+        total = sum(entry[0].nbytes for entry in entries)
+        if total <= self.max_free_bytes:
+            return
+        entries.sort(key=lambda entry: entry[1], reverse=True)
+        for entry in entries:
+            if total <= self.max_free_bytes:
+                break
+            total -= entry[0].nbytes
+            for free in self._free.values():
+                if _remove_entry(free, entry):
+                    break
+
+
+def _remove_entry(entries, entry):
+    """ Removes an entry from a list by identity, since comparing the
+    buffers of two entries is ambiguous.  Returns whether it was found.
+    """
+    for i, other in enumerate(entries):
+        if other is entry:
+            del entries[i]
+            return True
+    return False
+
+
+def pixel_buffer(pixels):
+    """ Returns a buffer over the memory of a height x width x depth array
+    of pixels with contiguous rows, such as the GCs of a pool draw into,
+    from its first pixel to its last one.
+
+    Toolkit images which take a pointer to the pixels and the size of a
+    row, pixels.strides[0], can then be created without copying the pixels.
+    The buffer keeps the array alive.
+    """
+    if pixels.flags.c_contiguous:
+        return pixels.data
+    height, width, depth = pixels.shape
+    size = (height - 1) * pixels.strides[0] + width * depth
+    return as_strided(pixels, shape=(size,), strides=(1,)).data
+
+
+# The pool used by Enable for backbuffers and window GCs.
+default_pool = BufferPool()
@@ -81,6 +81,10 @@ TEXT_FILL_STROKE_CLIP = 6
 TEXT_CLIP = 7
 TEXT_OUTLINE = 8
 
+# Horizontal alignments of the text drawn by show_text_at_points(), as the
+# fraction of the width of each string which is left of its point
+TEXT_ALIGNMENTS = {"left": 0.0, "center": 0.5, "right": 1.0}
+
 # -----------------------------------------------------------------------------
 # Subpath Drawing Primitive Constants
 #
@@ -97,6 +101,17 @@ QUAD_CURVE_TO = 6
 ARC = 7
 ARC_TO = 8
 
+# Bulk primitives, each carrying an Nx4 array.  Their values must not clash
+# with the Subpath CTM Constants below, which share the same path storage.
+LINE_SET = 10
+RECT_SET = 11
+
+# Curve segments.  The vertex of each is the end point of the curve and the
+# rest of its geometry is stored with the path entry.
+CUBIC_SEGMENT = 12
+QUAD_SEGMENT = 13
+ARC_SEGMENT = 14
+
 
 # -----------------------------------------------------------------------------
 # Subpath CTM Constants
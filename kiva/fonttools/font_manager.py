@@ -48,9 +48,11 @@ License   : matplotlib license (PSF compatible)
 
 from __future__ import absolute_import, print_function
 
+import atexit
 import os
 import sys
 import glob
+import multiprocessing
 import subprocess
 import warnings
 import tempfile
@@ -68,6 +70,12 @@ from kiva.fonttools import afm
 
 USE_FONTCONFIG = False
 
+# Font files are parsed in a pool of processes when there are at least this
+# many of them to parse.  The pool relies on fork, so it isn't used on
+# Windows.
+USE_PROCESS_POOL = sys.platform != 'win32'
+PROCESS_POOL_MIN_FILES = 32
+
 font_scalings = {
     'xx-small': 0.579,
     'x-small': 0.694,
@@ -259,6 +267,79 @@ def get_fontext_synonyms(fontext):
     return synonyms[fontext]
 
 
+def _list_directory(path, dir_cache=None):
+    """
+    Return the subdirectories of *path* which are not symbolic links,
+    and the names of all its entries.
+
+    If *dir_cache* is given, the listing is stored in it along with the
+    modification time of the directory, and reused for as long as the
+    directory is not modified.
+    """
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return [], []
+    if dir_cache is not None:
+        cached = dir_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1], cached[2]
+    try:
+        names = os.listdir(path)
+    except OSError:
+        names = []
+    subdirs = []
+    for name in names:
+        subdir = os.path.join(path, name)
+        if os.path.isdir(subdir) and not os.path.islink(subdir):
+            subdirs.append(subdir)
+    if dir_cache is not None:
+        dir_cache[path] = (mtime, subdirs, names)
+    return subdirs, names
+
+
+def _walk_directories(roots, dir_cache=None):
+    """
+    Return the directories in *roots* and all the directories nested
+    within them.
+    """
+    fontpaths = []
+
+    def add(path):
+        fontpaths.append(path)
+        for subdir in _list_directory(path, dir_cache)[0]:
+            add(subdir)
+
+    for fontdir in roots:
+        try:
+            if os.path.isdir(fontdir):
+                add(fontdir)
+        except (IOError, OSError, TypeError, ValueError):
+            pass
+    return fontpaths
+
+
+def _matching_files(path, fontexts, dir_cache=None):
+    """
+    Return the entries of the directory *path* which have one of the
+    extensions *fontexts*, in lower or upper case, like a glob of
+    ``*.ext`` for each extension would.  If *fontexts* is None, all the
+    entries are returned.
+    """
+    if fontexts is not None:
+        fontexts = set(fontexts) | set(ext.upper() for ext in fontexts)
+    files = []
+    for name in _list_directory(path, dir_cache)[1]:
+        if name.startswith('.'):
+            continue
+        ext = os.path.splitext(name)[1][1:]
+        if sys.platform == 'win32':
+            ext = ext.lower()
+        if fontexts is None or ext in fontexts:
+            files.append(os.path.join(path, name))
+    return files
+
+
 def win32FontDirectory():
     """
     Return the user-specified font directory for Win32.  This is
@@ -333,75 +414,87 @@ def win32InstalledFonts(directory=None, fontext='ttf'):
     return None
 
 
-def OSXFontDirectory():
+def OSXFontDirectory(dir_cache=None):
     """
     Return the system font directories for OS X.  This is done by
     starting at the list of hardcoded paths in
     :attr:`OSXFontDirectories` and returning all nested directories
     within them.
-    """
-
-    fontpaths = []
 
-    def add(arg, directory, files):
-        fontpaths.append(directory)
-
-    for fontdir in OSXFontDirectories:
-        try:
-            if os.path.isdir(fontdir):
-                os.path.walk(fontdir, add, None)
-        except (IOError, OSError, TypeError, ValueError):
-            pass
-    return fontpaths
+    If *dir_cache* is given, only the directories which were modified
+    since they were cached in it are listed again.
+    """
+    return _walk_directories(OSXFontDirectories, dir_cache)
 
 
-def OSXInstalledFonts(directory=None, fontext='ttf'):
+def OSXInstalledFonts(directory=None, fontext='ttf', dir_cache=None):
     """
     Get list of font files on OS X - ignores font suffix by default.
     """
     if directory is None:
-        directory = OSXFontDirectory()
+        directory = OSXFontDirectory(dir_cache)
 
     fontext = get_fontext_synonyms(fontext)
 
     files = []
     for path in directory:
-        if fontext is None:
-            files.extend(glob.glob(os.path.join(path, '*')))
-        else:
-            for ext in fontext:
-                files.extend(glob.glob(os.path.join(path, '*.'+ext)))
-                files.extend(glob.glob(os.path.join(path, '*.'+ext.upper())))
+        files.extend(_matching_files(path, fontext, dir_cache))
     return files
 
 
-def x11FontDirectory():
+def x11FontDirectory(dir_cache=None):
     """
     Return the system font directories for X11.  This is done by
     starting at the list of hardcoded paths in
     :attr:`X11FontDirectories` and returning all nested directories
     within them.
-    """
-    fontpaths = []
-
-    def add(arg, directory, files):
-        fontpaths.append(directory)
 
-    for fontdir in X11FontDirectories:
-        try:
-            if os.path.isdir(fontdir):
-                os.path.walk(fontdir, add, None)
-        except (IOError, OSError, TypeError, ValueError):
-            pass
-    return fontpaths
+    If *dir_cache* is given, only the directories which were modified
+    since they were cached in it are listed again.
+    """
+    return _walk_directories(X11FontDirectories, dir_cache)
 
 
-def get_fontconfig_fonts(fontext='ttf'):
+def get_fontconfig_fonts(fontext='ttf', dir_cache=None):
     """
     Grab a list of all the fonts that are being tracked by fontconfig
     by making a system call to ``fc-list``.  This is an easy way to
     grab all of the fonts the user wants to be made available to
     applications, without needing knowing where all of them reside.
+
+    If *dir_cache* is given, the result is stored in it, and ``fc-list``
+    is only called again once one of the directories holding the fonts
+    has been modified.
+    """
+    cache_key = ('fc-list', fontext)
+    if dir_cache is not None and cache_key in dir_cache:
+        dir_mtimes, fontfiles = dir_cache[cache_key]
+        for path, mtime in dir_mtimes.items():
+            try:
+                if os.stat(path).st_mtime != mtime:
+                    break
+            except OSError:
+                break
+        else:
+            return dict(fontfiles)
+
+    fontfiles = _run_fc_list(fontext)
+    if dir_cache is not None:
+        dir_mtimes = {}
+        for fname in fontfiles:
+            path = os.path.dirname(fname)
+            if path not in dir_mtimes:
+                try:
+                    dir_mtimes[path] = os.stat(path).st_mtime
+                except OSError:
+                    pass
+        dir_cache[cache_key] = (dir_mtimes, dict(fontfiles))
+    return fontfiles
+
+
+def _run_fc_list(fontext):
+    """
+    Return the fonts tracked by fontconfig, as keys of a dictionary.
     """
     fontext = get_fontext_synonyms(fontext)
 
@@ -424,13 +517,16 @@ def get_fontconfig_fonts(fontext='ttf'):
     return fontfiles
 
 
-def findSystemFonts(fontpaths=None, fontext='ttf'):
+def findSystemFonts(fontpaths=None, fontext='ttf', dir_cache=None):
     """
     Search for fonts in the specified font paths.  If no paths are
     given, will use a standard set of system paths, as well as the
     list of fonts tracked by fontconfig if fontconfig is installed and
     available.  A list of TrueType fonts are returned by default with
     AFM fonts as an option.
+
+    If *dir_cache* is given, the directory listings are kept in it, and
+    only the directories which were modified since are listed again.
     """
     fontfiles = {}
     fontexts = get_fontext_synonyms(fontext)
@@ -446,23 +542,21 @@ def findSystemFonts(fontpaths=None, fontext='ttf'):
                 if len(ext) > 1 and ext[1:].lower() in fontexts:
                     fontfiles[f] = 1
         else:
-            fontpaths = x11FontDirectory()
+            fontpaths = x11FontDirectory(dir_cache)
             # check for OS X & load its fonts if present
             if sys.platform == 'darwin':
-                for f in OSXInstalledFonts(fontext=fontext):
+                for f in OSXInstalledFonts(fontext=fontext,
+                                           dir_cache=dir_cache):
                     fontfiles[f] = 1
 
-            for f in get_fontconfig_fonts(fontext):
+            for f in get_fontconfig_fonts(fontext, dir_cache):
                 fontfiles[f] = 1
 
     elif isinstance(fontpaths, (str, unicode)):
         fontpaths = [fontpaths]
 
     for path in fontpaths:
-        files = []
-        for ext in fontexts:
-            files.extend(glob.glob(os.path.join(path, '*.'+ext)))
-            files.extend(glob.glob(os.path.join(path, '*.'+ext.upper())))
+        files = _matching_files(path, fontexts, dir_cache)
         for fname in files:
             abs_path = os.path.abspath(fname)
 
@@ -493,6 +587,49 @@ def weight_as_number(weight):
     return weight
 
 
+def _css_value(value, values):
+    """
+    Return the CSS numeric value of a weight or stretch *value*, looking
+    up the names in *values*, like :meth:`FontManager.score_weight` does.
+    """
+    try:
+        return int(value)
+    except ValueError:
+        return values.get(value, 500)
+
+
+def _family_scores(families):
+    """
+    Return a dictionary mapping the lowercase font names which match the
+    list of font families *families* to their
+    :meth:`FontManager.score_family` score.  The names which are not in
+    the dictionary score 1.0.
+    """
+    scores = {}
+    for family1 in families:
+        family1 = family1.lower()
+        if family1 in font_family_aliases:
+            if family1 in ('sans', 'sans serif'):
+                family1 = 'sans-serif'
+            options = [x.lower() for x in preferred_fonts[family1]]
+            for idx, family2 in enumerate(options):
+                if family2 not in scores:
+                    scores[family2] = 0.1 * (float(idx) / len(options))
+        elif family1 not in scores:
+            scores[family1] = 0.0
+    return scores
+
+
+def _lookup_key(prop, directory):
+    """
+    Return the key of the font lookup caches for the
+    :class:`FontProperties` *prop* and the font *directory*.  Unlike the
+    hash of *prop*, it is the same in every process.
+    """
+    l = [(k, getattr(prop, "get" + k)()) for k in sorted(prop.__dict__)]
+    return (repr(l), directory)
+
+
 class FontEntry(object):
     """
     A class for storing Font properties.  It is used when populating
@@ -669,57 +806,105 @@ def afmFontProperty(fontpath, font):
     return FontEntry(fontpath, name, style, variant, weight, stretch, size)
 
 
-def createFontList(fontfiles, fontext='ttf'):
+def _parse_font_file(fpath, fontext='ttf'):
     """
-    A function to create a font lookup list.  The default is to create
-    a list of TrueType fonts.  An AFM font list can optionally be
-    created.
+    Return the :class:`FontEntry` for a font file, or None if the file
+    can't be read.
     """
-
-    fontlist = []
-    #  Add fonts from list of known font files.
-    seen = {}
-    for fpath in fontfiles:
-        verbose.report('createFontDict: %s' % (fpath), 'debug')
-        fname = os.path.split(fpath)[1]
-        if fname in seen:
-            continue
-        else:
-            seen[fname] = 1
-        if fontext == 'afm':
-            try:
-                fh = open(fpath, 'r')
-            except:
-                verbose.report("Could not open font file %s" % fpath)
-                continue
-            try:
-                try:
-                    font = afm.AFM(fh)
-                finally:
-                    fh.close()
-            except RuntimeError:
-                verbose.report("Could not parse font file %s" % fpath)
-                continue
+    verbose.report('createFontDict: %s' % (fpath), 'debug')
+    if fontext == 'afm':
+        try:
+            fh = open(fpath, 'r')
+        except:
+            verbose.report("Could not open font file %s" % fpath)
+            return None
+        try:
             try:
-                prop = afmFontProperty(fpath, font)
-            except:
-                continue
+                font = afm.AFM(fh)
+            finally:
+                fh.close()
+        except RuntimeError:
+            verbose.report("Could not parse font file %s" % fpath)
+            return None
+        try:
+            prop = afmFontProperty(fpath, font)
+        except:
+            return None
+    else:
+        try:
+            font = TTFont(str(fpath))
+        except (RuntimeError, TTLibError):
+            verbose.report("Could not open font file %s" % fpath)
+            return None
+        except UnicodeError:
+            verbose.report("Cannot handle unicode filenames")
+            return None
+        try:
+            prop = ttfFontProperty(fpath, font)
+        except:
+            return None
+    return prop
+
+
+def _parse_font_file_args(args):
+    """
+    Call :func:`_parse_font_file` with a tuple of arguments, for
+    :meth:`multiprocessing.Pool.map`.
+    """
+    return _parse_font_file(*args)
+
+
+def parse_font_files(fontfiles, fontext='ttf'):
+    """
+    Return a list with the :class:`FontEntry` for each of the font files
+    *fontfiles*, or None for those which can't be read.
+
+    If there are many files, and :attr:`USE_PROCESS_POOL` is True, they
+    are parsed in a pool of processes.
+    """
+    if USE_PROCESS_POOL and len(fontfiles) >= PROCESS_POOL_MIN_FILES:
+        try:
+            pool = multiprocessing.Pool()
+        except (AssertionError, OSError, ImportError):
+            # The pool can't be created, for instance in a daemonic
+            # process.  Parse the files here instead.
+            verbose.report("Could not create a process pool")
         else:
             try:
-                font = TTFont(str(fpath))
-            except (RuntimeError, TTLibError):
-                verbose.report("Could not open font file %s" % fpath)
-                continue
-            except UnicodeError:
-                verbose.report("Cannot handle unicode filenames")
-                continue
-            try:
-                prop = ttfFontProperty(fpath, font)
-            except:
-                continue
+                return pool.map(_parse_font_file_args,
+                                [(fpath, fontext) for fpath in fontfiles])
+            except Exception:
+                verbose.report("Could not parse the font files in a pool")
+            finally:
+                pool.terminate()
+                pool.join()
+    return [_parse_font_file(fpath, fontext) for fpath in fontfiles]
+
+
+def _unique_font_files(fontfiles):
+    """
+    Return the font files with a distinct file name, keeping the first
+    file of each name.
+    """
+    unique = []
+    seen = set()
+    for fpath in fontfiles:
+        fname = os.path.split(fpath)[1]
+        if fname not in seen:
+            seen.add(fname)
+            unique.append(fpath)
+    return unique
 
-        fontlist.append(prop)
-    return fontlist
+
+def createFontList(fontfiles, fontext='ttf'):
+    """
+    A function to create a font lookup list.  The default is to create
+    a list of TrueType fonts.  An AFM font list can optionally be
+    created.
+    """
+    fontfiles = _unique_font_files(fontfiles)
+    return [prop for prop in parse_font_files(fontfiles, fontext)
+            if prop is not None]
 
 
 class FontProperties(object):
@@ -1005,22 +1190,22 @@ def ttfdict_to_fnames(d):
 
 def pickle_dump(data, filename):
     """
-    Equivalent to pickle.dump(data, open(filename, 'w'))
+    Equivalent to pickle.dump(data, open(filename, 'wb'), -1)
     but closes the file to prevent filehandle leakage.
     """
-    fh = open(filename, 'w')
+    fh = open(filename, 'wb')
     try:
-        pickle.dump(data, fh)
+        pickle.dump(data, fh, pickle.HIGHEST_PROTOCOL)
     finally:
         fh.close()
 
 
 def pickle_load(filename):
     """
-    Equivalent to pickle.load(open(filename, 'r'))
+    Equivalent to pickle.load(open(filename, 'rb'))
     but closes the file to prevent filehandle leakage.
     """
-    fh = open(filename, 'r')
+    fh = open(filename, 'rb')
     try:
         data = pickle.load(fh)
     finally:
@@ -1030,17 +1215,21 @@ def pickle_load(filename):
 
 class FontManager:
     """
-    On import, the :class:`FontManager` singleton instance creates a
-    list of TrueType fonts based on the font properties: name, style,
-    variant, weight, stretch, and size.  The :meth:`findfont` method
-    does a nearest neighbor search to find the font that most closely
-    matches the specification.  If no good enough match is found, a
-    default font is returned.
+    When it is first used, the :class:`FontManager` singleton instance
+    creates a list of TrueType fonts based on the font properties: name,
+    style, variant, weight, stretch, and size.  The :meth:`findfont`
+    method does a nearest neighbor search to find the font that most
+    closely matches the specification.  If no good enough match is found,
+    a default font is returned.
+
+    The instance is cached on disk along with the modification times of
+    the font directories and files, and :meth:`refresh` brings it up to
+    date by reading only the directories and files which were modified.
     """
     # Increment this version number whenever the font cache data
     # format or behavior has changed and requires a existing font
     # cache files to be rebuilt.
-    __version__ = 7
+    __version__ = 9
 
     def __init__(self, size=None, weight='normal'):
         self._version = self.__version__
@@ -1048,6 +1237,36 @@ class FontManager:
         self.__default_weight = weight
         self.default_size = size
 
+        self.defaultFamily = {
+            'ttf': 'Bitstream Vera Sans',
+            'afm': 'Helvetica'}
+        self.ttflist = []
+        self.afmlist = []
+
+        # The listings of the font directories, and the (mtime, size) and
+        # FontEntry of each font file, used to skip what didn't change.
+        self._dir_cache = {}
+        self._file_cache = {}
+
+        # The font lists indexed by font name, built when first needed.
+        self._font_index = {}
+
+        self.refresh()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_font_index'] = {}
+        state['_unsaved_lookups'] = False
+        return state
+
+    def refresh(self):
+        """
+        Update the font lists with the font files which were added,
+        modified or removed since they were last built.  Only the modified
+        directories and font files are read again.
+
+        Returns True if the font lists changed.
+        """
         paths = []
 
         #  Create list of font paths
@@ -1064,10 +1283,9 @@ class FontManager:
         verbose.report('font search path %s' % (str(paths)))
         #  Load TrueType fonts and create font dictionary.
 
-        self.ttffiles = findSystemFonts(paths) + findSystemFonts()
-        self.defaultFamily = {
-            'ttf': 'Bitstream Vera Sans',
-            'afm': 'Helvetica'}
+        dir_cache = self._dir_cache
+        self.ttffiles = findSystemFonts(paths, dir_cache=dir_cache) + \
+            findSystemFonts(dir_cache=dir_cache)
         self.defaultFont = {}
 
         for fname in self.ttffiles:
@@ -1079,15 +1297,83 @@ class FontManager:
             # use anything
             self.defaultFont['ttf'] = self.ttffiles[0]
 
-        self.ttflist = createFontList(self.ttffiles)
+        file_cache = {}
+        ttflist = self._create_font_list(self.ttffiles, 'ttf', file_cache)
 
-        self.afmfiles = findSystemFonts(paths, fontext='afm') + \
-            findSystemFonts(fontext='afm')
-        self.afmlist = createFontList(self.afmfiles, fontext='afm')
+        self.afmfiles = findSystemFonts(paths, 'afm', dir_cache) + \
+            findSystemFonts(fontext='afm', dir_cache=dir_cache)
+        afmlist = self._create_font_list(self.afmfiles, 'afm', file_cache)
         self.defaultFont['afm'] = None
-
+        self._file_cache = file_cache
+
+        # Unchanged files keep their FontEntry, so comparing the lists
+        # compares the entries by identity.
+        changed = ttflist != self.ttflist or afmlist != self.afmlist
+        self.ttflist = ttflist
+        self.afmlist = afmlist
+        if changed or not hasattr(self, 'ttf_lookup_cache'):
+            self.clear_lookup_caches()
+        return changed
+
+    def clear_lookup_caches(self):
+        """
+        Clear the results of :meth:`findfont` and the font index.  This
+        must be called after modifying :attr:`ttflist` or :attr:`afmlist`.
+        """
         self.ttf_lookup_cache = {}
         self.afm_lookup_cache = {}
+        self._font_index = {}
+        self._unsaved_lookups = False
+
+    def _get_font_index(self, fontext):
+        """
+        Return the index of the font list for *fontext*: a dictionary
+        mapping each lowercase font name to a list of (position, entry,
+        weight, stretch) tuples, with the position of the entry in the
+        list and its CSS numeric weight and stretch.
+        """
+        index = self._font_index.get(fontext)
+        if index is None:
+            if fontext == 'afm':
+                fontlist = self.afmlist
+            else:
+                fontlist = self.ttflist
+            index = {}
+            for position, font in enumerate(fontlist):
+                index.setdefault(font.name.lower(), []).append((
+                    position, font, _css_value(font.weight, weight_dict),
+                    _css_value(font.stretch, stretch_dict)))
+            self._font_index[fontext] = index
+        return index
+
+    def _create_font_list(self, fontfiles, fontext, file_cache):
+        """
+        Create a font lookup list like :func:`createFontList`, reusing the
+        entries of the files which are unchanged since the last call.  The
+        entries of all the files are stored in *file_cache*.
+        """
+        fontfiles = _unique_font_files(fontfiles)
+        entries = [None] * len(fontfiles)
+        to_parse = []
+        for i, fpath in enumerate(fontfiles):
+            try:
+                stat = os.stat(fpath)
+            except OSError:
+                continue
+            stamp = (stat.st_mtime, stat.st_size)
+            cached = self._file_cache.get(fpath)
+            if cached is not None and cached[0] == stamp:
+                entries[i] = cached[1]
+                file_cache[fpath] = cached
+            else:
+                to_parse.append((i, fpath, stamp))
+
+        parsed = parse_font_files([fpath for i, fpath, stamp in to_parse],
+                                  fontext)
+        for (i, fpath, stamp), entry in zip(to_parse, parsed):
+            entries[i] = entry
+            file_cache[fpath] = (stamp, entry)
+        return [entry for entry in entries if entry is not None]
 
     def get_default_weight(self):
         """
@@ -1248,8 +1534,11 @@ class FontManager:
         `directory`, is specified, will only return fonts from the
         given directory (or subdirectory of that directory).
 
-        The result is cached, so subsequent lookups don't have to
-        perform the O(n) nearest neighbor search.
+        Only the fonts whose name matches one of the families of *prop*
+        are scored, since any other font scores too low to be returned.
+        The result is cached, so subsequent lookups don't have to perform
+        the nearest neighbor search, and the cache of the shared
+        :data:`fontManager` is saved along with the font lists.
 
         If `fallback_to_default` is True, will fallback to the default
         font family (usually "Bitstream Vera Sans" or "Helvetica") if
@@ -1268,38 +1557,15 @@ class FontManager:
 
         if fontext == 'afm':
             font_cache = self.afm_lookup_cache
-            fontlist = self.afmlist
         else:
             font_cache = self.ttf_lookup_cache
-            fontlist = self.ttflist
 
-        if directory is None:
-            cached = font_cache.get(hash(prop))
-            if cached:
-                return cached
+        key = _lookup_key(prop, directory)
+        cached = font_cache.get(key)
+        if cached:
+            return cached
 
-        best_score = 1e64
-        best_font = None
-
-        for font in fontlist:
-            fname = font.fname
-            if (directory is not None and
-                    os.path.commonprefix([fname, directory]) != directory):
-                continue
-            # Matching family should have highest priority, so it is multiplied
-            # by 10.0
-            score = \
-                self.score_family(prop.get_family(), font.name) * 10.0 + \
-                self.score_style(prop.get_style(), font.style) + \
-                self.score_variant(prop.get_variant(), font.variant) + \
-                self.score_weight(prop.get_weight(), font.weight) + \
-                self.score_stretch(prop.get_stretch(), font.stretch) + \
-                self.score_size(prop.get_size(), font.size)
-            if score < best_score:
-                best_score = score
-                best_font = font
-            if score == 0:
-                break
+        best_font, best_score = self._find_best_font(prop, fontext, directory)
 
         if best_font is None or best_score >= 10.0:
             if fallback_to_default:
@@ -1326,17 +1592,62 @@ class FontManager:
         if not os.path.isfile(result):
             if rebuild_if_missing:
                 verbose.report(
-                    'findfont: Found a missing font file.  Rebuilding cache.')
-                _rebuild()
-                return fontManager.findfont(
-                    prop, fontext, directory, True, False)
+                    'findfont: Found a missing font file.  Updating cache.')
+                if self.refresh() and self is _font_manager:
+                    _save_font_manager()
+                return self.findfont(prop, fontext, directory, True, False)
             else:
                 raise ValueError("No valid font could be found")
 
-        if directory is None:
-            font_cache[hash(prop)] = result
+        font_cache[key] = result
+        self._unsaved_lookups = True
         return result
 
+    def _find_best_font(self, prop, fontext, directory):
+        """
+        Return the font entry of the font list for *fontext* which best
+        matches *prop*, and its score, or (None, 1e64) if no font name
+        matches the families of *prop*.  The scores are the same as the
+        sum of the ``score_*`` methods.
+        """
+        index = self._get_font_index(fontext)
+        candidates = []
+        for name, family_score in _family_scores(
+                prop.get_family()).items():
+            for item in index.get(name, ()):
+                candidates.append((item, family_score))
+        # Ties go to the first font in the list, as in a linear search.
+        candidates.sort(key=lambda candidate: candidate[0][0])
+
+        style = prop.get_style()
+        variant = prop.get_variant()
+        weight = _css_value(prop.get_weight(), weight_dict)
+        stretch = _css_value(prop.get_stretch(), stretch_dict)
+        size = prop.get_size()
+
+        best_score = 1e64
+        best_font = None
+
+        for (position, font, font_weight, font_stretch), family_score in \
+                candidates:
+            if directory is not None and not font.fname.startswith(directory):
+                continue
+            # Matching family should have highest priority, so it is multiplied
+            # by 10.0
+            score = \
+                family_score * 10.0 + \
+                self.score_style(style, font.style) + \
+                self.score_variant(variant, font.variant) + \
+                abs(weight - font_weight) / 1000.0 + \
+                abs(stretch - font_stretch) / 1000.0 + \
+                self.score_size(size, font.size)
+            if score < best_score:
+                best_score = score
+                best_font = font
+            if score == 0:
+                break
+        return best_font, best_score
+
 
 _is_opentype_cff_font_cache = {}
 
@@ -1361,16 +1672,90 @@ def is_opentype_cff_font(filename):
 
 fontManager = None
 
+# The FontManager instance behind fontManager, once it is loaded.
+_font_manager = None
+
 _fmcache = os.path.join(get_configdir(), 'fontList.cache')
 
 
+def _save_font_manager():
+    # Write to a temporary file first, so that other processes never read
+    # a partially written cache.
+    tmpname = '%s.%d' % (_fmcache, os.getpid())
+    try:
+        pickle_dump(_font_manager, tmpname)
+        if sys.platform == 'win32' and os.path.exists(_fmcache):
+            os.remove(_fmcache)
+        os.rename(tmpname, _fmcache)
+    except (IOError, OSError, pickle.PicklingError):
+        verbose.report("could not write the font cache %s" % _fmcache)
+    else:
+        _font_manager._unsaved_lookups = False
+
+
+def _save_font_lookups():
+    """
+    Save the font cache if :meth:`FontManager.findfont` found new fonts,
+    so that other processes don't have to look them up again.
+    """
+    if (_font_manager is not None and
+            getattr(_font_manager, '_unsaved_lookups', False)):
+        _save_font_manager()
+
+
 def _rebuild():
-    global fontManager
-    fontManager = FontManager()
-    pickle_dump(fontManager, _fmcache)
+    global _font_manager
+    _font_manager = FontManager()
+    _save_font_manager()
     verbose.report("generated new fontManager")
 
 
+def _get_font_manager():
+    """
+    Return the FontManager singleton, loading it from the font cache and
+    bringing it up to date the first time.
+    """
+    global _font_manager
+    if _font_manager is not None:
+        return _font_manager
+    try:
+        manager = pickle_load(_fmcache)
+        if (not hasattr(manager, '_version') or
+                manager._version != FontManager.__version__):
+            manager = None
+    except:
+        manager = None
+
+    if manager is None:
+        _rebuild()
+    else:
+        manager.default_size = None
+        verbose.report("Using fontManager instance from %s" % _fmcache)
+        _font_manager = manager
+        if manager.refresh():
+            _save_font_manager()
+    atexit.register(_save_font_lookups)
+    return _font_manager
+
+
+class _LazyFontManager(object):
+    """
+    Stands in for the FontManager singleton, which is only loaded from the
+    font cache or built when one of its attributes is first used.
+    """
+
+    def __getattr__(self, name):
+        return getattr(_get_font_manager(), name)
+
+    def __setattr__(self, name, value):
+        setattr(_get_font_manager(), name, value)
+
+    def __repr__(self):
+        if _font_manager is None:
+            return '<FontManager (not loaded)>'
+        return repr(_font_manager)
+
+
 # The experimental fontconfig-based backend.
 if USE_FONTCONFIG and sys.platform != 'win32':
     import re
@@ -1408,18 +1793,8 @@ if USE_FONTCONFIG and sys.platform != 'win32':
         return result
 
 else:
-    try:
-        fontManager = pickle_load(_fmcache)
-        if (not hasattr(fontManager, '_version') or
-                fontManager._version != FontManager.__version__):
-            _rebuild()
-        else:
-            fontManager.default_size = None
-            verbose.report("Using fontManager instance from %s" % _fmcache)
-    except:
-        _rebuild()
+    fontManager = _LazyFontManager()
 
     def findfont(prop, **kw):
-        global fontManager
-        font = fontManager.findfont(prop, **kw)
+        font = _get_font_manager().findfont(prop, **kw)
         return font
@@ -0,0 +1,191 @@
+import os
+import shutil
+import tempfile
+
+from traits.testing.unittest_tools import unittest
+
+from .. import font_manager
+from ..font_manager import (FontEntry, FontManager, FontProperties,
+                            findSystemFonts, parse_font_files)
+
+
+def _system_font():
+    files = sorted(findSystemFonts())
+    return files[0] if files else None
+
+
+def make_font_list(directory):
+    """ Make font entries in two subdirectories of *directory*, with one
+    empty font file for each.
+    """
+    fonts = []
+    styles = ['normal', 'italic', 'oblique']
+    weights = ['light', 'normal', 'bold', 600]
+    names = ['Family %d' % i for i in range(10)] + ['DejaVu Serif',
+                                                     'DejaVu Sans Mono']
+    for subdir in ('a', 'b'):
+        os.mkdir(os.path.join(directory, subdir))
+        for i, name in enumerate(names):
+            for j, style in enumerate(styles):
+                fname = os.path.join(directory, subdir, '%d-%d.ttf' % (i, j))
+                open(fname, 'w').close()
+                fonts.append(FontEntry(fname, name, style,
+                                       weight=weights[(i + j) % 4],
+                                       stretch=['normal', 'condensed'][j % 2],
+                                       size='scalable'))
+    return fonts
+
+
+class TestFontCache(unittest.TestCase):
+
+    def setUp(self):
+        self.font = _system_font()
+        if self.font is None:
+            self.skipTest('No TrueType font installed')
+        self.directory = tempfile.mkdtemp()
+        self.old_path = os.environ.get('TTFPATH')
+        os.environ['TTFPATH'] = self.directory
+
+    def tearDown(self):
+        if self.old_path is None:
+            del os.environ['TTFPATH']
+        else:
+            os.environ['TTFPATH'] = self.old_path
+        shutil.rmtree(self.directory)
+
+    def add_font(self, name):
+        path = os.path.join(self.directory, name)
+        shutil.copy(self.font, path)
+        return path
+
+    def test_directory_listing_is_cached(self):
+        first = self.add_font('a.ttf')
+        second = self.add_font('b.ttf')
+        dir_cache = {}
+        files = findSystemFonts([self.directory], dir_cache=dir_cache)
+        self.assertEqual(sorted(files), [first, second])
+        self.assertIn(self.directory, dir_cache)
+
+        # A listing is reused while the mtime of the directory is the same.
+        mtime = dir_cache[self.directory][0]
+        dir_cache[self.directory] = (mtime, [], ['b.ttf'])
+        files = findSystemFonts([self.directory], dir_cache=dir_cache)
+        self.assertEqual(files, [second])
+
+    def test_refresh_parses_changed_files_only(self):
+        first = self.add_font('a.ttf')
+        manager = FontManager()
+        self.assertIn(first, [entry.fname for entry in manager.ttflist])
+
+        parsed = []
+
+        def parse(fontfiles, fontext='ttf'):
+            parsed.extend(fontfiles)
+            return parse_font_files(fontfiles, fontext)
+
+        font_manager.parse_font_files = parse
+        try:
+            self.assertFalse(manager.refresh())
+            self.assertEqual(parsed, [])
+
+            second = self.add_font('b.ttf')
+            self.assertTrue(manager.refresh())
+            self.assertEqual(parsed, [second])
+        finally:
+            font_manager.parse_font_files = parse_font_files
+        self.assertIn(second, [entry.fname for entry in manager.ttflist])
+
+        os.remove(first)
+        self.assertTrue(manager.refresh())
+        self.assertNotIn(first, [entry.fname for entry in manager.ttflist])
+
+    def test_parse_font_files_in_process_pool(self):
+        paths = [self.add_font('%d.ttf' % i) for i in range(4)]
+        old_min_files = font_manager.PROCESS_POOL_MIN_FILES
+        font_manager.PROCESS_POOL_MIN_FILES = 1
+        try:
+            entries = parse_font_files(paths)
+        finally:
+            font_manager.PROCESS_POOL_MIN_FILES = old_min_files
+        self.assertEqual([entry.fname for entry in entries], paths)
+
+
+class TestFindFont(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.old_path = os.environ.get('TTFPATH')
+        os.environ['TTFPATH'] = self.directory
+        self.manager = FontManager()
+        self.manager.ttflist = make_font_list(self.directory)
+        self.manager.clear_lookup_caches()
+
+    def tearDown(self):
+        if self.old_path is None:
+            del os.environ['TTFPATH']
+        else:
+            os.environ['TTFPATH'] = self.old_path
+        shutil.rmtree(self.directory)
+
+    def linear_search(self, prop, directory=None):
+        """ The score of each font, like findfont used to compute it.
+        """
+        manager = self.manager
+        best_score = 1e64
+        best_font = None
+        for font in manager.ttflist:
+            if (directory is not None and
+                    os.path.commonprefix([font.fname, directory]) !=
+                    directory):
+                continue
+            score = \
+                manager.score_family(prop.get_family(), font.name) * 10.0 + \
+                manager.score_style(prop.get_style(), font.style) + \
+                manager.score_variant(prop.get_variant(), font.variant) + \
+                manager.score_weight(prop.get_weight(), font.weight) + \
+                manager.score_stretch(prop.get_stretch(), font.stretch) + \
+                manager.score_size(prop.get_size(), font.size)
+            if score < best_score:
+                best_score = score
+                best_font = font
+            if score == 0:
+                break
+        return best_font, best_score
+
+    def test_matches_linear_search(self):
+        def match(result):
+            # findfont falls back to the default font from a score of 10.
+            font, score = result
+            return result if score < 10.0 else None
+
+        directory = os.path.join(self.directory, 'b')
+        for family in (['Family 3'], ['family 7', 'Family 3'], ['serif'],
+                       ['Unknown', 'sans-serif'], ['monospace'],
+                       ['Unknown']):
+            for style in ('normal', 'italic', 'oblique'):
+                for weight in ('light', 'bold', 700):
+                    prop = FontProperties(family=family, style=style,
+                                          weight=weight, stretch='condensed',
+                                          size=12)
+                    for d in (None, directory):
+                        self.assertEqual(
+                            match(self.manager._find_best_font(prop, 'ttf',
+                                                               d)),
+                            match(self.linear_search(prop, d)))
+
+    def test_lookups_are_cached(self):
+        prop = FontProperties(family=['Family 3'], weight='bold', size=12)
+        fname = self.manager.findfont(prop, rebuild_if_missing=False)
+        self.assertEqual(os.path.basename(os.path.dirname(fname)), 'a')
+        self.assertTrue(self.manager._unsaved_lookups)
+
+        # The cache is keyed by the properties and the directory.
+        directory = os.path.join(self.directory, 'b')
+        other = self.manager.findfont(prop, directory=directory,
+                                      rebuild_if_missing=False)
+        self.assertTrue(other.startswith(directory))
+        self.assertEqual(len(self.manager.ttf_lookup_cache), 2)
+
+        self.manager.clear_lookup_caches()
+        self.assertEqual(self.manager.ttf_lookup_cache, {})
+        self.assertFalse(self.manager._unsaved_lookups)
@@ -14,8 +14,14 @@
     Though this can be used to perform drawing in non-GUI applications,
     the Image backend is also used by many of the GUI backends to draw into
     the memory space of the graphics contexts.
+
+    render_component() draws an Enable component without a window, and
+    render_components() draws a batch of components in worker processes.
 """
 
+import cPickle
+import multiprocessing
+
 # Soon the Agg subpackage will be renamed for real.  For now, just
 # proxy the imports.
 from agg import GraphicsContextArray as GraphicsContext
@@ -39,3 +45,95 @@ def font_metrics_provider():
 
     return GraphicsContext((1, 1))
 
+
+# The backends which render_component() can draw with; their GraphicsContext
+# is created from a (width, height) size.
+_RENDER_BACKENDS = ('image', 'cairo', 'svg')
+
+
+def render_component(component, size=None, backend='image'):
+    """ Draws a component into a new graphics context, without a window, and
+    returns the graphics context.
+
+    Parameters
+    ----------
+    component : Component
+        The Enable component to draw, usually the top of a tree of
+        components.
+    size : (width, height)
+        The size of the graphics context.  The outer bounds of the component
+        are set to it before it is laid out.  If it is None, the current
+        outer bounds of the component are used.
+    backend : str
+        The Kiva backend to draw with: 'image' (the default), 'cairo' or
+        'svg'.
+
+    Call save() on the graphics context to write it to a file.
+    """
+    if backend not in _RENDER_BACKENDS:
+        raise ValueError("Unknown backend for render_component: %r"
+                         % backend)
+    module = __import__('kiva.' + backend, fromlist=['GraphicsContext'])
+
+    if size is not None:
+        component.outer_bounds = list(size)
+    component.do_layout(force=True)
+    x, y = component.outer_position
+    width, height = component.outer_bounds
+    gc = module.GraphicsContext((int(width), int(height)))
+    gc.translate_ctm(-x, -y)
+    component.draw(gc, view_bounds=(x, y, width, height))
+    return gc
+
+
+def render_components(components, filenames=None, size=None,
+                      backend='image', processes=None):
+    """ Draws a batch of components in parallel worker processes.
+
+    The components are pickled, so that they can be sent to the workers;
+    the components themselves are not laid out or drawn.
+
+    Parameters
+    ----------
+    components : list of Component
+        The components to draw, e.g. one per page of a report.
+    filenames : list of str
+        The files to save the drawings of the components to.  If it is None,
+        the pixel arrays of the drawings are returned instead; this needs
+        the 'image' backend.
+    size, backend
+        As for render_component().
+    processes : int
+        The number of worker processes; by default, the number of CPUs.  If
+        it is 1, the components are drawn in this process.
+
+    Returns the list of file names, or of pixel arrays.
+    """
+    if filenames is None:
+        if backend != 'image':
+            raise ValueError("Only the 'image' backend can return pixels")
+        filenames = [None] * len(components)
+    elif len(filenames) != len(components):
+        raise ValueError("There must be a file name for each component")
+    jobs = [(cPickle.dumps(component, cPickle.HIGHEST_PROTOCOL), filename,
+             size, backend)
+            for component, filename in zip(components, filenames)]
+
+    if processes == 1 or len(jobs) < 2:
+        return map(_render_pickled_component, jobs)
+    pool = multiprocessing.Pool(processes)
+    try:
+        return pool.map(_render_pickled_component, jobs)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _render_pickled_component(job):
+    """ Draws a pickled component for render_components(). """
+    pickled_component, filename, size, backend = job
+    gc = render_component(cPickle.loads(pickled_component), size, backend)
+    if filename is None:
+        return gc.bmp_array
+    gc.save(filename)
+    return filename
@@ -0,0 +1,111 @@
+#------------------------------------------------------------------------------
+# Copyright (c) 2014, Enthought, Inc.
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in enthought/LICENSE.txt and may be redistributed only
+# under the conditions described in the aforementioned license.  The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+# Thanks for using Enthought open source!
+#------------------------------------------------------------------------------
+""" Image conversion and caching for the backends which embed images in a
+document.
+
+Encoding an image for a document (as PNG data for SVG, or as an image
+object for PDF) is expensive, and the same image is often drawn many times,
+like a colorbar on every page.  The backends keep the encoded images in an
+`ImageCache`, keyed by a hash of the pixels, and embed each of them only
+once.
+"""
+
+import hashlib
+
+from numpy import ascontiguousarray, ndarray
+
+
+def image_pixels(img):
+    """ Returns the pixels of an image and their PIL mode.
+
+    `img` is either an HxWx3 or HxWx4 array, or a GC from Kiva's Agg backend
+    (kiva.agg.GraphicsContextArray).  The pixels are returned as a
+    contiguous array, which shares the memory of the image where possible,
+    along with 'RGB' or 'RGBA'.  Returns (None, None) for other types of
+    images.
+    """
+    from kiva import agg
+
+    if isinstance(img, ndarray):
+        if img.shape[-1] == 3:
+            img = agg.GraphicsContextArray(img, pix_format='rgb24')
+            format = 'RGB'
+        else:
+            img = agg.GraphicsContextArray(img, pix_format='rgba32')
+            format = 'RGBA'
+    elif isinstance(img, agg.GraphicsContextArray):
+        if img.format().startswith('RGBA'):
+            format = 'RGBA'
+        elif img.format().startswith('RGB'):
+            format = 'RGB'
+        else:
+            img = img.convert_pixel_format('rgba32', inplace=0)
+            format = 'RGBA'
+    else:
+        return None, None
+    return ascontiguousarray(img.bmp_array), format
+
+
+def pil_image(pixels, format):
+    """ Returns a PIL image using the memory of an array of pixels, as
+    returned by `image_pixels`.
+    """
+    from PIL import Image as PilImage
+
+    height, width = pixels.shape[:2]
+    return PilImage.frombuffer(format, (width, height), pixels,
+                               'raw', format, 0, 1)
+
+
+class ImageCache(object):
+    """ A cache of encoded images, keyed by the content of the images.
+
+    The number of lookups which found an entry and which did not are
+    counted in `hits` and `misses`.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, pixels, format, *extra):
+        """ Returns the key for an array of pixels in the given mode.
+
+        Any other values which the encoded image depends on, like the size
+        it is scaled to, are passed in `extra`.
+        """
+        digest = hashlib.sha1(pixels).hexdigest()
+        return (digest, pixels.shape, format) + extra
+
+    def get(self, key):
+        """ Returns the encoded image for a key, or None.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def add(self, key, entry):
+        """ Stores the encoded image for a key.
+        """
+        self._entries[key] = entry
+
+    def clear(self):
+        """ Removes all the images, for when the document they were embedded
+        in is discarded.
+        """
+        self._entries.clear()
@@ -23,7 +23,8 @@ from __future__ import absolute_import, print_function
 from itertools import izip
 import warnings
 import copy
-from numpy import array, pi
+import numpy as np
+from numpy import pi
 
 # ReportLab PDF imports
 import reportlab.pdfbase.pdfmetrics
@@ -35,6 +36,8 @@ from .arc_conversion import arc_to_tangent_points
 from .basecore2d import GraphicsContextBase
 from .line_state import is_dashed
 from .constants import FILL, STROKE, EOF_FILL
+from .image_cache import ImageCache, image_pixels, pil_image
+from .text_extents import default_cache, string_widths
 import kiva.constants as constants
 import kiva.affine as affine
 
@@ -75,6 +78,7 @@ class GraphicsContext(GraphicsContextBase):
         self.text_xy = None, None
         # get an agg backend to assist in measuring text
         self._agg_gc = GraphicsContextImage((1, 1))
+        self._images = ImageCache()
         super(GraphicsContext, self).__init__(self, *args, **kwargs)
 
     # ----------------------------------------------------------------
@@ -478,12 +482,6 @@ class GraphicsContext(GraphicsContextBase):
         clip_path.rect(x, y, width, height)
         self.gc.clipPath(clip_path, stroke=0, fill=0)
 
-    def clip_to_rects(self):
-        """
-        """
-        msg = "clip_to_rects not implemented yet on PDF."
-        raise NotImplementedError(msg)
-
     def clear_clip_path(self):
         """
         """
@@ -569,46 +567,40 @@ class GraphicsContext(GraphicsContextBase):
         Requires the Python Imaging Library (PIL).
         """
 
-        # We turn img into a PIL object, since that is what ReportLab
-        # requires.  To do this, we first determine if the input image
-        # GC needs to be converted to RGBA/RGB.  If so, we see if we can
-        # do it nicely (using convert_pixel_format), and if not, we do
-        # it brute-force using Agg.
         from reportlab.lib.utils import ImageReader
-        from PIL import Image as PilImage
-        from kiva import agg
-
-        if type(img) == type(array([])):
-            # Numeric array
-            converted_img = agg.GraphicsContextArray(img, pix_format='rgba32')
-            format = 'RGBA'
-        elif isinstance(img, agg.GraphicsContextArray):
-            if img.format().startswith('RGBA'):
-                format = 'RGBA'
-            elif img.format().startswith('RGB'):
-                format = 'RGB'
-            else:
-                converted_img = img.convert_pixel_format('rgba32', inplace=0)
-                format = 'RGBA'
-        else:
+
+        pixels, format = image_pixels(img)
+        if pixels is None:
             warnings.warn("Cannot render image of type %r into PDF context."
                           % type(img))
             return
 
-        # converted_img now holds an Agg graphics context with the image
-        pil_img = PilImage.fromstring(format,
-                                      (converted_img.width(),
-                                       converted_img.height()),
-                                      converted_img.bmp_array.tostring())
-
         if rect is None:
-            rect = (0, 0, img.width(), img.height())
+            height, width = pixels.shape[:2]
+            rect = (0, 0, width, height)
+
+        # Each image is embedded once, as a form of unit size, which is
+        # scaled into place wherever the image is drawn.
+        key = self._images.key(pixels, format)
+        name = self._images.get(key)
+        if name is None:
+            # The same pixels can be cached under several keys, with other
+            # shapes, so the forms are numbered rather than named by hash.
+            name = 'kiva_image_%d' % len(self._images)
+            # Wrap the image in an ImageReader object, because that's what
+            # reportlab actually needs.
+            self.gc.beginForm(name, 0, 0, 1, 1)
+            self.gc.drawImage(ImageReader(pil_image(pixels, format)),
+                              0, 0, 1, 1)
+            self.gc.endForm()
+            self._images.add(key, name)
 
         # Draw the actual image.
-        # Wrap it in an ImageReader object, because that's what reportlab
-        # actually needs.
-        self.gc.drawImage(ImageReader(pil_img),
-                          rect[0], rect[1], rect[2], rect[3])
+        self.gc.saveState()
+        self.gc.translate(rect[0], rect[1])
+        self.gc.scale(rect[2], rect[3])
+        self.gc.doForm(name)
+        self.gc.restoreState()
 
     # ----------------------------------------------------------------
     # Drawing Text
@@ -719,6 +711,30 @@ class GraphicsContext(GraphicsContextBase):
         w, h, d, l = self.get_full_text_extent(textstring)
         return w, h
 
+    def get_text_extents(self, strings):
+        """ Returns the (x, y, w, h) extent of each string in the rows of an
+        Nx4 array, with the width, height and descent (as y) measured by
+        get_full_text_extent().
+        """
+        return default_cache.get_extents(
+            ('pdf', self.gc._fontname, self.gc._fontsize), strings,
+            self._measure_text_extents)
+
+    def _measure_text_extents(self, strings):
+        fontname = self.gc._fontname
+        fontsize = self.gc._fontsize
+
+        ascent, descent = reportlab.pdfbase._fontdata.ascent_descent[fontname]
+
+        # ignore the descent returned by reportlab where AGG returns 0.0
+        agg_descents = self._agg_gc.get_text_extents(strings)[:, 1]
+        extents = np.zeros((len(strings), 4))
+        extents[:, 1] = np.where(agg_descents == 0.0, 0.0,
+                                 descent * fontsize / 1000.0)
+        extents[:, 2] = string_widths(strings, fontname, fontsize)
+        extents[:, 3] = ascent * fontsize / 1000.0 + abs(extents[:, 1])
+        return extents
+
     # ----------------------------------------------------------------
     # Painting paths (drawing and filling contours)
     # ----------------------------------------------------------------
@@ -0,0 +1,121 @@
+#------------------------------------------------------------------------------
+# Copyright (c) 2014, Enthought, Inc.
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in enthought/LICENSE.txt and may be redistributed only
+# under the conditions described in the aforementioned license.  The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+# Thanks for using Enthought open source!
+#------------------------------------------------------------------------------
+""" Fast conversion of arrays of points to text, for the vector backends.
+
+Formatting every coordinate with the % operator in a Python loop is the
+bottleneck when writing large drawings to SVG or PostScript.  The functions
+in this module convert a whole Nx2 array at once: the coordinates are
+rounded to integers at the requested precision, their digits are computed
+with array arithmetic into a character matrix, and the characters which
+are not padding are extracted in one step.
+
+The output matches "%.<precision>f" formatting, except that values which
+round to zero are never written with a minus sign, and that values lying
+within floating point error of halfway between two outputs may round the
+other way.  Arrays holding NaN, infinite or huge values, which don't fit
+the integer arithmetic, are formatted with the % operator instead, so that
+they are written as "nan" and "inf" like before.
+"""
+
+import numpy as np
+
+# The largest scaled coordinate which is formatted with integer arithmetic;
+# the scaled coordinates must be exact in a float and fit in an int64.
+_MAX_SCALED = 2**53
+
+
+def format_points(points, precision=2, separator=',', terminator=' ',
+                  prefix='', relative=False):
+    """ Returns the text for an Nx2 array of points.
+
+    Each point is written as `prefix`, x, `separator`, y, `terminator`,
+    with the coordinates in fixed-point notation with `precision` digits
+    after the decimal point.
+
+    If `relative` is True, every point but the first is written as the
+    difference to the previous one.  The differences are taken after
+    rounding, so the absolute positions they add up to are exact.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(points) == 0:
+        return ''
+    scaled = np.rint(points * 10**precision)
+    if not (np.isfinite(scaled).all() and np.abs(scaled).max() < _MAX_SCALED):
+        return _format_with_strings(points, precision, separator, terminator,
+                                    prefix, relative)
+    scaled = scaled.astype(np.int64)
+    if relative:
+        scaled[1:] = np.diff(scaled, axis=0)
+    x_chars, x_mask = _number_chars(scaled[:, 0], precision)
+    y_chars, y_mask = _number_chars(scaled[:, 1], precision)
+    blocks = [(x_chars, x_mask), (y_chars, y_mask)]
+    for text, index in ((prefix, 0), (separator, 2), (terminator, 4)):
+        blocks.insert(index, _constant_chars(text, len(points)))
+    chars = np.hstack([block[0] for block in blocks])
+    mask = np.hstack([block[1] for block in blocks])
+    return chars[mask].tostring()
+
+
+def _format_with_strings(points, precision, separator, terminator, prefix,
+                         relative):
+    """ Returns the text for an Nx2 array of points, as format_points(),
+    formatting each coordinate with the % operator.
+    """
+    if relative:
+        rounded = np.round(points, precision)
+        points = np.vstack((rounded[:1], np.diff(rounded, axis=0)))
+    number = '%%.%df' % precision
+    template = (prefix.replace('%', '%%') + number +
+                separator.replace('%', '%%') + number +
+                terminator.replace('%', '%%'))
+    return ''.join([template % (x, y) for x, y in points.tolist()])
+
+
+def _constant_chars(text, count):
+    """ Returns the character matrix and mask for a text repeated on every
+    row.
+    """
+    chars = np.empty((count, len(text)), dtype=np.uint8)
+    chars[:] = np.fromstring(text, dtype=np.uint8)
+    return chars, np.ones(chars.shape, dtype=bool)
+
+
+def _number_chars(values, precision):
+    """ Returns the character matrix and mask for an array of integers,
+    written as fixed-point numbers with `precision` decimals.
+
+    Each row holds the sign, the digits and the decimal point of one
+    number, right aligned.  The mask selects the characters which are part
+    of the number.
+    """
+    magnitude = np.abs(values)
+    largest = int(magnitude.max()) if len(magnitude) else 0
+    n_digits = max(len(str(largest)), precision + 1)
+    n_int = n_digits - precision
+    powers = 10 ** np.arange(n_digits - 1, -1, -1, dtype=np.int64)
+    digits = (magnitude[:, np.newaxis] // powers) % 10
+
+    # Significant digits of the integer part; at least one is written.
+    int_part = magnitude // 10**precision
+    int_powers = 10 ** np.arange(1, n_int, dtype=np.int64)
+    int_len = 1 + (int_part[:, np.newaxis] >= int_powers).sum(axis=1)
+
+    n_cols = 1 + n_digits + (1 if precision else 0)
+    chars = np.empty((len(values), n_cols), dtype=np.uint8)
+    mask = np.ones(chars.shape, dtype=bool)
+    chars[:, 0] = ord('-')
+    mask[:, 0] = values < 0
+    chars[:, 1:1+n_int] = digits[:, :n_int] + ord('0')
+    mask[:, 1:1+n_int] = np.arange(n_int) >= (n_int - int_len)[:, np.newaxis]
+    if precision:
+        chars[:, 1+n_int] = ord('.')
+        chars[:, 2+n_int:] = digits[:, n_int:] + ord('0')
+    return chars, mask
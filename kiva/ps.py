@@ -20,7 +20,7 @@
 import os
 import sys
 from cStringIO import StringIO
-from numpy import arange, ravel, array
+from numpy import arange, ravel, array, column_stack, where
 import warnings
 
 # Local, relative Kiva imports
@@ -29,6 +29,8 @@ import basecore2d
 import constants
 from constants import *
 import agg
+from text_extents import afm_text_extents, default_cache
+from point_formatting import format_points
 
 # This backend does not have compiled paths, yet.
 CompiledPath = None
@@ -59,10 +61,7 @@ except ImportError:
     log = FakeLogger()
 
 def _strpoints(points):
-    c = StringIO()
-    for x,y in points:
-        c.write('%3.2f,%3.2f ' % (x,y))
-    return c.getvalue()
+    return format_points(points, 2)
 
 def _mkstyle(kw):
     return '"' + '; '.join([str(k) + ':' + str(v) for k,v in kw.items()]) +'"'
@@ -119,8 +118,16 @@ fill_stroke_map = {FILL_STROKE: ('fill', 'stroke'),
 
 
 class PSGC(basecore2d.GraphicsContextBase):
+    """ A graphics context which writes PostScript.
+
+    Point coordinates are written with `precision` digits after the decimal
+    point (3 by default).  If `relative_paths` is True, the points of a
+    path after the first are written as offsets with rlineto.
+    """
 
     def __init__(self, size, *args, **kwargs):
+        self.precision = kwargs.pop('precision', 3)
+        self.relative_paths = kwargs.pop('relative_paths', False)
         super(PSGC, self).__init__(size, *args, **kwargs)
         self.size = size
         self._height = size[1]
@@ -183,6 +190,19 @@ class PSGC(basecore2d.GraphicsContextBase):
         width = pdfmetrics.stringWidth(text, self.face_name, self.font_size)
         return width, height, descent, height*1.2 # assume leading of 1.2*height
 
+    def get_text_extent(self, text):
+        width, height, descent, leading = self.get_full_text_extent(text)
+        return 0.0, -descent, width, height
+
+    def get_text_extents(self, strings):
+        """ Returns the (x, y, w, h) extent of each string, as returned by
+        get_text_extent(), in the rows of an Nx4 array.
+        """
+        face_name, font_size = self.face_name, self.font_size
+        return default_cache.get_extents(
+            ('afm', face_name, font_size), strings,
+            lambda strings: afm_text_extents(strings, face_name, font_size))
+
     # actual implementation =)
 
     def device_draw_image(self, img, rect):
@@ -267,22 +287,18 @@ class PSGC(basecore2d.GraphicsContextBase):
                                 affine.affine_params(m))
 
     def device_fill_points(self, points, mode):
-        if self.state.clipping_path:
-            self.contents.write('clipsave\n')
-            self.contents.write('%3.3f %3.3f %3.3f %3.3f rectclip\n' % self.state.clipping_path)
-        linecap = line_cap_map[self.state.line_cap]
-        linejoin = line_join_map[self.state.line_join]
-        dasharray = self._dasharray()
-        if dasharray:
-            self.contents.write('%s 0 setdash\n' % dasharray)
-        self.contents.write('%3.3f setlinewidth\n' % self.state.line_width)
-        self.contents.write('%d setlinecap\n' % linecap)
-        self.contents.write('%d setlinejoin\n' % linejoin)
+        self._begin_shape()
         self.contents.write('newpath\n')
-        x,y = points[0]
-        self.contents.write('    %3.3f %3.3f moveto\n' % (x,y))
-        for (x,y) in points[1:]:
-            self.contents.write('    %3.3f %3.3f lineto\n' % (x,y))
+        if self.relative_paths:
+            lineto = ' rlineto\n'
+        else:
+            lineto = ' lineto\n'
+        lines = format_points(points, self.precision, ' ', lineto, '    ',
+                              relative=self.relative_paths)
+        # The first point starts the path.
+        first, _, rest = lines.partition(lineto)
+        self.contents.write(first + ' moveto\n')
+        self.contents.write(rest)
 
         first_pass, second_pass = fill_stroke_map[mode]
 
@@ -303,8 +319,62 @@ class PSGC(basecore2d.GraphicsContextBase):
                 r,g,b,a = self.state.line_color
                 self.contents.write('%1.3f %1.3f %1.3f setrgbcolor\n' % (r,g,b) )
             self.contents.write(first_pass + '\n')
-        if self.state.clipping_path:
-            self.contents.write('cliprestore\n')
+        self._end_shape()
+
+    def device_draw_line_set(self, segments, mode):
+        if 'stroke' not in fill_stroke_map[mode]:
+            # The lines have no area to fill.
+            return
+        self._begin_shape()
+        # All the lines go into a single path, stroked once.
+        self.contents.write('newpath\n')
+        # With relative paths, each move is from the end of the previous
+        # line.
+        coords = format_points(segments.reshape(-1, 2), self.precision, ' ',
+                               '\n', relative=self.relative_paths)
+        coords = coords.splitlines()
+        if self.relative_paths:
+            template = '    %s rmoveto %s rlineto\n'
+        else:
+            template = '    %s moveto %s lineto\n'
+        lines = ''.join([template % pair
+                         for pair in zip(coords[::2], coords[1::2])])
+        if self.relative_paths:
+            lines = lines.replace(' rmoveto ', ' moveto ', 1)
+        self.contents.write(lines)
+        r,g,b,a = self.state.line_color
+        self.contents.write('%1.3f %1.3f %1.3f setrgbcolor\n' % (r,g,b) )
+        self.contents.write('stroke\n')
+        self._end_shape()
+
+    def device_draw_rects(self, rects, mode):
+        if mode in (EOF_FILL, EOF_FILL_STROKE):
+            # rectfill always uses the nonzero rule; keep the even-odd rule
+            # by drawing the rectangles as subpaths.
+            super(PSGC, self).device_draw_rects(rects, mode)
+            return
+        # rectfill and rectstroke take all the rectangles as one array.
+        # They are given the same orientation, so the nonzero rule fills
+        # each of them even where they overlap.
+        x, y, width, height = rects.T
+        rects = column_stack((x + where(width < 0, width, 0),
+                              y + where(height < 0, height, 0),
+                              abs(width), abs(height)))
+        self._begin_shape()
+        coords = format_points(rects.reshape(-1, 2), self.precision, ' ',
+                               '\n').splitlines()
+        rect_array = '[\n' + ''.join(['    %s %s\n' % pair for pair in
+                                       zip(coords[::2], coords[1::2])]) + ']'
+        for op in fill_stroke_map[mode]:
+            if op is None:
+                continue
+            if op == 'stroke':
+                r,g,b,a = self.state.line_color
+            else:
+                r,g,b,a = self.state.fill_color
+            self.contents.write('%1.3f %1.3f %1.3f setrgbcolor\n' % (r,g,b) )
+            self.contents.write('%s rect%s\n' % (rect_array, op))
+        self._end_shape()
 
     def device_stroke_points(self, points, mode):
         # handled by device_fill_points
@@ -318,6 +388,24 @@ class PSGC(basecore2d.GraphicsContextBase):
 
     # utility routines
 
+    def _begin_shape(self):
+        """ Writes the clipping and line state for the next shape. """
+        if self.state.clipping_path:
+            self.contents.write('clipsave\n')
+            self.contents.write('%3.3f %3.3f %3.3f %3.3f rectclip\n' % self.state.clipping_path)
+        linecap = line_cap_map[self.state.line_cap]
+        linejoin = line_join_map[self.state.line_join]
+        dasharray = self._dasharray()
+        if dasharray:
+            self.contents.write('%s 0 setdash\n' % dasharray)
+        self.contents.write('%3.3f setlinewidth\n' % self.state.line_width)
+        self.contents.write('%d setlinecap\n' % linecap)
+        self.contents.write('%d setlinejoin\n' % linejoin)
+
+    def _end_shape(self):
+        if self.state.clipping_path:
+            self.contents.write('cliprestore\n')
+
     def _color(self, color):
         r,g,b,a = color
         return '#%02x%02x%02x' % (r*255,g*255,b*255)
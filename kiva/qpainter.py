@@ -447,8 +447,12 @@ class GraphicsContext(object):
         """
         # Create a region which is a union of all rects.
         clip_region = QtGui.QRegion()
-        for rect in rects:
-            clip_region = clip_region.unite(QtGui.QRegion(*rect))
+        for x, y, w, h in rects:
+            # QRegion takes integer bounds; cover the whole rect.
+            x0, y0 = int(np.floor(x)), int(np.floor(y))
+            x1, y1 = int(np.ceil(x + w)), int(np.ceil(y + h))
+            clip_region = clip_region.unite(
+                QtGui.QRegion(x0, y0, x1 - x0, y1 - y0))
 
         # Then intersect that region with the current clip region.
         self.gc.setClipRegion(clip_region, operation=QtCore.Qt.IntersectClip)
@@ -696,6 +700,12 @@ class GraphicsContext(object):
         """
         self.show_text(text, (x, y))
 
+    def show_text_at_points(self, strings, points, align="left"):
+        """ Draw each string at the corresponding point.
+        """
+        AbstractGraphicsContext.show_text_at_points(self, strings, points,
+                                                    align)
+
     def show_glyphs(self):
         """
         """
@@ -717,6 +727,11 @@ class GraphicsContext(object):
 
         return x2, y2, y1, x1
 
+    def get_text_extents(self, strings):
+        """ Returns the extents of strings as an Nx4 array.
+        """
+        return AbstractGraphicsContext.get_text_extents(self, strings)
+
     # ----------------------------------------------------------------
     # Painting paths (drawing and filling contours)
     # ----------------------------------------------------------------
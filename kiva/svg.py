@@ -38,22 +38,24 @@ Miscellaneous notes:
 import os
 import sys
 from cStringIO import StringIO
-from numpy import arange, ravel, array
+from numpy import arange, ravel, array, column_stack, ceil, cos, sin, pi, \
+    flatnonzero, in1d, where, zeros
 import warnings
 
 # Local, relative Kiva imports
 import affine
 import basecore2d
+from basecore2d import CURVE_OPS
 import constants
 from constants import FILL, FILL_STROKE, EOF_FILL_STROKE, EOF_FILL, STROKE
-import agg
+from constants import CLOSE, CUBIC_SEGMENT, QUAD_SEGMENT, ARC_SEGMENT
 from base64 import b64encode
+from point_formatting import format_points
+from image_cache import ImageCache, image_pixels, pil_image
+from text_extents import afm_text_extents, default_cache
 
-def _strpoints(points):
-    c = StringIO()
-    for x,y in points:
-        c.write('%3.2f,%3.2f ' % (x,y))
-    return c.getvalue()
+def _strpoints(points, precision=2):
+    return format_points(points, precision)
 
 def _mkstyle(kw):
     return '; '.join([str(k) + ':' + str(v) for k,v in kw.items()])
@@ -118,6 +120,9 @@ htmltemplate = """<html xmlns:svg="http://www.w3.org/2000/svg"
 </html>
 """
 
+# The document template split around its contents, for streaming output.
+xmlheader, xmlfooter = xmltemplate.split('%(contents)s\n')
+
 font_map = {'Arial': 'Helvetica',
             }
 try:
@@ -138,22 +143,89 @@ class CompiledPath(object):
 
 _clip_counter = 0
 class GraphicsContext(basecore2d.GraphicsContextBase):
+    """ A graphics context which writes SVG.
+
+    By default the drawing is collected in memory and written out by
+    `save` or `render`.  If a file-like object or a filename is passed as
+    the `stream` keyword argument, the document header is written to it
+    right away, every element is written as soon as it is drawn and `close`
+    finishes the document.  Memory use then does not grow with the size
+    of the drawing.
+
+    If `compact` is True, the output is made smaller by writing each
+    distinct style once, as a class in a <style> element, and by moving the
+    transform shared by consecutive elements into a <g> element around them.
+
+    Point coordinates are written with `precision` digits after the decimal
+    point (2 by default).  If `relative_paths` is True, polylines and
+    polygons are written as <path> elements whose points, after the first,
+    are offsets from the previous point, which is shorter for long paths of
+    nearby points.
+    """
 
     def __init__(self, size, *args, **kwargs):
+        stream = kwargs.pop('stream', None)
+        self._compact = kwargs.pop('compact', False)
+        self.precision = kwargs.pop('precision', 2)
+        self.relative_paths = kwargs.pop('relative_paths', False)
         super(GraphicsContext, self).__init__(self, size, *args, **kwargs)
         self.size = size
         self._height = size[1]
-        self.contents = StringIO()
         self._clipmap = {}
+        self._style_classes = {}
+        self._group_transform = None
+        self._images = ImageCache()
+        self._owns_stream = False
+        if stream is None:
+            self.contents = StringIO()
+            self._prefix = 'svg:'
+            self._streaming = False
+        else:
+            if isinstance(stream, basestring):
+                stream = open(stream, 'w')
+                self._owns_stream = True
+            self.contents = stream
+            # The elements are written into the final document, which uses
+            # the default namespace.
+            self._prefix = ''
+            self._streaming = True
+            self._emitted = False
+            width, height = size
+            self.contents.write(xmlheader % locals())
 
     def render(self, format):
         assert format == 'svg'
+        self._check_not_streaming()
         height, width = self.size
-        contents = self.contents.getvalue().replace("<svg:", "<").replace("</svg:", "</")
+        contents = self._contents().replace("<svg:", "<").replace("</svg:", "</")
         return xmltemplate % locals()
 
     def clear(self):
+        if self._streaming:
+            if self._emitted:
+                raise RuntimeError("A streaming SVG context can't be cleared "
+                                   "once drawing has started.")
+            return
         self.contents = StringIO()
+        self._style_classes = {}
+        self._group_transform = None
+        self._images.clear()
+
+    def close(self):
+        """ Finishes the document of a streaming context.
+
+        If the context opened the stream from a filename, the file is
+        closed too.  Does nothing for a context which isn't streaming.
+        """
+        if not self._streaming or self.contents is None:
+            return
+        # CSS rules apply to the whole document, wherever the <style>
+        # element is, so the classes can be written out last.
+        self.contents.write(self._close_group() + self._style_element())
+        self.contents.write(xmlfooter)
+        if self._owns_stream:
+            self.contents.close()
+        self.contents = None
 
     def width(self):
         return self.size[0]
@@ -162,15 +234,16 @@ class GraphicsContext(basecore2d.GraphicsContextBase):
         return self.size[1]
 
     def save(self, filename):
+        self._check_not_streaming()
         f = open(filename, 'w')
         ext = os.path.splitext(filename)[1]
         if ext == '.svg':
             template = xmltemplate
             width, height = self.size
-            contents = self.contents.getvalue().replace("<svg:", "<").replace("</svg:", "</")
+            contents = self._contents().replace("<svg:", "<").replace("</svg:", "</")
         elif ext == '.html':
             width, height = self.size[0]*3, self.size[1]*3
-            contents = self.contents.getvalue()
+            contents = self._contents()
             template = htmltemplate
         else:
             raise ValueError, "don't know how to write a %s file" % ext
@@ -207,6 +280,19 @@ class GraphicsContext(basecore2d.GraphicsContextBase):
         width = pdfmetrics.stringWidth(text, self.face_name, self.font_size)
         return width, height, descent, height*1.2 # assume leading of 1.2*height
 
+    def get_text_extent(self, text):
+        width, height, descent, leading = self.get_full_text_extent(text)
+        return 0.0, -descent, width, height
+
+    def get_text_extents(self, strings):
+        """ Returns the (x, y, w, h) extent of each string, as returned by
+        get_text_extent(), in the rows of an Nx4 array.
+        """
+        face_name, font_size = self.face_name, self.font_size
+        return default_cache.get_extents(
+            ('afm', face_name, font_size), strings,
+            lambda strings: afm_text_extents(strings, face_name, font_size))
+
     def device_draw_image(self, img, rect):
         """
         draw_image(img_gc, rect=(x,y,w,h))
@@ -223,49 +309,38 @@ class GraphicsContext(basecore2d.GraphicsContextBase):
         """
         from PIL import Image as PilImage
 
-        # We turn img into a PIL object, since that is what ReportLab
-        # requires.  To do this, we first determine if the input image
-        # GC needs to be converted to RGBA/RGB.  If so, we see if we can
-        # do it nicely (using convert_pixel_format), and if not, we do
-        # it brute-force using Agg.
-
-
-        if type(img) == type(array([])):
-            # Numeric array
-            converted_img = agg.GraphicsContextArray(img, pix_format='rgba32')
-            format = 'RGBA'
-        elif isinstance(img, agg.GraphicsContextArray):
-            if img.format().startswith('RGBA'):
-                format = 'RGBA'
-            elif img.format().startswith('RGB'):
-                format = 'RGB'
-            else:
-                converted_img = img.convert_pixel_format('rgba32', inplace=0)
-                format = 'RGBA'
-            # Should probably take this into account
-            # interp = img.get_image_interpolation()
-        else:
+        pixels, format = image_pixels(img)
+        if pixels is None:
             warnings.warn("Cannot render image of type %r into SVG context."
                           % type(img))
             return
-
-        # converted_img now holds an Agg graphics context with the image
-        pil_img = PilImage.fromstring(format,
-                                      (converted_img.width(),
-                                       converted_img.height()),
-                                      converted_img.bmp_array.tostring())
+        img_height, img_width = pixels.shape[:2]
         if rect == None:
-            rect = (0, 0, img.width(), img.height())
-
+            rect = (0, 0, img_width, img_height)
         left, top, width, height = rect
-        if width != img.width() or height != img.height():
-            # This is not strictly required.
-            pil_img = pil_img.resize((int(width), int(height)), PilImage.NEAREST)
 
-        png_buffer = StringIO()
-        pil_img.save(png_buffer, 'png')
-        b64_img_data = b64encode(png_buffer.getvalue())
-        png_buffer.close()
+        # Each image is embedded once, in a <defs> element, and referenced by
+        # a <use> element wherever it is drawn.
+        key = self._images.key(pixels, format, width, height)
+        image_id = self._images.get(key)
+        if image_id is None:
+            pil_img = pil_image(pixels, format)
+            if width != img_width or height != img_height:
+                # This is not strictly required.
+                pil_img = pil_img.resize((int(width), int(height)),
+                                         PilImage.NEAREST)
+            png_buffer = StringIO()
+            pil_img.save(png_buffer, 'png')
+            image_data = 'data:image/png;base64,' + \
+                b64encode(png_buffer.getvalue())
+            png_buffer.close()
+            image_id = 'image_%d' % len(self._images)
+            self._images.add(key, image_id)
+            image = self._build(self._prefix + 'image', id=image_id,
+                                width=str(width), height=str(height),
+                                preserveAspectRatio='none',
+                                **{'xlink:href': image_data})
+            self._emit('defs', contents=image)
 
         # Draw the actual image.
         m = self.get_ctm()
@@ -274,65 +349,103 @@ class GraphicsContext(basecore2d.GraphicsContextBase):
         m = affine.translate(m, left, height + top)
         transform = 'matrix(%f,%f,%f,%f,%f,%f) scale(1,-1)' % affine.affine_params(m)
         # Flip y to reverse the flip at the start of the document.
-        image_data = 'data:image/png;base64,' + b64_img_data
-        self._emit('image', transform=transform,
-                   width=str(width), height=str(height),
-                   preserveAspectRatio='none',
-                   kw={ 'xlink:href': image_data })
+        self._emit('use', transform=transform,
+                   kw={'xlink:href': '#' + image_id})
 
     def device_fill_points(self, points, mode):
         points = self._fixpoints(points)
-        if mode in (FILL, FILL_STROKE, EOF_FILL_STROKE):
-            fill = self._color(self.state.fill_color)
-        else:
-            fill = 'none'
-        if mode in (STROKE, FILL_STROKE, EOF_FILL_STROKE):
-            stroke = self._color(self.state.line_color)
-        else:
-            stroke = 'none'
-        if mode in (EOF_FILL_STROKE, EOF_FILL):
-            rule = 'evenodd'
-        else:
-            rule = 'nonzero'
-        linecap = line_cap_map[self.state.line_cap]
-        linejoin = line_join_map[self.state.line_join]
-        dasharray = self._dasharray()
-        width = '%3.3f' % self.state.line_width
-        clip_id = getattr(self.state, '_clip_id', None)
-        if clip_id:
-            clip = 'url(#' + clip_id +')'
-        else:
-            clip = None
-        a,b,c,d,tx,ty = affine.affine_params(self.get_ctm())
-        transform = 'matrix(%(a)f,%(b)f,%(c)f,%(d)f,%(tx)f,%(ty)f)' % locals()
-        if mode == STROKE:
-            opacity = '%1.3f' % self.state.line_color[-1]
+        if self.relative_paths:
+            # The first point is absolute, the others are offsets.
+            d = format_points(points, self.precision, relative=True)
+            first, _, rest = d.partition(' ')
+            d = 'M' + first + ' '
+            if rest:
+                d += 'l' + rest
+            if mode != STROKE:
+                d += 'Z'
+            self._emit('path',
+                        transform=self._transform(),
+                        d=d,
+                        kw=self._clip_kw(),
+                        style=self._style(mode))
+        elif mode == STROKE:
             self._emit('polyline',
-                        transform=transform,
-                        points=_strpoints(points),
-                        kw=default_filter({'clip-path': (clip, None)}),
-                        style=_mkstyle(default_filter({'opacity': (opacity, "1.000"),
-                                        'stroke': stroke,
-                                        'fill': 'none',
-                                        'stroke-width': (width, "1.000"),
-                                        'stroke-linejoin': (linejoin, 'miter'),
-                                        'stroke-linecap': (linecap, 'butt'),
-                                        'stroke-dasharray': (dasharray, 'none')})))
-
+                        transform=self._transform(),
+                        points=_strpoints(points, self.precision),
+                        kw=self._clip_kw(),
+                        style=self._style(mode))
         else:
-            opacity = '%1.3f' % self.state.fill_color[-1]
             self._emit('polygon',
-                        transform=transform,
-                        points=_strpoints(points),
-                        kw=default_filter({'clip-path': (clip, None)}),
-                        style=_mkstyle(default_filter({'opacity': (opacity, "1.000"),
-                                        'stroke-width': (width, "1.000"),
-                                        'fill': fill,
-                                        'fill-rule': rule,
-                                        'stroke': stroke,
-                                        'stroke-linejoin': (linejoin, 'miter'),
-                                        'stroke-linecap': (linecap, 'butt'),
-                                        'stroke-dasharray': (dasharray, 'none')})))
+                        transform=self._transform(),
+                        points=_strpoints(points, self.precision),
+                        kw=self._clip_kw(),
+                        style=self._style(mode))
+
+    def device_draw_subpaths(self, subpaths, mode):
+        # All the subpaths go into the data of a single path element, with
+        # the curves written as curve commands.
+        d = ''.join([self._subpath_data(ops, points, curve_args, mode)
+                     for ops, points, curve_args in subpaths])
+        if not d:
+            return
+        self._emit('path',
+                   transform=self._transform(),
+                   d=d.rstrip(),
+                   kw=self._clip_kw(),
+                   style=self._style(mode))
+
+    def device_draw_line_set(self, segments, mode):
+        if mode not in (STROKE, FILL_STROKE, EOF_FILL_STROKE):
+            # The lines have no area to fill.
+            return
+        # All the lines go into the data of a single path element.  With
+        # relative paths, each move is from the end of the previous line.
+        coords = format_points(segments.reshape(-1, 2), self.precision,
+                               relative=self.relative_paths).split()
+        if self.relative_paths:
+            template = 'm%s l%s '
+        else:
+            template = 'M%s L%s '
+        d = ''.join([template % pair
+                     for pair in zip(coords[::2], coords[1::2])])
+        if self.relative_paths:
+            d = 'M' + d[1:]
+        self._emit('path',
+                   transform=self._transform(),
+                   d=d,
+                   kw=self._clip_kw(),
+                   style=self._style(STROKE))
+
+    def device_draw_rects(self, rects, mode):
+        # All the rectangles go into the data of a single path element.
+        # They are given the same orientation, so the nonzero rule fills
+        # each of them even where they overlap.
+        if mode == EOF_FILL:
+            mode = FILL
+        elif mode == EOF_FILL_STROKE:
+            mode = FILL_STROKE
+        x, y, width, height = rects.T
+        x = x + where(width < 0, width, 0)
+        y = y + where(height < 0, height, 0)
+        width = abs(width)
+        height = abs(height)
+        zero = zeros(len(rects))
+        starts = format_points(column_stack((x, y)), self.precision).split()
+        if self.relative_paths:
+            template = 'M%s l%s %s %s Z '
+            sides = column_stack((width, zero, zero, height, -width, zero))
+        else:
+            template = 'M%s L%s %s %s Z '
+            sides = column_stack((x + width, y, x + width, y + height,
+                                  x, y + height))
+        sides = format_points(sides.reshape(-1, 2), self.precision).split()
+        d = ''.join([template % ((start,) + tuple(sides[3*i:3*i+3]))
+                     for i, start in enumerate(starts)])
+        self._emit('path',
+                   transform=self._transform(),
+                   d=d,
+                   kw=self._clip_kw(),
+                   style=self._style(mode))
 
     def device_stroke_points(self, points, mode):
         # handled by device_fill_points
@@ -385,6 +498,115 @@ class GraphicsContext(basecore2d.GraphicsContextBase):
 
     # utility routines
 
+    def _transform(self):
+        a,b,c,d,tx,ty = affine.affine_params(self.get_ctm())
+        return 'matrix(%(a)f,%(b)f,%(c)f,%(d)f,%(tx)f,%(ty)f)' % locals()
+
+    def _clip_kw(self):
+        clip_id = getattr(self.state, '_clip_id', None)
+        if clip_id:
+            clip = 'url(#' + clip_id +')'
+        else:
+            clip = None
+        return default_filter({'clip-path': (clip, None)})
+
+    def _style(self, mode):
+        if mode in (FILL, EOF_FILL, FILL_STROKE, EOF_FILL_STROKE):
+            fill = self._color(self.state.fill_color)
+        else:
+            fill = 'none'
+        if mode in (STROKE, FILL_STROKE, EOF_FILL_STROKE):
+            stroke = self._color(self.state.line_color)
+        else:
+            stroke = 'none'
+        if mode in (EOF_FILL_STROKE, EOF_FILL):
+            rule = 'evenodd'
+        else:
+            rule = 'nonzero'
+        linecap = line_cap_map[self.state.line_cap]
+        linejoin = line_join_map[self.state.line_join]
+        dasharray = self._dasharray()
+        width = '%3.3f' % self.state.line_width
+        if mode == STROKE:
+            opacity = '%1.3f' % self.state.line_color[-1]
+            return _mkstyle(default_filter({'opacity': (opacity, "1.000"),
+                                        'stroke': stroke,
+                                        'fill': 'none',
+                                        'stroke-width': (width, "1.000"),
+                                        'stroke-linejoin': (linejoin, 'miter'),
+                                        'stroke-linecap': (linecap, 'butt'),
+                                        'stroke-dasharray': (dasharray, 'none')}))
+        else:
+            opacity = '%1.3f' % self.state.fill_color[-1]
+            return _mkstyle(default_filter({'opacity': (opacity, "1.000"),
+                                        'stroke-width': (width, "1.000"),
+                                        'fill': fill,
+                                        'fill-rule': rule,
+                                        'stroke': stroke,
+                                        'stroke-linejoin': (linejoin, 'miter'),
+                                        'stroke-linecap': (linecap, 'butt'),
+                                        'stroke-dasharray': (dasharray, 'none')}))
+
+    def _subpath_data(self, ops, points, curve_args, mode):
+        """ Returns the path data for a subpath.
+        """
+        if len(points) < 2 and not curve_args:
+            return ''
+        # A filled subpath is closed like a polygon.
+        closed = mode != STROKE
+        if ops[-1] == CLOSE:
+            closed = True
+            ops = ops[:-1]
+            points = points[:-1]
+        if ops[0] in (CUBIC_SEGMENT, QUAD_SEGMENT):
+            # The subpath starts at the current point of the curve.
+            start = curve_args[0][:2]
+            last = 0
+        else:
+            start = points[0]
+            last = 1
+        d = ['M', format_points([start], self.precision)]
+        curves = flatnonzero(in1d(ops, CURVE_OPS)).tolist()
+        for i, args in zip(curves + [len(ops)], curve_args + [None]):
+            if i > last:
+                d.append(self._lines_data(points[last-1:i]))
+            if args is not None:
+                d.append(self._curve_data(ops[i], args))
+            last = i + 1
+        if closed:
+            d.append('Z ')
+        return ''.join(d)
+
+    def _lines_data(self, points):
+        """ Returns the path data for lines through `points`, starting at
+        the current point, which is the first of them.
+        """
+        if self.relative_paths:
+            lines = format_points(points, self.precision, relative=True)
+            return 'l' + lines.split(' ', 1)[1]
+        return 'L' + format_points(points[1:], self.precision)
+
+    def _curve_data(self, op, args):
+        """ Returns the path data for a curve path entry.
+        """
+        if op == CUBIC_SEGMENT:
+            return 'C' + format_points(array(args[2:]).reshape(3, 2),
+                                       self.precision)
+        if op == QUAD_SEGMENT:
+            return 'Q' + format_points(array(args[2:]).reshape(2, 2),
+                                       self.precision)
+        # An arc command can't draw a whole circle, so the arc is split into
+        # pieces of at most half a circle.
+        x, y, radius, start_angle, end_angle = args
+        sweep = int(end_angle > start_angle)
+        n = max(int(ceil(abs(end_angle - start_angle) / pi)), 1)
+        theta = start_angle + (end_angle - start_angle) * arange(1, n+1) / n
+        ends = column_stack((x + radius * cos(theta), y + radius * sin(theta)))
+        radii = format_points([(radius, radius)], self.precision)
+        return ''.join(['A%s0 0,%d %s ' % (radii, sweep, end)
+                        for end in format_points(ends, self.precision,
+                                                 terminator='\n').split()])
+
     def _fixpoints(self, points):
         return points
         # convert lines from Kiva coordinate space to PIL coordinate space
@@ -396,8 +618,62 @@ class GraphicsContext(basecore2d.GraphicsContextBase):
             np.append((x,self._height-y))
         return np
 
+    def _check_not_streaming(self):
+        if self._streaming:
+            raise RuntimeError("A streaming SVG context writes its document "
+                               "as it goes; use close() to finish it.")
+
+    def _contents(self):
+        """ The drawing collected by a buffered context, with the shared
+        styles and the currently open transform group completed.
+        """
+        return (self._style_element() + self.contents.getvalue() +
+                self._close_group())
+
+    def _style_element(self):
+        if not self._style_classes:
+            return ''
+        rules = sorted('.%s {%s}\n' % (name, style)
+                       for style, name in self._style_classes.items())
+        prefix = self._prefix
+        return ('<%(prefix)sstyle type="text/css"><![CDATA[\n' % locals() +
+                ''.join(rules) + ']]></%(prefix)sstyle>\n' % locals())
+
+    def _close_group(self):
+        if self._group_transform is None:
+            return ''
+        return '</%sg>\n' % self._prefix
+
+    def _compact_attributes(self, otherkw):
+        """ Replaces the style and transform attributes of an element by a
+        shared class and an enclosing group.
+        """
+        otherkw = dict(otherkw)
+        transform = otherkw.pop('transform', None)
+        if transform != self._group_transform:
+            self.contents.write(self._close_group())
+            if transform is not None:
+                self.contents.write('<%sg transform="%s">\n'
+                                    % (self._prefix, transform))
+            self._group_transform = transform
+        style = otherkw.pop('style', None)
+        if style is not None:
+            name = self._style_classes.get(style)
+            if name is None:
+                name = 's%d' % len(self._style_classes)
+                self._style_classes[style] = name
+            otherkw['class'] = name
+        return otherkw
+
     def _emit(self, name, contents=None, kw={}, **otherkw):
-        self.contents.write('<svg:%(name)s ' % locals())
+        if self._streaming:
+            if self.contents is None:
+                raise RuntimeError("The SVG context has been closed.")
+            self._emitted = True
+        if self._compact:
+            otherkw = self._compact_attributes(otherkw)
+        prefix = self._prefix
+        self.contents.write('<%(prefix)s%(name)s ' % locals())
         for k, v in kw.items():
             self.contents.write('%(k)s="%(v)s" ' % locals())
         for k, v in otherkw.items():
@@ -409,7 +685,7 @@ class GraphicsContext(basecore2d.GraphicsContextBase):
             if name != 'text':
                 self.contents.write('\n')
             self.contents.write(contents)
-            self.contents.write('</svg:'+name+'>\n')
+            self.contents.write('</'+prefix+name+'>\n')
 
     def _color(self, color):
         r,g,b,a = color
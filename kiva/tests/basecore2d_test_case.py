@@ -12,7 +12,7 @@ from __future__ import with_statement
 
 import unittest
 
-from numpy import alltrue, array, ravel
+from numpy import alltrue, array, pi, ravel
 
 from kiva import affine
 from kiva import basecore2d
@@ -434,6 +434,24 @@ class GraphicsContextTestCase(unittest.TestCase):
     # Test drawing path empty
     #-------------------------------------------------------------------------
 
+    def test_clip_to_rects(self):
+        class ClippingContext(basecore2d.GraphicsContextBase):
+            def device_set_clipping_path(self, x, y, width, height):
+                pass
+        gc = ClippingContext()
+        # The base class clips to the bounding box of the rectangles.
+        gc.clip_to_rects([(10, 20, 5, 5), (30, 10, 10, 5.5)])
+        self.assertEqual(gc.state.clipping_path, (10, 10, 30, 15))
+
+    def test_current_point_is_a_tuple(self):
+        gc = basecore2d.GraphicsContextBase()
+        gc.lines([(1, 2), (3, 4)])
+        self.assertEqual(gc.state.current_point, (3, 4))
+        self.assert_(isinstance(gc.state.current_point, tuple))
+        gc.line_set([(0, 0)], [(5, 6)])
+        self.assertEqual(gc.state.current_point, (5, 6))
+        self.assert_(isinstance(gc.state.current_point, tuple))
+
     def test_is_path_empty1(self):
         """ A graphics context should start with an empty path.
         """
@@ -481,6 +499,166 @@ class GraphicsContextTestCase(unittest.TestCase):
         """
         pass
 
+    def test_path_buffer_grows(self):
+        gc = basecore2d.GraphicsContextBase()
+        gc.move_to(0., 0.)
+        for i in range(1000):
+            gc.line_to(i, 2*i)
+        self.assertEqual(len(gc.path), 1001)
+        self.assertEqual(gc.path.ops[0], constants.POINT)
+        self.assert_(alltrue(gc.path.ops[1:] == constants.LINE))
+        self.assert_(alltrue(gc.path.vertices[-1] == array([999., 1998.])))
+
+    def test_line_set(self):
+        gc = basecore2d.GraphicsContextBase()
+        starts = array([[0., 0.], [1., 1.], [2., 2.]])
+        ends = array([[0., 1.], [1., 2.], [2., 3.]])
+        gc.line_set(starts, ends)
+        self.assert_(alltrue(gc.path.ops == [constants.LINE_SET]))
+        segments = gc.path.args[0]
+        self.assert_(alltrue(segments[:, :2] == starts))
+        self.assert_(alltrue(segments[:, 2:] == ends))
+        self.assert_(not gc.is_path_empty())
+
+    def test_rect(self):
+        gc = basecore2d.GraphicsContextBase()
+        gc.rect(5., 5., 3., 4.)
+        ops = [constants.POINT] + [constants.LINE] * 3 + [constants.CLOSE]
+        self.assert_(alltrue(gc.path.ops == ops))
+        # The CLOSE entry refers back to the start of its subpath.
+        self.assert_(alltrue(gc.path.vertices[2] == array([8., 9.])))
+        self.assert_(alltrue(gc.path.vertices[4] == array([5., 5.])))
+
+    def test_rects(self):
+        gc = basecore2d.GraphicsContextBase()
+        rects = [(0., 0., 1., 2.), (5., 5., 3., 4.)]
+        gc.rects(rects)
+        self.assert_(alltrue(gc.path.ops == [constants.RECT_SET]))
+        self.assert_(alltrue(gc.path.args[0] == array(rects)))
+
+    def test_begin_path_keeps_transforms(self):
+        gc = basecore2d.GraphicsContextBase()
+        gc.move_to(1., 2.)
+        gc.line_to(3., 4.)
+        gc.translate_ctm(2., 3.)
+        gc.begin_path()
+        self.assertEqual(len(gc.path), 1)
+        self.assertEqual(gc.path.ops[0], constants.TRANSLATE_CTM)
+        self.assertEqual(gc.path.args[0], (2., 3.))
+        self.assert_(gc.is_path_empty())
+
+
+class RecordingGraphicsContext(basecore2d.GraphicsContextBase):
+    """ Records the calls draw_path makes to the device methods. """
+
+    def __init__(self, *args, **kwargs):
+        super(RecordingGraphicsContext, self).__init__(*args, **kwargs)
+        self.filled = []
+        self.transforms = []
+
+    def device_update_line_state(self):
+        pass
+
+    def device_update_fill_state(self):
+        pass
+
+    def device_fill_points(self, points, mode):
+        self.filled.append(points.copy())
+
+    def device_stroke_points(self, points, mode):
+        pass
+
+    def device_transform_device_ctm(self, func, args):
+        self.transforms.append(func)
+        super(RecordingGraphicsContext, self).device_transform_device_ctm(
+            func, args)
+
+
+class DrawPathTestCase(unittest.TestCase):
+
+    def test_one_call_per_subpath(self):
+        gc = RecordingGraphicsContext()
+        gc.move_to(0., 0.)
+        for i in range(1, 100):
+            gc.line_to(i, i)
+        gc.move_to(5., 5.)
+        gc.line_to(6., 5.)
+        gc.line_to(6., 6.)
+        gc.close_path()
+        gc.draw_path(constants.STROKE)
+        self.assertEqual(len(gc.filled), 2)
+        self.assertEqual(gc.filled[0].shape, (100, 2))
+        self.assert_(alltrue(gc.filled[1] ==
+                             array([[5., 5.], [6., 5.], [6., 6.], [5., 5.]])))
+        self.assert_(gc.is_path_empty())
+
+    def test_transforms_are_composed(self):
+        gc = RecordingGraphicsContext()
+        gc.move_to(0., 0.)
+        gc.translate_ctm(1., 2.)
+        gc.scale_ctm(2., 2.)
+        gc.line_to(1., 1.)
+        gc.draw_path(constants.STROKE)
+        # The CTM entries are left out of the points and applied together.
+        self.assert_(alltrue(gc.filled[0] == array([[0., 0.], [1., 1.]])))
+        self.assertEqual(gc.transforms, [constants.CONCAT_CTM])
+        desired = affine.scale(affine.translate(affine.affine_identity(),
+                                                1., 2.), 2., 2.)
+        self.assert_(alltrue(ravel(gc.device_ctm == desired)))
+
+    def test_line_set_fallback(self):
+        gc = RecordingGraphicsContext()
+        gc.move_to(0., 0.)
+        gc.line_to(1., 0.)
+        gc.line_set([[0., 0.], [1., 1.]], [[2., 2.], [3., 3.]])
+        gc.draw_path(constants.STROKE)
+        self.assertEqual(len(gc.filled), 3)
+        self.assert_(alltrue(gc.filled[2] == array([[1., 1.], [3., 3.]])))
+
+    def test_rects_fallback(self):
+        gc = RecordingGraphicsContext()
+        gc.rects([(0., 0., 1., 2.), (5., 5., 3., 4.)])
+        gc.draw_path(constants.FILL)
+        self.assertEqual(len(gc.filled), 2)
+        self.assert_(alltrue(gc.filled[1] == array([[5., 5.], [5., 9.],
+                                                    [8., 9.], [8., 5.],
+                                                    [5., 5.]])))
+
+    def test_curves_are_flattened(self):
+        gc = RecordingGraphicsContext()
+        gc.move_to(0., 0.)
+        gc.curve_to(1., 0., 2., 1., 2., 2.)
+        gc.quad_curve_to(3., 3., 4., 2.)
+        gc.arc(0., 0., 1., 0., pi / 2)
+        # Each curve is a single path entry.
+        self.assertEqual(len(gc.path), 5)
+        gc.draw_path(constants.STROKE)
+        self.assertEqual(len(gc.filled), 1)
+        pts = gc.filled[0]
+        self.assertEqual(len(pts), 1 + 3 * basecore2d.CURVE_STEPS)
+        self.assert_(alltrue(pts[basecore2d.CURVE_STEPS] == array([2., 2.])))
+        self.assertAlmostEqual(pts[-1, 0], 0.)
+        self.assertAlmostEqual(pts[-1, 1], 1.)
+
+    def test_subpaths_drawn_together(self):
+        gc = RecordingGraphicsContext()
+        calls = []
+        gc.device_draw_subpaths = lambda subpaths, mode: calls.append(
+            len(subpaths))
+        gc.rect(0., 0., 1., 1.)
+        gc.rect(2., 2., 1., 1.)
+        gc.translate_ctm(1., 1.)
+        gc.rect(4., 4., 1., 1.)
+        gc.draw_path(constants.FILL)
+        # A change of the transform splits the subpaths.
+        self.assertEqual(calls, [2, 1])
+
+    def test_unknown_entry(self):
+        gc = RecordingGraphicsContext()
+        gc.move_to(0., 0.)
+        gc.path.append(100, 1., 1.)
+        self.assertRaises(ValueError, gc.draw_path, constants.STROKE)
+
 
 ##################################################
 
@@ -51,6 +51,21 @@ class DrawingTester(object):
             self.gc.rect(0, 0, 200, 200)
             self.gc.stroke_path()
 
+    def test_line_set(self):
+        with self.draw_and_check():
+            self.gc.begin_path()
+            starts = numpy.array([[107, 104], [157, 104], [207, 104]])
+            ends = numpy.array([[107, 204], [157, 204], [207, 204]])
+            self.gc.line_set(starts, ends)
+            self.gc.stroke_path()
+
+    def test_rects(self):
+        with self.draw_and_check():
+            self.gc.begin_path()
+            self.gc.rects([(20, 20, 50, 100), (120, 20, 50, 150),
+                           (220, 20, 50, 200)])
+            self.gc.fill_path()
+
     def test_circle(self):
         with self.draw_and_check():
             self.gc.begin_path()
@@ -71,6 +86,14 @@ class DrawingTester(object):
             self.gc.set_text_position(23, 67)
             self.gc.show_text("hello kiva")
 
+    def test_text_at_points(self):
+        with self.draw_and_check():
+            font = Font(family=MODERN)
+            font.size = 24
+            self.gc.set_font(font)
+            self.gc.show_text_at_points(["hello kiva"], [(150, 67)],
+                                        align="center")
+
     def test_circle_fill(self):
         with self.draw_and_check():
             self.gc.begin_path()
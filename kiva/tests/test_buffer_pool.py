@@ -0,0 +1,121 @@
+import gc as gc_module
+import weakref
+
+import numpy
+
+from kiva.agg import GraphicsContextArray
+from kiva.buffer_pool import BufferPool, pixel_buffer
+from traits.testing.unittest_tools import unittest
+
+
+class TestBufferPool(unittest.TestCase):
+
+    def test_growing_sizes_reuse_a_buffer(self):
+        pool = BufferPool(growth=1.25)
+        pixels = pool.acquire((100, 80))
+        self.assertEqual(pixels.shape, (80, 100, 4))
+        for size in range(101, 125):
+            self.assertTrue(pool.release(pixels))
+            pixels = pool.acquire((size, 80))
+        self.assertEqual(pixels.shape, (80, 124, 4))
+        self.assertEqual(pool.allocations, 1)
+        self.assertEqual(pool.reuses, 24)
+
+        # Past the over-allocation, there is a new, larger buffer.
+        pool.release(pixels)
+        pixels = pool.acquire((126, 80))
+        self.assertEqual(pool.allocations, 2)
+        self.assertEqual(pixels.base.shape, (100, 158, 4))
+
+    def test_buffers_in_use_are_not_shared(self):
+        pool = BufferPool()
+        first = pool.acquire((10, 10))
+        second = pool.acquire((10, 10))
+        self.assertFalse(first.base is second.base)
+
+    def test_pixel_formats(self):
+        pool = BufferPool()
+        pool.release(pool.acquire((10, 10), 'rgba32'))
+        pixels = pool.acquire((10, 10), 'rgb24')
+        self.assertEqual(pixels.shape, (10, 10, 3))
+        self.assertEqual(pool.reuses, 0)
+
+    def test_large_buffers_are_dropped(self):
+        pool = BufferPool(max_idle=3)
+        pool.release(pool.acquire((1000, 1000)))
+        for i in range(4):
+            pool.release(pool.acquire((10, 10)))
+        self.assertEqual(pool.reuses, 3)
+        # The large buffer was never used for the small requests.
+        self.assertEqual(pool.free_bytes(), 13 * 13 * 4)
+
+    def test_max_free_bytes(self):
+        pool = BufferPool(growth=1.0, max_free_bytes=250 * 4)
+        buffers = [pool.acquire((10, 10)), pool.acquire((20, 10))]
+        for pixels in buffers:
+            pool.release(pixels)
+        self.assertEqual(pool.free_bytes(), 200 * 4)
+
+    def test_release_foreign_array(self):
+        pool = BufferPool()
+        self.assertFalse(pool.release(numpy.zeros((10, 10, 4), numpy.uint8)))
+        self.assertFalse(pool.release_gc(object()))
+
+    def test_gc_draws_into_sub_rectangle(self):
+        pool = BufferPool()
+        pixels = pool.acquire((30, 20), 'rgba32')
+        pixels.base[:] = 7
+        pool.release(pixels)
+        gc = pool.create_gc((30, 20), 'rgba32')
+        self.assertTrue(gc.bmp_array.base is pixels.base)
+        self.assertEqual((gc.width(), gc.height()), (30, 20))
+        self.assertTrue((gc.bmp_array == 255).all())
+        gc.set_fill_color((1.0, 0.0, 0.0, 1.0))
+        gc.rect(0, 0, 30, 20)
+        gc.fill_path()
+        buffer = gc.bmp_array.base
+        self.assertTrue((buffer[:20, :30] == [255, 0, 0, 255]).all())
+        # Nothing is drawn outside of the GC.
+        self.assertTrue((buffer[20:] == 7).all())
+        self.assertTrue((buffer[:, 30:] == 7).all())
+
+        # The GC can be drawn as an image.
+        dest = GraphicsContextArray((30, 20), 'rgba32')
+        dest.draw_image(gc, (0, 0, 30, 20))
+        self.assertTrue((dest.bmp_array == [255, 0, 0, 255]).all())
+
+        self.assertTrue(pool.release_gc(gc))
+
+    def test_dropped_gc_does_not_keep_its_buffer(self):
+        pool = BufferPool()
+        gc = pool.create_gc((30, 20), 'rgba32')
+        buffer = weakref.ref(gc.bmp_array.base)
+        self.assertEqual(pool.in_use_count(), 1)
+        del gc
+        gc_module.collect()
+        self.assertTrue(buffer() is None)
+        self.assertEqual(pool.in_use_count(), 0)
+        self.assertEqual(pool.free_bytes(), 0)
+
+    def test_gc_needs_contiguous_rows(self):
+        pixels = numpy.zeros((10, 20, 4), numpy.uint8)
+        self.assertRaises(ValueError, GraphicsContextArray,
+                          pixels[:, ::2], 'rgba32')
+
+    def test_pixel_buffer(self):
+        pool = BufferPool()
+        pixels = pool.acquire((3, 2), 'rgba32')
+        pixels[:] = numpy.arange(24).reshape((2, 3, 4))
+        buffer = pixel_buffer(pixels)
+        row_size = pixels.strides[0]
+        self.assertEqual(len(buffer), row_size + 12)
+        data = numpy.frombuffer(buffer, numpy.uint8)
+        self.assertEqual(list(data[:12]), range(12))
+        self.assertEqual(list(data[row_size:]), range(12, 24))
+
+        contiguous = numpy.zeros((2, 3, 4), numpy.uint8)
+        self.assertEqual(len(pixel_buffer(contiguous)), 24)
+
+
+if __name__ == "__main__":
+    unittest.main()
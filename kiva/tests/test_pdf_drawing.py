@@ -1,5 +1,7 @@
 import contextlib
 
+import numpy
+
 from kiva.tests.drawing_tester import DrawingTester
 from traits.testing.unittest_tools import unittest
 
@@ -52,6 +54,26 @@ class TestPDFDrawing(DrawingTester, unittest.TestCase):
                 line.endswith('ET') and 'hello kiva' in line)):
             self.fail('Path was not closed')
 
+    def test_image_embedded_once(self):
+        image = numpy.zeros((20, 30, 4), dtype=numpy.uint8)
+        image[..., 0] = image[..., 3] = 255
+        for x in range(3):
+            self.gc.draw_image(image, (10 * x, 10, 30, 20))
+        self.gc.save()
+        with open("{0}.pdf".format(self.filename), 'rb') as handle:
+            self.assertEqual(handle.read().count('/Subtype /Image'), 1)
+
+    def test_reshaped_and_rgb_images(self):
+        image = numpy.zeros((10, 20, 4), dtype=numpy.uint8)
+        image[..., 3] = 255
+        self.gc.draw_image(image, (0, 0, 20, 10))
+        # The same bytes with another shape are another image.
+        self.gc.draw_image(image.reshape((20, 10, 4)), (0, 20, 10, 20))
+        self.gc.draw_image(image[..., :3].copy(), (30, 0, 20, 10))
+        self.gc.save()
+        with open("{0}.pdf".format(self.filename), 'rb') as handle:
+            self.assertEqual(handle.read().count('/Subtype /Image'), 3)
+
 
 if __name__ == "__main__":
     unittest.main()
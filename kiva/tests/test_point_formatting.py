@@ -0,0 +1,48 @@
+import numpy
+
+from kiva.point_formatting import format_points
+from traits.testing.unittest_tools import unittest
+
+
+class TestFormatPoints(unittest.TestCase):
+
+    def test_matches_string_formatting(self):
+        numpy.random.seed(0)
+        # Values which round to zero are covered by test_negative_zero.
+        points = 10 ** numpy.random.uniform(0, 6, (500, 2))
+        points[::3] *= -1
+        for precision in range(4):
+            template = '%%.%df,%%.%df ' % (precision, precision)
+            expected = (template * len(points)) % tuple(points.ravel())
+            self.assertEqual(format_points(points, precision), expected)
+
+    def test_negative_zero(self):
+        self.assertEqual(format_points([(-0.001, -0.0)]), '0.00,0.00 ')
+
+    def test_empty(self):
+        self.assertEqual(format_points(numpy.zeros((0, 2))), '')
+
+    def test_prefix_and_terminator(self):
+        result = format_points([(1, 2.5), (10, -3)], 1, ' ', ' lineto\n',
+                               '  ')
+        self.assertEqual(result, '  1.0 2.5 lineto\n  10.0 -3.0 lineto\n')
+
+    def test_relative(self):
+        points = [(0.004, 0.0), (0.008, 1.0), (0.012, 1.5)]
+        result = format_points(points, 2, relative=True)
+        self.assertEqual(result, '0.00,0.00 0.01,1.00 0.00,0.50 ')
+
+    def test_nan_and_inf(self):
+        points = [(1, numpy.nan), (numpy.inf, -numpy.inf)]
+        self.assertEqual(format_points(points, 1, ' ', '\n'),
+                         '1.0 nan\ninf -inf\n')
+        self.assertEqual(format_points(points, 2, relative=True),
+                         '1.00,nan inf,nan ')
+
+    def test_huge_values(self):
+        points = [(1e20, -2.5)]
+        self.assertEqual(format_points(points, 2), '%.2f,-2.50 ' % 1e20)
+
+
+if __name__ == "__main__":
+    unittest.main()
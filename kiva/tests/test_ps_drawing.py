@@ -29,5 +29,72 @@ class TestPSDrawing(DrawingTester, unittest.TestCase):
             self.fail('Path was not closed')
 
 
+    def test_line_set_and_rects_precision(self):
+        gc = PSGC((100, 100), precision=1)
+        gc.begin_path()
+        gc.line_set([(1.23456, 2.34567)], [(3, 4)])
+        gc.stroke_path()
+        gc.begin_path()
+        gc.rects([(1.23456, 2, 3, 4)])
+        gc.fill_path()
+        lines = gc.contents.getvalue().splitlines()
+        self.assertIn('    1.2 2.3 moveto 3.0 4.0 lineto', lines)
+        self.assertIn('    1.2 2.0 3.0 4.0', lines)
+
+    def test_rects_with_negative_sizes(self):
+        gc = PSGC((100, 100))
+        gc.begin_path()
+        gc.rects([(10, 20, 5, 10), (30, 20, -5, 10), (40, 50, 5, -10),
+                  (60, 50, -5, -10)])
+        gc.fill_path()
+        lines = gc.contents.getvalue().splitlines()
+        # The rectangles all wind the same way, for the nonzero rule.
+        start = lines.index('[')
+        self.assertEqual(lines[start+1:start+6],
+                         ['    10.000 20.000 5.000 10.000',
+                          '    25.000 20.000 5.000 10.000',
+                          '    40.000 40.000 5.000 10.000',
+                          '    55.000 40.000 5.000 10.000',
+                          '] rectfill'])
+
+    def test_eof_rects_keep_even_odd_rule(self):
+        gc = PSGC((100, 100))
+        gc.begin_path()
+        gc.rects([(10, 20, 5, 10), (12, 22, 5, 10)])
+        gc.eof_fill_path()
+        contents = gc.contents.getvalue()
+        self.assertNotIn('rectfill', contents)
+        self.assertEqual(contents.count('eofill'), 2)
+
+
+class TestPSRelativeDrawing(TestPSDrawing):
+
+    def create_graphics_context(self, width, height):
+        return PSGC((width, height), relative_paths=True)
+
+    def test_relative_path(self):
+        self.gc.begin_path()
+        self.gc.move_to(10, 20)
+        self.gc.line_to(15, 20)
+        self.gc.line_to(15, 30)
+        self.gc.stroke_path()
+        lines = self.gc.contents.getvalue().splitlines()
+        start = lines.index('newpath')
+        self.assertEqual(lines[start+1:start+4],
+                         ['    10.000 20.000 moveto',
+                          '    5.000 0.000 rlineto',
+                          '    0.000 10.000 rlineto'])
+
+    def test_relative_line_set(self):
+        self.gc.begin_path()
+        self.gc.line_set([(10, 20), (30, 20)], [(15, 25), (30, 40)])
+        self.gc.stroke_path()
+        lines = self.gc.contents.getvalue().splitlines()
+        start = lines.index('newpath')
+        self.assertEqual(lines[start+1:start+3],
+                         ['    10.000 20.000 moveto 5.000 5.000 rlineto',
+                          '    15.000 -5.000 rmoveto 0.000 20.000 rlineto'])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,8 @@
 import contextlib
 from xml.etree import ElementTree
 
+import numpy
+
 from kiva.tests.drawing_tester import DrawingTester
 from kiva.svg import GraphicsContext
 from traits.testing.unittest_tools import unittest
@@ -21,6 +23,173 @@ class TestSVGDrawing(DrawingTester, unittest.TestCase):
         if not len(elements) in [4, 7]:
             self.fail('The expected number of elements was not found')
 
+    def test_native_curves(self):
+        gc = GraphicsContext((300, 300))
+        gc.begin_path()
+        gc.move_to(10, 20)
+        gc.curve_to(20, 30, 30, 30, 40, 20)
+        gc.quad_curve_to(50, 10, 60, 20)
+        gc.arc(150, 150, 100, 0.0, 2 * numpy.pi)
+        gc.stroke_path()
+        svg = gc.render('svg')
+        self.assertIn('d="M10.00,20.00 C20.00,30.00 30.00,30.00 40.00,20.00 '
+                      'Q50.00,10.00 60.00,20.00 L250.00,150.00 '
+                      'A100.00,100.00 0 0,1 50.00,150.00 '
+                      'A100.00,100.00 0 0,1 250.00,150.00"', svg)
+
+    def test_compound_path(self):
+        gc = GraphicsContext((300, 300))
+        gc.begin_path()
+        gc.rect(0, 0, 100, 100)
+        gc.rect(25, 25, 50, 50)
+        gc.eof_fill_path()
+        svg = gc.render('svg')
+        self.assertEqual(svg.count('<path'), 1)
+        self.assertEqual(svg.count('M'), 2)
+        self.assertIn('fill-rule:evenodd', svg)
+
+    def test_line_set_and_rects_precision(self):
+        gc = GraphicsContext((300, 300), precision=4)
+        gc.begin_path()
+        gc.line_set([(1.23456, 2.34567)], [(3, 4)])
+        gc.stroke_path()
+        gc.begin_path()
+        gc.rects([(1.23456, 2, 3, 4)])
+        gc.fill_path()
+        svg = gc.render('svg')
+        self.assertIn('d="M1.2346,2.3457 L3.0000,4.0000 "', svg)
+        self.assertIn('d="M1.2346,2.0000 L4.2346,2.0000 4.2346,6.0000 '
+                      '1.2346,6.0000 Z "', svg)
+
+    def test_rects_with_negative_sizes(self):
+        gc = GraphicsContext((300, 300))
+        gc.begin_path()
+        gc.rects([(10, 20, 5, 10), (30, 20, -5, 10), (40, 50, 5, -10),
+                  (60, 50, -5, -10)])
+        gc.eof_fill_path()
+        svg = gc.render('svg')
+        # The rectangles all wind the same way, for the nonzero rule.
+        self.assertIn('d="M10.00,20.00 L15.00,20.00 15.00,30.00 10.00,30.00 Z '
+                      'M25.00,20.00 L30.00,20.00 30.00,30.00 25.00,30.00 Z '
+                      'M40.00,40.00 L45.00,40.00 45.00,50.00 40.00,50.00 Z '
+                      'M55.00,40.00 L60.00,40.00 60.00,50.00 55.00,50.00 Z "',
+                      svg)
+        self.assertIn('fill-rule:nonzero', svg)
+
+    def test_image_embedded_once(self):
+        gc = GraphicsContext((300, 300))
+        image = numpy.zeros((20, 30, 4), dtype=numpy.uint8)
+        image[..., 0] = image[..., 3] = 255
+        for x in range(3):
+            gc.draw_image(image, (10 * x, 10, 30, 20))
+        gc.draw_image(image, (10, 50, 60, 40))
+        svg = gc.render('svg')
+        # The image is encoded once for each size it is drawn at.
+        self.assertEqual(svg.count('<image'), 2)
+        self.assertEqual(svg.count('<use'), 4)
+        ElementTree.fromstring(svg)
+
+    def test_rgb_image(self):
+        gc = GraphicsContext((300, 300))
+        image = numpy.zeros((20, 30, 3), dtype=numpy.uint8)
+        gc.draw_image(image, (10, 10, 30, 20))
+        svg = gc.render('svg')
+        self.assertEqual(svg.count('<image'), 1)
+
+
+class TestSVGRelativeDrawing(TestSVGDrawing):
+
+    def create_graphics_context(self, width, height):
+        return GraphicsContext((width, height), relative_paths=True)
+
+    def test_relative_path(self):
+        self.gc.begin_path()
+        self.gc.move_to(10, 20)
+        self.gc.line_to(15, 20)
+        self.gc.line_to(15, 30)
+        self.gc.fill_path()
+        svg = self.gc.render('svg')
+        self.assertNotIn('<polygon', svg)
+        self.assertIn('d="M10.00,20.00 l5.00,0.00 0.00,10.00 Z"', svg)
+
+    def test_relative_line_set_and_rects(self):
+        self.gc.begin_path()
+        self.gc.line_set([(10, 20), (30, 20)], [(15, 25), (30, 40)])
+        self.gc.stroke_path()
+        self.gc.begin_path()
+        self.gc.rects([(10, 20, 5, 10)])
+        self.gc.fill_path()
+        svg = self.gc.render('svg')
+        self.assertIn('d="M10.00,20.00 l5.00,5.00 m15.00,-5.00 '
+                      'l0.00,20.00 "', svg)
+        self.assertIn('d="M10.00,20.00 l5.00,0.00 0.00,10.00 -5.00,0.00 Z "',
+                      svg)
+
+
+class TestSVGStreamingDrawing(DrawingTester, unittest.TestCase):
+
+    def create_graphics_context(self, width, height):
+        filename = "{0}.svg".format(self.filename)
+        return GraphicsContext((width, height), stream=filename)
+
+    @contextlib.contextmanager
+    def draw_and_check(self):
+        yield
+        self.gc.close()
+        filename = "{0}.svg".format(self.filename)
+        with open(filename) as handle:
+            self.assertNotIn('<svg:', handle.read())
+        tree = ElementTree.parse(filename)
+        elements = [element for element in tree.getiterator()]
+        if not len(elements) in [4, 7]:
+            self.fail('The expected number of elements was not found')
+
+    def test_save_not_allowed(self):
+        self.assertRaises(RuntimeError, self.gc.save,
+                          "{0}.svg".format(self.filename))
+        self.gc.close()
+
+
+class TestSVGCompactDrawing(DrawingTester, unittest.TestCase):
+
+    def create_graphics_context(self, width, height):
+        return GraphicsContext((width, height), compact=True)
+
+    @contextlib.contextmanager
+    def draw_and_check(self):
+        yield
+        filename = "{0}.svg".format(self.filename)
+        self.gc.save(filename)
+        self.assertCompact(ElementTree.parse(filename))
+
+    def assertCompact(self, tree):
+        elements = [element for element in tree.getiterator()]
+        styles = [element.text for element in elements
+                  if element.tag.endswith('style')]
+        for element in elements:
+            if element.tag.endswith('}g'):
+                continue
+            self.assertNotIn('style', element.attrib)
+            if not element.tag.endswith('}text'):
+                # Text keeps its own transform, which includes the text
+                # matrix.
+                self.assertNotIn('transform', element.attrib)
+            if 'class' in element.attrib:
+                self.assertEqual(len(styles), 1)
+                self.assertIn('.%s {' % element.attrib['class'], styles[0])
+
+    def test_shared_style(self):
+        for i in range(3):
+            self.gc.begin_path()
+            self.gc.move_to(10 * i, 0)
+            self.gc.line_to(10 * i, 100)
+            self.gc.stroke_path()
+        svg = self.gc.render('svg')
+        self.assertEqual(svg.count('<path'), 3)
+        self.assertEqual(svg.count('class="s0"'), 3)
+        self.assertEqual(svg.count('<g transform="matrix'), 1)
+        self.assertCompact(ElementTree.ElementTree(ElementTree.fromstring(svg)))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,116 @@
+import numpy
+
+from kiva import pdfmetrics, text_extents
+from kiva.fonttools import Font
+from kiva.svg import GraphicsContext
+from kiva.text_extents import (TextExtentCache, afm_text_extents,
+                               string_widths)
+from traits.testing.unittest_tools import unittest
+
+
+class TestStringWidths(unittest.TestCase):
+
+    def test_matches_string_width(self):
+        strings = ['', 'Hello', 'kiva text', u'caf\xe9', '0.5']
+        for face_name in ('Helvetica', 'Times-Roman', 'Courier'):
+            expected = [pdfmetrics.stringWidth(text, face_name, 12)
+                        for text in strings]
+            widths = string_widths(strings, face_name, 12)
+            self.assertTrue(numpy.allclose(widths, expected))
+
+    @unittest.skipIf(text_extents.pdfmetrics is pdfmetrics,
+                     "kiva's pdfmetrics only measures Latin-1")
+    def test_non_ascii(self):
+        # Characters outside of Latin-1, and UTF-8 encoded strings, go
+        # through the encoding of the font like in the backends.
+        strings = [u'a\u2013b', u'\u22121.5', u'\u20ac5', 'caf\xc3\xa9', 'ab']
+        expected = [text_extents.pdfmetrics.stringWidth(text, 'Helvetica', 12)
+                    for text in strings]
+        widths = string_widths(strings, 'Helvetica', 12)
+        self.assertTrue(numpy.allclose(widths, expected))
+
+        gc = GraphicsContext((100, 100))
+        gc.set_font(Font(size=12))
+        for text, extent in zip(strings, gc.get_text_extents(strings)):
+            self.assertAlmostEqual(extent[2], gc.get_full_text_extent(text)[0])
+
+    def test_empty(self):
+        self.assertEqual(string_widths([], 'Helvetica', 12).shape, (0,))
+        self.assertEqual(afm_text_extents([], 'Helvetica', 12).shape, (0, 4))
+
+    def check_extents(self, gc, strings):
+        # The rows are the extents returned by get_text_extent(), with the
+        # width, height and descent of get_full_text_extent().
+        extents = gc.get_text_extents(strings)
+        self.assertEqual(extents.shape, (len(strings), 4))
+        for text, extent in zip(strings, extents):
+            w, h, descent, leading = gc.get_full_text_extent(text)
+            self.assertTrue(numpy.allclose(extent[2:], (w, h)))
+            self.assertAlmostEqual(abs(extent[1]), abs(descent))
+            self.assertTrue(extent[1] <= 0)
+            # The PDF get_text_extent() only returns (w, h).
+            text_extent = gc.get_text_extent(text)
+            self.assertTrue(numpy.allclose(extent[4 - len(text_extent):],
+                                           text_extent))
+
+    def test_matches_text_extent(self):
+        from kiva.ps import PSGC
+        strings = ['one', 'two words', '']
+        for gc in (GraphicsContext((100, 100)), PSGC((100, 100))):
+            gc.set_font(Font(size=14))
+            self.check_extents(gc, strings)
+            self.assertTrue(numpy.allclose(
+                gc.get_text_extents(strings),
+                afm_text_extents(strings, gc.face_name, 14)))
+
+    def test_matches_agg_text_extent(self):
+        from kiva.image import GraphicsContext as AggGraphicsContext
+        gc = AggGraphicsContext((100, 100))
+        gc.set_font(Font(size=14))
+        self.check_extents(gc, ['one', 'Wg', ''])
+
+    @unittest.skipIf(text_extents.pdfmetrics is pdfmetrics,
+                     "The PDF backend requires reportlab")
+    def test_matches_pdf_text_extent(self):
+        from reportlab.pdfgen.canvas import Canvas
+        from kiva.pdf import GraphicsContext as PDFGraphicsContext
+        gc = PDFGraphicsContext(Canvas(None, (100, 100)))
+        gc.set_font(Font(size=14))
+        self.check_extents(gc, ['one', 'Wg', ''])
+
+
+class TestTextExtentCache(unittest.TestCase):
+
+    def setUp(self):
+        self.measured = []
+
+    def measure(self, strings):
+        self.measured.append(list(strings))
+        return numpy.array([(0, -1, len(text), 10) for text in strings],
+                           dtype=float)
+
+    def test_memoizes_by_font_and_string(self):
+        cache = TextExtentCache()
+        extents = cache.get_extents('a', ['x', 'yy'], self.measure)
+        self.assertTrue(numpy.all(extents == [(0, -1, 1, 10),
+                                              (0, -1, 2, 10)]))
+        extents = cache.get_extents('a', ['yy', 'zzz', 'x'], self.measure)
+        self.assertEqual(extents[:, 2].tolist(), [2, 3, 1])
+        cache.get_extents('b', ['x'], self.measure)
+        self.assertEqual(self.measured, [['x', 'yy'], ['zzz'], ['x']])
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+        self.assertEqual(len(cache), 4)
+        self.assertEqual(cache.get_extents('a', [], self.measure).shape,
+                         (0, 4))
+
+    def test_max_size(self):
+        cache = TextExtentCache(max_size=3)
+        cache.get_extents('a', ['x', 'y'], self.measure)
+        cache.get_extents('a', ['z', 'w'], self.measure)
+        self.assertEqual(len(cache), 2)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
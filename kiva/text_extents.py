@@ -0,0 +1,129 @@
+#------------------------------------------------------------------------------
+# Copyright (c) 2014, Enthought, Inc.
+# All rights reserved.
+#
+# This software is provided without warranty under the terms of the BSD
+# license included in enthought/LICENSE.txt and may be redistributed only
+# under the conditions described in the aforementioned license.  The license
+# is also available online at http://www.enthought.com/licenses/BSD.txt
+# Thanks for using Enthought open source!
+#------------------------------------------------------------------------------
+""" Measuring many strings at once, for the get_text_extents() method of
+the graphics contexts.
+
+Layout code measures the same strings over and over, like the labels of a
+grid or of the ticks of an axis.  The backends keep their extents in a
+`TextExtentCache`, keyed by font and string, and only measure the strings
+which it does not have.  `afm_text_extents` measures strings in one of the
+standard PDF fonts with numpy, for the backends which use their metrics.
+"""
+
+import numpy as np
+
+try:
+    # Use the same metrics as the backends when reportlab is installed
+    import reportlab.pdfbase.pdfmetrics as pdfmetrics
+    import reportlab.pdfbase._fontdata as _fontdata
+except ImportError:
+    from . import pdfmetrics, _fontdata
+
+
+def string_widths(strings, face_name, font_size):
+    """ Returns the widths of strings in one of the standard PDF fonts, as
+    given by `pdfmetrics.stringWidth`, as an array.
+
+    The ASCII strings are measured together with numpy.  Other characters
+    go through the encoding of the font, so the strings which have them are
+    measured one by one with `pdfmetrics.stringWidth`.
+    """
+    result = np.empty(len(strings))
+    ascii_indices = []
+    ascii_strings = []
+    for i, text in enumerate(strings):
+        try:
+            if isinstance(text, unicode):
+                text = text.encode('ascii')
+            else:
+                text.decode('ascii')
+        except UnicodeError:
+            result[i] = pdfmetrics.stringWidth(text, face_name, font_size)
+        else:
+            ascii_indices.append(i)
+            ascii_strings.append(text)
+
+    widths = np.asarray(pdfmetrics.getFont(face_name).widths, dtype=float)
+    lengths = np.array([len(text) for text in ascii_strings], dtype=int)
+    codes = np.frombuffer(''.join(ascii_strings), dtype=np.uint8)
+    # The width of each string is a difference of the running total of the
+    # widths of the characters.
+    totals = np.zeros(len(codes) + 1)
+    np.cumsum(widths[codes], out=totals[1:])
+    ends = np.cumsum(lengths)
+    result[ascii_indices] = ((totals[ends] - totals[ends - lengths]) *
+                             0.001 * font_size)
+    return result
+
+
+def afm_text_extents(strings, face_name, font_size):
+    """ Returns the extents of strings in one of the standard PDF fonts, in
+    the rows of an Nx4 array.
+
+    Each row is the (x, y, w, h) extent of a string, as returned by
+    get_text_extent(), with the descent of the font as a negative y.
+    """
+    ascent, descent = _fontdata.ascent_descent[face_name]
+    descent = (-descent) * font_size / 1000.0
+    ascent = ascent * font_size / 1000.0
+    extents = np.zeros((len(strings), 4))
+    extents[:, 1] = -descent
+    extents[:, 2] = string_widths(strings, face_name, font_size)
+    extents[:, 3] = ascent + descent
+    return extents
+
+
+class TextExtentCache(object):
+    """ A memo of the extents of strings, keyed by font and string.
+
+    All the entries are dropped when there would be more than `max_size` of
+    them.  The number of strings which were found and which were not are
+    counted in `hits` and `misses`.
+    """
+
+    def __init__(self, max_size=10000):
+        self._entries = {}
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_extents(self, font, strings, measure):
+        """ Returns the extents of strings in a font, in the rows of an Nx4
+        array.
+
+        `font` is any hashable description of the font.  The strings which
+        are not in the cache are measured in one call to `measure`, which
+        takes a list of strings and returns their extents as an Nx4 array.
+        """
+        entries = self._entries
+        rows = [entries.get((font, text)) for text in strings]
+        missing = [i for i, row in enumerate(rows) if row is None]
+        self.hits += len(rows) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            if len(entries) + len(missing) > self.max_size:
+                entries.clear()
+            measured = measure([strings[i] for i in missing])
+            for i, extent in zip(missing, measured):
+                rows[i] = entries[(font, strings[i])] = tuple(extent)
+        return np.array(rows, dtype=float).reshape(len(rows), 4)
+
+    def clear(self):
+        """ Removes all the extents.
+        """
+        self._entries.clear()
+
+
+#: The cache shared by all the graphics contexts
+default_cache = TextExtentCache()